@@ -365,6 +365,10 @@ JSLibrary
 JSContextRef
 JSGlobalContextRef
 JSStringRef
+JSStringRefCache
+JSPreparedScript
+JSPreparedScriptCache
+JSValue
 JSValueRef
 JSObjectRef
 JSException
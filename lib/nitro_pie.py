@@ -42,14 +42,26 @@ JSException
 JSGlobalContextRef
 JSLibrary
 JSObjectRef
+JSPreparedScript
+JSPreparedScriptCache
 JSStringRef
+JSStringRefCache
+JSValue
 JSValueRef
+
+jsfunction
 """.split()
 
 import os
+import sys
+import array
 import ctypes
 import ctypes.util
-import inspect
+import collections
+import json
+import math
+import threading
+import weakref
 
 #-------------------------------------------------------------------
 # logger
@@ -63,6 +75,8 @@ def NitroLogging(bool):
 def _log(message="", args=None):
     if not _LOGGING: return
     
+    import inspect
+    
     caller = inspect.stack()[1]
     (frame, filename, lineNumber, function, context, contextIndex) = caller
     filename = os.path.basename(filename)
@@ -76,36 +90,125 @@ def _log(message="", args=None):
     
     print "%s[%4d]: %s" % (filename, lineNumber, message)
 
+#--------------------------------------------------------------------
+_FREE_SLOT = object()
+
 #--------------------------------------------------------------------
 class RememberedObjects(object):
+    """Maps integer handles to Python objects, for example for the
+    private data of JavaScript objects.
+    
+    The objects are kept in a list, and the slots of forgotten objects
+    are kept on a free list and reused, so remember(), get() and 
+    forget() take constant time.  Handles start at 1, so a handle is
+    never NULL.  remember(), forget() and forgetLater() hold a lock;
+    get() is a single list index, which needs none.
+    
+    Finalizers of JavaScript objects run during garbage collection,
+    where running Python finalizers is not safe, so they call 
+    forgetLater() instead of forget(); the handles are forgotten by
+    the next drain(), which is called at safe points such as the 
+    start of JSContextRef.eval().
+    """
 
-    index      = 1
-    remembered = {}
+    objects    = [_FREE_SLOT]
+    finalizers = [None]
+    free       = []
+    pending    = collections.deque()
+    lock       = threading.Lock()
     
     #----------------------------------------------------------------
     @staticmethod
     def remember(obj, finalizer=None):
-        remembered[index] = (obj, finalizer)
+        with RememberedObjects.lock:
+            objects = RememberedObjects.objects
+            
+            if RememberedObjects.free:
+                index = RememberedObjects.free.pop()
+                objects[index] = obj
+                RememberedObjects.finalizers[index] = finalizer
+            else:
+                index = len(objects)
+                objects.append(obj)
+                RememberedObjects.finalizers.append(finalizer)
         
-        result  = index
-        index  += 1
-        return result
+        return index
         
     #----------------------------------------------------------------
     @staticmethod
     def get(index):
-        return remembered[index][0]
+        objects = RememberedObjects.objects
+        if not 0 <= index < len(objects): raise KeyError, index
+        
+        obj = objects[index]
+        if obj is _FREE_SLOT: raise KeyError, index
+        
+        return obj
         
     #----------------------------------------------------------------
     @staticmethod
     def forget(index):
-        (obj, finalizer) = remembered[index]
-
-        del remembered[index]
+        with RememberedObjects.lock:
+            if not 0 <= index < len(RememberedObjects.objects): raise KeyError, index
+            
+            obj = RememberedObjects.objects[index]
+            if obj is _FREE_SLOT: raise KeyError, index
+            
+            finalizer = RememberedObjects.finalizers[index]
+            
+            RememberedObjects.objects[index]    = _FREE_SLOT
+            RememberedObjects.finalizers[index] = None
+            RememberedObjects.free.append(index)
         
         if finalizer:
             finalizer(obj)
     
+    #----------------------------------------------------------------
+    @staticmethod
+    def forgetLater(index):
+        with RememberedObjects.lock:
+            RememberedObjects.pending.append(index)
+    
+    #----------------------------------------------------------------
+    @staticmethod
+    def drain():
+        # swapped out under the lock, so handles queued by finalizers
+        # while these are forgotten wait for the next drain()
+        with RememberedObjects.lock:
+            pending = RememberedObjects.pending
+            RememberedObjects.pending = collections.deque()
+        
+        for index in pending:
+            RememberedObjects.forget(index)
+    
+    #----------------------------------------------------------------
+    @staticmethod
+    def count():
+        return len(RememberedObjects.objects) - 1 - len(RememberedObjects.free)
+
+#--------------------------------------------------------------------
+class _ContextFunctions(object):
+    """The JSContextRef.functions attribute.
+    
+    Callbacks used to be kept in a list in JSContextRef.functions for
+    the life of the process; they are now kept by _ContextState.  Read
+    from a context, this returns the live list of that context's 
+    callbacks, so objects appended to it are kept until the context is
+    released.  Read from the class, it returns a list whose contents
+    are kept for the life of the process, as before.
+    """
+    
+    process = []
+    
+    #----------------------------------------------------------------
+    def __get__(self, context, contextClass=None):
+        if context is None: return _ContextFunctions.process
+        
+        return _ContextState.get(context).callbacks
+        
+    #----------------------------------------------------------------
+    def __set__(self, context, value):
+        raise AttributeError, "JSContextRef.functions is read-only"
 
 #--------------------------------------------------------------------
 class JSContextRef(ctypes.c_void_p):
@@ -118,8 +221,41 @@ class JSContextRef(ctypes.c_void_p):
     use the <strong>create()</strong> method of #[JSGlobalContextRef]
     class.
     
+    <p>The $[jsonThreshold] class variable holds the number of values
+    at which arrays and other structures are moved in and out of 
+    JavaScriptCore as a single JSON string, instead of one value 
+    at a time.  The default value is $[1000].
+    
+    <p>The $[scriptCache] class variable may be set to a 
+    #[JSPreparedScriptCache], in which case scripts passed as
+    strings to $[eval()] are prepared once and evaluated from 
+    the cache.  The default value is $[None].
+    
+    <p>The $[extraMemoryThreshold] class variable holds the size in
+    bytes from which the memory held by Python values passed to
+    $[makePythonObjectRef()] is reported to the garbage collector,
+    as by $[reportExtraMemoryCost()].  The default value is $[4096].
+    
+    <p>The $[protectBuiltins] class variable may be set to $[True] to
+    have contexts keep references to the engine's $[JSON.parse()], 
+    $[JSON.stringify()] and $[isFinite()] functions when they are 
+    created, before any script can replace them.  Otherwise they are
+    kept when first used by $[fromJSON()], $[toJSONString()] or
+    $[toList()].  The default value is $[False].
+    
+    <p>The $[functions] attribute is deprecated.  Read from a context,
+    it is the list of the callbacks created by $[makeFunction()] and 
+    $[makeFastFunction()] for the context; those callbacks, and any
+    objects appended to the list, are kept until the context is 
+    released.  Read from the class, it is a list whose contents are
+    kept for the life of the process.  The attribute cannot be 
+    assigned.
     """
-    functions = []
+    jsonThreshold        = 1000
+    scriptCache          = None
+    extraMemoryThreshold = 4096
+    protectBuiltins      = False
+    functions            = _ContextFunctions()
     
     #----------------------------------------------------------------
     def getGlobalObject(self):
@@ -141,14 +277,41 @@ class JSContextRef(ctypes.c_void_p):
         """
         JSLibrary._ensureLibrary()
         _log("JSContextRef.$f(%s)", (self,))
-        return _JSGarbageCollect(self)
+        
+        result = _JSGarbageCollect(self)
+        
+        if RememberedObjects.pending: RememberedObjects.drain()
+        
+        return result
     
+    #----------------------------------------------------------------
+    def reportExtraMemoryCost(self, size):
+        """Tells the garbage collector about memory held outside of it.
+        
+        <p>Call this when a JavaScript object keeps a large amount of 
+        memory alive which JavaScriptCore does not know about, so the
+        collector runs sooner.  Does nothing if the JavaScriptCore 
+        library in use does not export $[JSReportExtraMemoryCost()].
+        
+        @returns (boolean) whether the cost was reported
+        @param size (int) the number of bytes held
+        """
+        JSLibrary._ensureLibrary()
+        _log("JSContextRef.$f(%s, %s)", (self, size))
+        assert isinstance(size, (int, long)), "Expecting an int for the size parameter"
+        
+        if not _JSReportExtraMemoryCost: return False
+        
+        _JSReportExtraMemoryCost(self, size)
+        return True
+        
     #----------------------------------------------------------------
     def eval(self, script, thisObject=None, sourceURL=None, startingLineNumber=1):
         """Evaluate a string of JavaScript code.
         
-        @returns (#[JSValueRef]) 
-                 the value of executing the script.
+        @returns (#[JSValueRef] | #[JSObjectRef]) 
+                 the value of executing the script; objects are
+                 returned as #[JSObjectRef] instances.
         
         @param script             (str | unicode | #[JSStringRef])
                the script to execute
@@ -165,9 +328,16 @@ class JSContextRef(ctypes.c_void_p):
         """
         JSLibrary._ensureLibrary()
         _log("JSContextRef.$f(%s, '%s', %s, '%s', %s)", (self, script, thisObject, sourceURL, startingLineNumber))
-        if thisObject:         assert isinstance(context,            JSObjectRef),   "Expecting a JSValueRef for the thisObject parameter"
+        if thisObject:         assert isinstance(thisObject,         JSObjectRef),   "Expecting a JSObjectRef for the thisObject parameter"
         if startingLineNumber: assert isinstance(startingLineNumber, int),          "Expecting an int for the startingLineNumber parameter"
 
+        if RememberedObjects.pending: RememberedObjects.drain()
+        
+        cache = self.scriptCache
+        if cache is not None and script and type(script) in _STRING_TYPES:
+            if sourceURL is None or type(sourceURL) in _STRING_TYPES:
+                return cache.get((script, sourceURL, startingLineNumber or 0)).eval(self, thisObject)
+            
         scriptRef    = JSStringRef.asRef(script)
         sourceURLRef = JSStringRef.asRef(sourceURL)
         exception    = JSValueRef()
@@ -196,7 +366,28 @@ class JSContextRef(ctypes.c_void_p):
 
         exception.unprotect(self)
         
-        return result
+        return _typedValue(self, result)
+    
+    #----------------------------------------------------------------
+    def prepare(self, script, sourceURL=None, startingLineNumber=1):
+        """Prepares a string of JavaScript code for repeated evaluation.
+        
+        The result should be <code>release()</code>d when no longer needed.
+        
+        @returns (#[JSPreparedScript]) 
+                 the prepared script
+        
+        @param script             (str | unicode | #[JSStringRef])
+               the script to prepare
+        @param sourceURL          (str | unicode | #[JSStringRef])
+               the name of the script
+        @param startingLineNumber (int)
+               the line of the source the script starts on
+        """
+        JSLibrary._ensureLibrary()
+        _log("JSContextRef.$f(%s, '%s', '%s', %s)", (self, script, sourceURL, startingLineNumber))
+        
+        return JSPreparedScript(script, sourceURL, startingLineNumber)
     
     #----------------------------------------------------------------
     def checkScriptSyntax(self, script, sourceURL=None, startingLineNumber=1):
@@ -284,6 +475,10 @@ def callbackPrint(context, function, thisObject, args):
     return context.makeUndefined()
 </pre>
         
+        <p>Functions decorated with $[jsfunction()] declare the types
+        of their arguments and result, and are called without 
+        building the argument list.
+        
         @return (#[JSObjectRef])
                 the JavaScript function just created
         
@@ -297,25 +492,72 @@ def callbackPrint(context, function, thisObject, args):
         _log("JSContextRef.$f(%s, '%s', %s)", (self, name, function))
         assert callable(function), "Expecting a function for the function parameter"
         
-        def callbackFunction(cbContext, cbFunction, thisObject, argCount, argRefs, exception):
-            args = []
-            
-            for i in xrange(0, argCount):
-                args.append(argRefs[i])
-            
-            result = function(cbContext, cbFunction, thisObject, args)
-            
-            if not result: return None
-            
-            if not isinstance(result,JSValueRef):
-                raise TypeError, "callback function: '%s' - callbacks must return a JSValueRef" % name
-            
-            return result.value
-            
-        callback = JSObjectCallAsFunctionCallback(callbackFunction)
+        callback = JSObjectCallAsFunctionCallback(_callbackFunction(name, function))
+        
+        # the callback must live as long as the context
+        _ContextState.get(self).callbacks.append(callback)
+        
+        nameRef = JSStringRef.asRef(name)
+        
+        result = _JSObjectMakeFunctionWithCallback(self, nameRef, callback)
+        
+        if name != nameRef: nameRef.release()
+        
+        return result
+    
+    #----------------------------------------------------------------
+    def makeFastFunction(self, name, function, arity=None):
+        """Creates a JavaScript function implemented in Python, with
+        less per-call overhead than $[makeFunction()].
+
+        <p>When $[arity] is $[None], the Python callable is invoked as
+        
+<pre>
+function(context, thisObject, args)
+</pre>
+        
+        <p>where <code>args</code> is a read-only sequence of 
+        #[JSValueRef] which only creates the values actually indexed.
+        
+        <p>When $[arity] is 0, 1, 2 or 3, the Python callable is invoked
+        with that many #[JSValueRef] arguments following the context
+        and <code>thisObject</code>, as in
+        
+<pre>
+function(context, thisObject, key, value)
+</pre>
+        
+        <p>Arguments which were not passed from JavaScript are 
+        $[None], and additional arguments are ignored.
+        
+        <p>The function may return a #[JSValueRef], or a Python value
+        which is converted as by $[makeValue()].  Returning $[None]
+        returns $[undefined].  A #[JSException] raised by the function
+        is thrown back into JavaScript; other exceptions are thrown as
+        a string naming the exception class and message.
         
-        # problem - need to keep the callbacks from being GC'd
-        JSContextRef.functions.append(callback)
+        @return (#[JSObjectRef])
+                the JavaScript function just created
+        
+        @param name (str | unicode | #[JSStringRef])
+               the name of the function
+        
+        @param function (callable)
+               the Python function that implements the JavaScript function
+               
+        @param arity (int)
+               the number of arguments to pass positionally, or $[None]
+        """
+        JSLibrary._ensureLibrary()
+        _log("JSContextRef.$f(%s, '%s', %s, %s)", (self, name, function, arity))
+        assert callable(function), "Expecting a function for the function parameter"
+        
+        if arity is not None and arity not in _TRAMPOLINE_ARITIES:
+            raise TypeError, "Expecting None, 0, 1, 2 or 3 for the arity parameter"
+        
+        callback = JSObjectCallAsFunctionCallback(_trampoline(function, arity))
+        
+        _ContextState.get(self).callbacks.append(callback)
         
         nameRef = JSStringRef.asRef(name)
         
@@ -325,6 +567,130 @@ def callbackPrint(context, function, thisObject, args):
         
         return result
     
+    #----------------------------------------------------------------
+    def makeConstructor(self, name, pythonClass):
+        """Creates a JavaScript constructor for a Python class.
+        
+        <p>$[new] invoked on the constructor creates an instance of the
+        Python class, passing the arguments converted as by the 
+        <code>toPython()</code> method of #[JSValueRef], and returns 
+        an object which holds the instance in its private data.  The
+        attributes of the instance are exposed as for 
+        $[makePythonObjectRef()], and its public methods can be called
+        from JavaScript, with their arguments and results converted 
+        the same way.
+        
+        <p>The class definition for the Python class is created once 
+        for each name and cached.
+        
+        @return (#[JSObjectRef])
+                the constructor just created
+        
+        @param name (str | unicode)
+               the name of the constructor, used as the class name
+        
+        @param pythonClass (type)
+               the Python class to construct instances of
+        """
+        JSLibrary._ensureLibrary()
+        _log("JSContextRef.$f(%s, '%s', %s)", (self, name, pythonClass))
+        assert isinstance(pythonClass, type), "Expecting a class for the pythonClass parameter"
+        
+        constructorClass = _ConstructorClass.get(pythonClass, name)
+        
+        return _JSObjectMakeConstructor(self, constructorClass.jsClass, constructorClass.callAsConstructor)
+    
+    #----------------------------------------------------------------
+    def defineNamespace(self, name, functions):
+        """Creates an object whose properties are JavaScript functions
+        implemented in Python.
+        
+        <p>The functions are defined in the static function table of a
+        class, so creating the object takes a single call no matter 
+        how many functions it holds.  The class is created the first 
+        time a set of functions is used and cached afterwards, so the
+        functions should be module-level functions rather than 
+        closures created per call.
+        
+        <p>The functions have the signature described for 
+        $[makeFunction()], and may be decorated with $[jsfunction()].
+        
+        @return (#[JSObjectRef])
+                the object just created
+        
+        @param name (str | unicode)
+               the name of the global variable to store the object in,
+               or $[None] to not store it
+        
+        @param functions (dict)
+               the Python functions, keyed by the function name
+        """
+        JSLibrary._ensureLibrary()
+        _log("JSContextRef.$f(%s, '%s', %s)", (self, name, functions))
+        assert isinstance(functions, dict), "Expecting a dict for the functions parameter"
+        
+        for function in functions.itervalues():
+            assert callable(function), "Expecting functions for the functions parameter values"
+            
+        namespace = _NamespaceClass.get(name or "Object", functions)
+        result    = _JSObjectMake(self, namespace.jsClass, None)
+        
+        if name:
+            globalObject = _JSContextGetGlobalObject(self)
+            _JSObjectSetProperty(self, globalObject, JSStringRef.intern(name), result, JSObjectRef.kJSPropertyAttributeNone, None)
+            
+        return result
+    
+    #----------------------------------------------------------------
+    def fromJSON(self, text):
+        """Creates a new JavaScript value from a JSON string.
+        
+        <p>The string is parsed with the engine's $[JSON.parse()]
+        function, as it was when first used by the bridge, or when
+        the context was created if #[JSContextRef.protectBuiltins] 
+        was set.
+        
+        @return (#[JSValueRef]) the value created
+        @param text (str | unicode) the JSON string; $[str] values must be UTF-8
+        @throws (#[JSException])  
+                raised when the string is not valid JSON
+        """
+        JSLibrary._ensureLibrary()
+        _log("JSContextRef.$f(%s, %s)", (self, text))
+        if not isinstance(text, basestring): raise TypeError, "Expecting a string for the text parameter"
+        
+        parse = _ContextState.get(self).function(self, "parse")
+        
+        return _callAsFunction(self, parse, None, [self._makeSimpleValue(text)])
+    
+    #----------------------------------------------------------------
+    def makeArray(self, sequence):
+        """Creates a new JavaScript array from a Python sequence.
+        
+        <p>The elements are converted as by #[makeValue()].  Sequences 
+        of at least $[JSContextRef.jsonThreshold] elements which are 
+        all numbers, or all strings, are passed to JavaScriptCore as a
+        single JSON string without looking at the elements further.
+        
+        @return (#[JSObjectRef]) the array created
+        @param sequence (list | tuple) the elements of the array
+        """
+        JSLibrary._ensureLibrary()
+        _log("JSContextRef.$f(%s, %s)", (self, sequence))
+        
+        if len(sequence) >= JSContextRef.jsonThreshold:
+            types = set(map(type, sequence))
+            
+            if types <= _NUMBER_TYPES or types <= _STRING_TYPES:
+                try:
+                    text = json.dumps(sequence, allow_nan=False)
+                except ValueError:
+                    text = None
+                    
+                if text: return self.fromJSON(text).asJSObjectRef(self)
+        
+        return _JSValueConverter(self).convert(sequence).asJSObjectRef(self)
+    
     #----------------------------------------------------------------
     def makeBoolean(self, value):
         """Creates a new JavaScript boolean value.
@@ -337,6 +703,33 @@ def callbackPrint(context, function, thisObject, args):
 
         return _JSValueMakeBoolean(self, value)
 
+    #----------------------------------------------------------------
+    def makeValue(self, value):
+        """Creates a new JavaScript value from a Python value.
+        
+        <p>$[None] is converted to $[null], booleans, numbers and strings
+        to the equivalent JavaScript values, lists and tuples to arrays,
+        and dicts to objects.  #[JSValueRef] instances are used as is.
+        Dict keys must be strings.
+        
+        <p>A list or dict referenced more than once, including by itself,
+        is converted once, and the resulting JavaScript object is shared.
+        
+        <p>Structures of at least $[JSContextRef.jsonThreshold] values 
+        which contain no shared references, and nothing but the values
+        JSON supports, are passed to JavaScriptCore as a single JSON 
+        string instead of one value at a time.
+        
+        @return (#[JSValueRef]) the value created
+        @param value (object) the Python value to convert
+        @throws (TypeError) 
+                raised if the value contains something that cannot be converted
+        """
+        JSLibrary._ensureLibrary()
+        _log("JSContextRef.$f(%s, %s)", (self, value))
+        
+        return self._makeValue(value)
+
     #----------------------------------------------------------------
     def makeNull(self):
         """Creates a new JavaScript null value.
@@ -384,16 +777,66 @@ def callbackPrint(context, function, thisObject, args):
 
         return _JSValueMakeUndefined(self)
 
+    #----------------------------------------------------------------
+    def _makeValue(self, value):
+        if isinstance(value, _CONTAINER_TYPES):
+            return _JSValueConverter(self).convert(value)
+            
+        return self._makeSimpleValue(value)
+        
+    #----------------------------------------------------------------
+    def _makeSimpleValue(self, value):
+        if isinstance(value, JSValueRef): return value
+        
+        if value is None:                           return _JSValueMakeNull(self)
+        if isinstance(value, bool):                 return _JSValueMakeBoolean(self, value)
+        if isinstance(value, (int, long, float)):   return _JSValueMakeNumber(self, value)
+        
+        if isinstance(value, (str, unicode)):
+            string = JSStringRef.create(value)
+            result = _JSValueMakeString(self, string)
+            string.release()
+            return result
+            
+        raise TypeError, "Unable to convert a %s to a JSValueRef" % type(value).__name__
+
     #----------------------------------------------------------------
     def makePythonObjectRef(self, pythonValue):
         """Creates a new JSObjectRef which holds a Python value.
         
-        @return (#[JSValueRef]) the value created
+        <p>The Python value is not copied; the properties of the 
+        object are read from, and written to, the Python value when
+        they are accessed from JavaScript.  Mappings expose their
+        keys, lists and tuples expose their elements and $[length],
+        and other objects expose their attributes which are not 
+        callable and do not start with $["_"].  Property values which
+        are not strings, numbers, booleans or $[None] are exposed 
+        the same way.
+        
+        <p>The size of byte strings, large unicode strings, 
+        <code>bytearray</code>s, <code>array</code>s, lists, tuples 
+        and values with an $[nbytes] attribute is reported to the 
+        garbage collector, once while any object holds the value.
+        
+        <p>The <code>toPython()</code> method of #[JSValueRef] returns
+        the Python value held by the object.
+        
+        <p>Instances of classes passed to $[makeConstructor()] also 
+        get the methods of their class.
+        
+        @return (#[JSObjectRef]) the object created
+        @param pythonValue (object) the Python value to hold
         """
         JSLibrary._ensureLibrary()
         _log("JSContextRef.$f(%s)", (self,))
 
-        return _JSValueMakeUndefined(self)
+        if RememberedObjects.pending: RememberedObjects.drain()
+        
+        hostClass = _ConstructorClass.instances.get(type(pythonValue)) or _HostClass.get(type(pythonValue))
+        handle    = _rememberHostValue(self, pythonValue)
+        result    = _JSObjectMake(self, hostClass.jsClass, handle)
+        
+        return result
 
         #----------------------------------------------------------------
     def addBuiltins(self):
@@ -412,18 +855,42 @@ class JSGlobalContextRef(JSContextRef):
     
     <p>These methods call functions defined in 
     &[JSContextRef.h][http://developer.apple.com/documentation/Carbon/Reference/WebKit_JavaScriptCore_Ref/JSContextRef/index.html].
+    
+    <p>The Python functions passed to $[makeFunction()] and
+    $[makeFastFunction()] are kept until the context is released
+    for the last time, that is, once for the $[create()] and once
+    for each $[retain()].
     """
 
     #----------------------------------------------------------------
     @staticmethod
-    def create():
+    def create(globalFunctions=None):
         """Create a new instance of this class.
         
+        <p>The $[globalFunctions] parameter is handled as for the 
+        $[defineNamespace()] method, except that the functions are 
+        defined on the global object itself, at no cost per context
+        after the first.
+        
         @return (#[JSGlobalContextRef]) the new instance
+        
+        @param globalFunctions (dict)
+               Python functions to define as global functions, keyed
+               by the function name
         """
         JSLibrary._ensureLibrary()
         _log("JSGlobalContextRef.$f()")
-        return _JSGlobalContextCreate(None)
+        
+        if not globalFunctions:
+            result = _JSGlobalContextCreate(None)
+        else:
+            namespace = _NamespaceClass.get("global", globalFunctions)
+            result    = _JSGlobalContextCreate(namespace.jsClass)
+        
+        if JSContextRef.protectBuiltins:
+            _ContextState.get(result).captureBuiltins(result)
+        
+        return result
         
     #----------------------------------------------------------------
     def release(self):
@@ -431,7 +898,19 @@ class JSGlobalContextRef(JSContextRef):
         """
         JSLibrary._ensureLibrary()
         _log("JSGlobalContextRef.$f(%s)", (str(self),))
-        return _JSGlobalContextRelease(self)
+        
+        state = _ContextState.find(self)
+        
+        if state and state.retains:
+            state.retains -= 1
+        else:
+            _ContextState.discard(self)
+        
+        result = _JSGlobalContextRelease(self)
+        
+        if RememberedObjects.pending: RememberedObjects.drain()
+        
+        return result
     
     #----------------------------------------------------------------
     def retain(self):
@@ -439,6 +918,9 @@ class JSGlobalContextRef(JSContextRef):
         """
         JSLibrary._ensureLibrary()
         _log("JSGlobalContextRef.$f(%s)", (str(self),))
+        
+        _ContextState.get(self).retains += 1
+        
         return _JSGlobalContextRetain(self)
     
 
@@ -448,7 +930,13 @@ class JSStringRef(ctypes.c_void_p):
     
     <p>These methods call functions defined in 
     &[JSStringRef.h][http://developer.apple.com/documentation/Carbon/Reference/WebKit_JavaScriptCore_Ref/JSStringRef/index.html].
+    
+    <p>The $[utf16Threshold] class variable holds the length at which
+    strings are moved in and out of JavaScriptCore as UTF-16 instead
+    of UTF-8.  The default value is $[256].
     """
+    
+    utf16Threshold = 256
 
     #----------------------------------------------------------------
     @staticmethod
@@ -476,6 +964,30 @@ class JSStringRef(ctypes.c_void_p):
         
         return JSStringRef.create(string)
 
+    #----------------------------------------------------------------
+    @staticmethod
+    def intern(string):
+        """Returns a cached instance of this class for a string.
+
+        Like #[asRef()], but the #[JSStringRef] is looked up in
+        the #[JSStringRefCache] stored in $[JSStringRef.cache],
+        instead of being created.  The result is owned by the
+        cache, so you should *[not] <code>release()</code> it.
+
+        @returns (#[JSStringRef])
+                 the #[JSStringRef] found (or passed in); $[None]
+                 is returned as is
+
+        @param string (str | unicode | #[JSStringRef])
+               the object to convert to a #[JSStringRef]
+        @throws (TypeError)
+                raised if the object is not a string
+        """
+        if string is None: return None
+        if isinstance(string, JSStringRef): return string
+
+        return JSStringRef.cache.get(string)
+
     #----------------------------------------------------------------
     @staticmethod
     def create(string):
@@ -484,6 +996,11 @@ class JSStringRef(ctypes.c_void_p):
         The caller is responsible for freeing this string
         with the #[release()] method when no longer needed.
         
+        <p>$[str] values are passed to JavaScriptCore as UTF-8.
+        $[unicode] values of at least $[JSStringRef.utf16Threshold]
+        characters are passed as UTF-16, which JavaScriptCore can
+        copy directly.
+        
         @returns (#[JSStringRef])
                  the #[JSStringRef] created
                  
@@ -495,18 +1012,30 @@ class JSStringRef(ctypes.c_void_p):
     
         if isinstance(string, str):
             # make sure it's utf-8
-            uniString = unicode(string,  "utf-8" )
-            string    = uniString.encode("utf-8")
+            unicode(string, "utf-8")
         
         elif isinstance(string, unicode):
+            if len(string) >= JSStringRef.utf16Threshold:
+                return JSStringRef._createWithCharacters(string)
+                
             string = string.encode("utf-8")
             
         else:
             raise TypeError, "expecting a string"
             
-        buffer = ctypes.create_string_buffer(string)
+        result = _JSStringCreateWithUTF8CString(string)
+        
+        _log("JSStringRef.$f() -> %s", (result,))
+        
+        return result
+
+    #----------------------------------------------------------------
+    @staticmethod
+    def _createWithCharacters(string):
+        data   = string.encode(_UTF16)
+        chars  = ctypes.cast(data, ctypes.POINTER(JSChar))
         
-        result = _JSStringCreateWithUTF8CString(buffer)
+        result = _JSStringCreateWithCharacters(chars, len(data) // 2)
         
         _log("JSStringRef.$f() -> %s", (result,))
         
@@ -522,6 +1051,9 @@ class JSStringRef(ctypes.c_void_p):
         JSLibrary._ensureLibrary()
         _log("JSStringRef.$f(%s)", (self,))
         
+        if _JSStringGetLength(self) >= JSStringRef.utf16Threshold:
+            return self.toUnicode().encode("utf-8")
+        
         len    = _JSStringGetMaximumUTF8CStringSize(self) + 1
         result = ctypes.create_string_buffer(len)
     
@@ -531,6 +1063,28 @@ class JSStringRef(ctypes.c_void_p):
         
         return result.value
 
+    #----------------------------------------------------------------
+    def toUnicode(self):
+        """Convert this object to a Python unicode string.
+        
+        The characters are copied straight out of the string's
+        UTF-16 buffer, without going through UTF-8.
+        
+        @returns (unicode) the converted string
+        """
+        JSLibrary._ensureLibrary()
+        _log("JSStringRef.$f(%s)", (self,))
+        
+        length = _JSStringGetLength(self)
+        if not length: return u""
+        
+        chars = _JSStringGetCharactersPtr(self)
+        
+        if _WCHAR_IS_JSCHAR:
+            return ctypes.wstring_at(chars, length)
+            
+        return _decodeUTF16(ctypes.string_at(chars, length * 2))
+
     #----------------------------------------------------------------
     def retain(self):
         """Retain this instance.
@@ -550,30 +1104,317 @@ class JSStringRef(ctypes.c_void_p):
         _JSStringRelease(self)
 
 #--------------------------------------------------------------------
-class JSValueRef(ctypes.c_void_p):
-    """Models the JSValueRef type.
-    
-    <p>These methods call functions defined in 
-    &[JSValueRef.h][http://developer.apple.com/documentation/Carbon/Reference/WebKit_JavaScriptCore_Ref/JSValueRef/index.html].
-    
-    This class also defines the following constants, returned
-    from the $[getType()] method.
-    <ul>
-    <li><code>kJSTypeUndefined</code>
-    <li><code>kJSTypeNull</code>
-    <li><code>kJSTypeBoolean</code>
-    <li><code>kJSTypeNumber</code>
-    <li><code>kJSTypeString</code>
-    <li><code>kJSTypeObject</code>
-    </ul>
+class _ReleasingCache(object):
+    """A bounded cache which releases its least recently used entry
+    when full.  Subclasses implement _create(key).
     """
 
-    kJSTypeUndefined = 0
-    kJSTypeNull      = 1
-    kJSTypeBoolean   = 2
+    #----------------------------------------------------------------
+    def __init__(self, maxSize):
+        assert isinstance(maxSize, int), "Expecting an int for the maxSize parameter"
+        assert maxSize > 0,              "Expecting a positive maxSize parameter"
+
+        self.maxSize  = maxSize
+        self.hits     = 0
+        self.misses   = 0
+        self._entries = collections.OrderedDict()
+
+    #----------------------------------------------------------------
+    def __len__(self):
+        return len(self._entries)
+
+    #----------------------------------------------------------------
+    def get(self, key):
+        """Returns the entry for a key, creating it if needed.
+
+        The result is owned by the cache, so you should *[not]
+        <code>release()</code> it.
+        """
+        entries = self._entries
+
+        try:
+            entry = entries.pop(key)
+        except KeyError:
+            entry = self._create(key)
+            self.misses += 1
+
+            while len(entries) >= self.maxSize:
+                entries.popitem(last=False)[1].release()
+        else:
+            self.hits += 1
+
+        entries[key] = entry
+        return entry
+
+    #----------------------------------------------------------------
+    def clear(self):
+        """Releases all the entries in the cache and resets the counters.
+        """
+        _log("%s.$f(%s)", (self.__class__.__name__, len(self._entries)))
+
+        while self._entries:
+            self._entries.popitem()[1].release()
+
+        self.hits   = 0
+        self.misses = 0
+
+#--------------------------------------------------------------------
+class JSStringRefCache(_ReleasingCache):
+    """A bounded cache of #[JSStringRef] instances keyed by string.
+
+    <p>Property names are used over and over again, so the property
+    accessors of #[JSObjectRef] look names up in the instance of
+    this class stored in $[JSStringRef.cache], rather than creating
+    and releasing a #[JSStringRef] on every access.
+
+    <p>$[get(string)] returns the #[JSStringRef] for a string, creating
+    it if needed.  The cache owns the #[JSStringRef] instances it
+    contains, so you should *[not] <code>release()</code> them.  When
+    the cache is full, the least recently used entry is removed and
+    released.  $[clear()] releases all the entries.
+
+    <p>The $[hits] and $[misses] properties count the lookups made
+    against the cache, and can be used to pick a $[maxSize].
+    """
+
+    #----------------------------------------------------------------
+    def __init__(self, maxSize=1024):
+        """Creates a new instance of this class.
+
+        @param maxSize (int)
+               the maximum number of entries to keep
+        """
+        _ReleasingCache.__init__(self, maxSize)
+
+    #----------------------------------------------------------------
+    def _create(self, string):
+        return JSStringRef.create(string)
+
+JSStringRef.cache = JSStringRefCache()
+
+#--------------------------------------------------------------------
+class JSPreparedScript(object):
+    """A script which can be evaluated many times.
+
+    <p>Instances of this class are usually created with the 
+    <code>prepare()</code> method of #[JSContextRef].  The 
+    #[JSStringRef] instances for the script and the source URL are
+    created once and retained until $[release()] is called.
+
+    <p>If the JavaScriptCore library in use exports the
+    $[JSScriptCreateFromString()] function, the script is also 
+    parsed once per context group, instead of on every evaluation.
+    
+    <p>A prepared script is not tied to a context, and can be 
+    evaluated in any context.  The parsed script for a context group
+    keeps the group alive, and is released when the context it was 
+    parsed for is released, or when $[release()] is called.
+    """
+
+    #----------------------------------------------------------------
+    def __init__(self, script, sourceURL=None, startingLineNumber=1):
+        """Creates a new instance of this class.
+
+        @param script             (str | unicode | #[JSStringRef])
+               the script to prepare
+        @param sourceURL          (str | unicode | #[JSStringRef])
+               the name of the script
+        @param startingLineNumber (int)
+               the line of the source the script starts on
+        """
+        JSLibrary._ensureLibrary()
+        _log("JSPreparedScript.$f('%s', '%s', %s)", (script, sourceURL, startingLineNumber))
+        assert isinstance(startingLineNumber, int), "Expecting an int for the startingLineNumber parameter"
+        
+        if not script: 
+            raise TypeError, "Expecting a string for the script parameter"
+            
+        self.startingLineNumber = startingLineNumber
+        self.scriptRef          = JSPreparedScript._retainRef(script)
+        self.sourceURLRef       = JSPreparedScript._retainRef(sourceURL or "")
+        self._scripts           = {}
+
+    #----------------------------------------------------------------
+    @staticmethod
+    def _retainRef(string):
+        if isinstance(string, JSStringRef):
+            string.retain()
+            return string
+            
+        return JSStringRef.create(string)
+
+    #----------------------------------------------------------------
+    def eval(self, context, thisObject=None):
+        """Evaluates this script.
+
+        @returns (#[JSValueRef] | #[JSObjectRef]) 
+                 the value of executing the script; objects are
+                 returned as #[JSObjectRef] instances.
+        
+        @param context    (#[JSContextRef])
+               the context to evaluate the script in
+        @param thisObject (#[JSObjectRef])
+               the object to act as $[this] when the script executes
+        
+        @throws (#[JSException])  
+                raised when a JavaScript exception occurs
+                during the processing of the script
+        """
+        JSLibrary._ensureLibrary()
+        _log("JSPreparedScript.$f(%s, %s)", (context, thisObject))
+        assert isinstance(context, JSContextRef), "Expecting a JSContextRef for the context parameter"
+        if thisObject: assert isinstance(thisObject, JSObjectRef), "Expecting a JSObjectRef for the thisObject parameter"
+        
+        if not self.scriptRef:
+            raise TypeError, "Prepared script has been released"
+
+        exception = JSValueRef()
+        script    = self._compiled(context)
+        
+        if script:
+            result = _JSScriptEvaluate(context, script, thisObject, ctypes.byref(exception))
+        else:
+            result = _JSEvaluateScript(
+                context,
+                self.scriptRef,
+                thisObject,
+                self.sourceURLRef,
+                self.startingLineNumber,
+                ctypes.byref(exception)
+                )
+        
+        if exception.value: 
+            raise JSException, exception
+
+        return _typedValue(context, result)
+
+    #----------------------------------------------------------------
+    def _compiled(self, context):
+        if not (_JSScriptCreateFromString and _JSScriptEvaluate): return None
+        
+        contextGroup = _JSContextGetGroup(context)
+        group        = contextGroup.value
+        
+        try:
+            return self._scripts[group][1]
+        except KeyError:
+            pass
+            
+        errorMessage = JSStringRef()
+        errorLine    = ctypes.c_int(0)
+        
+        script = _JSScriptCreateFromString(
+            contextGroup,
+            self.sourceURLRef,
+            self.startingLineNumber,
+            self.scriptRef,
+            ctypes.byref(errorMessage),
+            ctypes.byref(errorLine)
+            )
+        
+        if errorMessage.value: errorMessage.release()
+        
+        # syntax errors are reported by JSEvaluateScript()
+        if not script: 
+            script = None
+        else:
+            _JSContextGroupRetain(contextGroup)
+            
+        # the group's VM goes away with its last context, so the 
+        # parsed script is dropped when the context is released
+        _ContextState.get(context).scripts.add(self)
+            
+        self._scripts[group] = (contextGroup, script)
+        return script
+        
+    #----------------------------------------------------------------
+    def _releaseGroup(self, group):
+        (contextGroup, script) = self._scripts.pop(group, (None, None))
+        
+        if not script: return
+        
+        _JSScriptRelease(script)
+        _JSContextGroupRelease(contextGroup)
+        
+    #----------------------------------------------------------------
+    def release(self):
+        """Releases the resources held by this instance.
+        """
+        JSLibrary._ensureLibrary()
+        _log("JSPreparedScript.$f()")
+        
+        for group in self._scripts.keys():
+            self._releaseGroup(group)
+        
+        if self.scriptRef:    self.scriptRef.release()
+        if self.sourceURLRef: self.sourceURLRef.release()
+        
+        self.scriptRef    = None
+        self.sourceURLRef = None
+
+#--------------------------------------------------------------------
+class JSPreparedScriptCache(_ReleasingCache):
+    """A bounded cache of #[JSPreparedScript] instances.
+
+    <p>The cache is keyed by the script, source URL and starting line
+    number.  When an instance of this class is stored in the 
+    $[scriptCache] class variable of #[JSContextRef], the 
+    <code>eval()</code> method of #[JSContextRef] looks up scripts
+    passed as strings in the cache, instead of re-creating them on
+    every call.
+
+    <p>The cache owns the #[JSPreparedScript] instances it contains.
+    When it is full, the least recently used entry is removed and
+    released.  $[clear()] releases all the entries.
+    """
+
+    #----------------------------------------------------------------
+    def __init__(self, maxSize=64):
+        """Creates a new instance of this class.
+
+        @param maxSize (int)
+               the maximum number of entries to keep
+        """
+        _ReleasingCache.__init__(self, maxSize)
+
+    #----------------------------------------------------------------
+    def _create(self, key):
+        return JSPreparedScript(*key)
+
+#--------------------------------------------------------------------
+class JSValueRef(ctypes.c_void_p):
+    """Models the JSValueRef type.
+    
+    <p>These methods call functions defined in 
+    &[JSValueRef.h][http://developer.apple.com/documentation/Carbon/Reference/WebKit_JavaScriptCore_Ref/JSValueRef/index.html].
+    
+    This class also defines the following constants, returned
+    from the $[getType()] method.
+    <ul>
+    <li><code>kJSTypeUndefined</code>
+    <li><code>kJSTypeNull</code>
+    <li><code>kJSTypeBoolean</code>
+    <li><code>kJSTypeNumber</code>
+    <li><code>kJSTypeString</code>
+    <li><code>kJSTypeObject</code>
+    </ul>
+    
+    <p>Values returned from $[eval()], $[getProperty()] and 
+    $[getPropertyAtIndex()] keep the type looked up when they were
+    returned, and $[getType()], the $[is]<i>Type</i>$[()] methods 
+    and $[asJSObjectRef()] answer from it without calling into 
+    JavaScriptCore.
+    """
+
+    kJSTypeUndefined = 0
+    kJSTypeNull      = 1
+    kJSTypeBoolean   = 2
     kJSTypeNumber    = 3
     kJSTypeString    = 4
     kJSTypeObject    = 5 
+    
+    # the type of the value, when it is known
+    _type = None
 
     #----------------------------------------------------------------
     def asJSObjectRef(self, context):
@@ -587,6 +1428,11 @@ class JSValueRef(ctypes.c_void_p):
         
         Primitive values and strings cannot be recast.
         
+        <p>Objects returned from $[eval()], $[getProperty()] and
+        $[getPropertyAtIndex()] are already #[JSObjectRef] instances,
+        and are returned as is.  To test the type of a value more 
+        than once, use a #[JSValue], which caches the type.
+        
         @param context (#[JSContextRef]) 
         @throws (TypeError)
                 raised if the object cannot be recast.
@@ -597,13 +1443,30 @@ class JSValueRef(ctypes.c_void_p):
         
         if isinstance(self, JSObjectRef): return self
         
-        type = self.getType(context)
+        type = self._type
+        if type is None: type = _JSValueGetType(context, self)
         
         if type != JSValueRef.kJSTypeObject:
             raise TypeError, "Unable to convert a non-object into a JSObjectRef (type was: %s)" % str(type)
 
         return ctypes.cast(self, JSObjectRef)
     
+    #----------------------------------------------------------------
+    def bind(self, context):
+        """Returns a #[JSValue] for this value and a context.
+        
+        @returns (#[JSValue]) the bound value
+        @param context (#[JSContextRef]) 
+        """
+        JSLibrary._ensureLibrary()
+        _log("JSValueRef.$f(%s, %s)", (self, context))
+        assert isinstance(context, JSContextRef), "Expecting a JSContextRef for the context parameter"
+        
+        result = JSValue(context, self.value)
+        result._type = self._type
+        
+        return result
+    
     #----------------------------------------------------------------
     def getType(self, context):
         """Returns the type of the value.
@@ -617,6 +1480,9 @@ class JSValueRef(ctypes.c_void_p):
         _log("JSValueRef.$f(%s, %s)", (self, context))
         assert isinstance(context, JSContextRef), "Expecting a JSContextRef for the context parameter"
 
+        type = self._type
+        if type is not None: return type
+        
         return _JSValueGetType(context, self)
     
     #----------------------------------------------------------------
@@ -630,7 +1496,10 @@ class JSValueRef(ctypes.c_void_p):
         _log("JSValueRef.$f(%s, %s)", (self, context))
         assert isinstance(context, JSContextRef), "Expecting a JSContextRef for the context parameter"
 
-        return _JSValueIsBoolean(context, self).value
+        type = self._type
+        if type is not None: return type == JSValueRef.kJSTypeBoolean
+        
+        return _JSValueIsBoolean(context, self)
     
     #----------------------------------------------------------------
     def isEqual(self, context, other):
@@ -676,6 +1545,9 @@ class JSValueRef(ctypes.c_void_p):
         _log("JSValueRef.$f(%s, %s)", (self, context))
         assert isinstance(context, JSContextRef), "Expecting a JSContextRef for the context parameter"
 
+        type = self._type
+        if type is not None: return type == JSValueRef.kJSTypeNull
+        
         return _JSValueIsNull(context, self)
     
     #----------------------------------------------------------------
@@ -689,6 +1561,9 @@ class JSValueRef(ctypes.c_void_p):
         _log("JSValueRef.$f(%s, %s)", (self, context))
         assert isinstance(context, JSContextRef), "Expecting a JSContextRef for the context parameter"
 
+        type = self._type
+        if type is not None: return type == JSValueRef.kJSTypeNumber
+        
         return _JSValueIsNumber(context, self)
     
     #----------------------------------------------------------------
@@ -702,6 +1577,9 @@ class JSValueRef(ctypes.c_void_p):
         _log("JSValueRef.$f(%s, %s)", (self, context))
         assert isinstance(context, JSContextRef), "Expecting a JSContextRef for the context parameter"
 
+        type = self._type
+        if type is not None: return type == JSValueRef.kJSTypeObject
+        
         return _JSValueIsObject(context, self)
     
     #----------------------------------------------------------------
@@ -731,6 +1609,9 @@ class JSValueRef(ctypes.c_void_p):
         _log("JSValueRef.$f(%s, %s)", (self, context))
         assert isinstance(context, JSContextRef), "Expecting a JSContextRef for the context parameter"
 
+        type = self._type
+        if type is not None: return type == JSValueRef.kJSTypeString
+        
         return _JSValueIsString(context, self)
     
     #----------------------------------------------------------------
@@ -744,8 +1625,23 @@ class JSValueRef(ctypes.c_void_p):
         _log("JSValueRef.$f(%s, %s)", (self, context))
         assert isinstance(context, JSContextRef), "Expecting a JSContextRef for the context parameter"
 
+        type = self._type
+        if type is not None: return type == JSValueRef.kJSTypeUndefined
+        
         return _JSValueIsUndefined(context, self)
     
+    #----------------------------------------------------------------
+    def _toSimpleValue(self, context):
+        type = self._type
+        if type is None: type = _JSValueGetType(context, self)
+        
+        if type == JSValueRef.kJSTypeNumber:  return _JSValueToNumber(context, self, None)
+        if type == JSValueRef.kJSTypeString:  return self.toUnicode(context)
+        if type == JSValueRef.kJSTypeBoolean: return bool(_JSValueToBoolean(context, self))
+        if type == JSValueRef.kJSTypeObject:  return ctypes.cast(self, JSObjectRef)
+        
+        return None
+    
     #----------------------------------------------------------------
     def protect(self, context):
         """Protect this value from garbage collection.
@@ -788,7 +1684,7 @@ class JSValueRef(ctypes.c_void_p):
     def toObject(self, context):
         """Convert this value to an object.
         
-        @returns (#[JSObject]) the converted value
+        @returns (#[JSObjectRef]) the converted value
         @param context (#[JSContextRef]) 
         """
         JSLibrary._ensureLibrary()
@@ -796,7 +1692,71 @@ class JSValueRef(ctypes.c_void_p):
         assert isinstance(context, JSContextRef), "Expecting a JSContextRef for the context parameter"
 
         result =_JSValueToObject(context, self, None)
-        result.context = context
+        return result
+    
+    #----------------------------------------------------------------
+    def toJSONString(self, context, indent=None):
+        """Convert this value to a JSON string.
+        
+        <p>The value is converted with the engine's $[JSON.stringify()]
+        function, as it was when first used by the bridge, or when
+        the context was created if #[JSContextRef.protectBuiltins] 
+        was set.
+        
+        @returns (unicode) the JSON string, or $[None] for values JSON
+                 cannot represent, like $[undefined] and functions
+        @param context (#[JSContextRef]) 
+        @param indent  (int | str) 
+               passed as the $[space] argument of $[JSON.stringify()]
+        @throws (#[JSException])  
+                raised when the value cannot be converted, for instance 
+                because it contains a cycle
+        """
+        JSLibrary._ensureLibrary()
+        _log("JSValueRef.$f(%s, %s, %s)", (self, context, indent))
+        assert isinstance(context, JSContextRef), "Expecting a JSContextRef for the context parameter"
+        
+        stringify = _ContextState.get(context).function(context, "stringify")
+        
+        args = [self]
+        if indent is not None: 
+            args.extend([_JSValueMakeNull(context), context._makeSimpleValue(indent)])
+        
+        result = _callAsFunction(context, stringify, None, args)
+        
+        if _JSValueIsUndefined(context, result): return None
+        
+        return result.toUnicode(context)
+    
+    #----------------------------------------------------------------
+    def toPython(self, context, depth=None):
+        """Convert this value, and the values it refers to, to Python values.
+        
+        <p>Numbers are converted to floats, strings to unicode strings,
+        booleans to booleans, and $[null] and $[undefined] to $[None].
+        Arrays are converted to lists and other objects to dicts of
+        their enumerable properties.  Functions are not converted; 
+        they are returned as #[JSObjectRef] instances.
+        
+        <p>An object referenced more than once, including by itself,
+        is converted once, and the resulting Python object is shared.
+        
+        <p>Objects nested more than $[depth] levels deep are also
+        returned as #[JSObjectRef] instances, which can be converted 
+        later by calling this method on them.
+        
+        @returns (object) the converted value
+        @param context (#[JSContextRef]) 
+        @param depth   (int) the number of levels of objects to convert
+        """
+        JSLibrary._ensureLibrary()
+        _log("JSValueRef.$f(%s, %s, %s)", (self, context, depth))
+        assert isinstance(context, JSContextRef), "Expecting a JSContextRef for the context parameter"
+        if depth is not None: assert isinstance(depth, int), "Expecting an int for the depth parameter"
+        
+        if depth is None: depth = -1
+        
+        return _PythonConverter(context).convert(self.value, depth)
     
     #----------------------------------------------------------------
     def toStringRef(self, context):
@@ -829,9 +1789,29 @@ class JSValueRef(ctypes.c_void_p):
         ref = self.toStringRef(context)
         result = ref.toString()
         ref.release()
-        
+
         return result
-    
+
+    #----------------------------------------------------------------
+    def toUnicode(self, context):
+        """Convert this value to a unicode string.
+
+        Like #[toString()], but the characters are copied directly
+        out of the temporary #[JSStringRef] instance.
+
+        @returns (unicode) the converted value
+        @param context (#[JSContextRef])
+        """
+        JSLibrary._ensureLibrary()
+        _log("JSValueRef.$f(%s, %s)", (self, context))
+        assert isinstance(context, JSContextRef), "Expecting a JSContextRef for the context parameter"
+
+        ref = self.toStringRef(context)
+        result = ref.toUnicode()
+        ref.release()
+
+        return result
+
     #----------------------------------------------------------------
     def unprotect(self, context):
         """Remove the protect of this value from garbage collection.
@@ -870,6 +1850,64 @@ class JSObjectRef(JSValueRef):
     kJSPropertyAttributeDontEnum   = 1 << 2 
     kJSPropertyAttributeDontDelete = 1 << 3 
 
+    #----------------------------------------------------------------
+    def call(self, context, thisObject, *args):
+        """Calls the object as a function.
+        
+        <p>The arguments may be #[JSValueRef] instances or Python values,
+        which are converted as by the $[makeValue()] method of 
+        #[JSContextRef].
+        
+        @returns (#[JSValueRef]) the value returned from the function
+        @param context    (#[JSContextRef]) 
+        @param thisObject (#[JSObjectRef])
+               the object to act as $[this] in the function, or $[None]
+               to use the global object
+        @param args       (#[JSValueRef] | object)
+               the arguments to pass to the function
+        
+        @throws (#[JSException])  
+                raised when the function throws an exception
+        @throws (TypeError)  
+                raised when the object is not a function
+        """
+        JSLibrary._ensureLibrary()
+        _log("JSObjectRef.$f(%s, %s, %s, %s)", (self, context, thisObject, args))
+        assert isinstance(context, JSContextRef), "Expecting a JSContextRef for the context parameter"
+        if thisObject: assert isinstance(thisObject, JSObjectRef), "Expecting a JSObjectRef for the thisObject parameter"
+        
+        result = _callAsFunction(context, self, thisObject, args)
+        if not result.value: raise TypeError, "Object is not a function"
+        
+        return result
+        
+    #----------------------------------------------------------------
+    def construct(self, context, *args):
+        """Calls the object as a constructor, as with the $[new] operator.
+        
+        <p>The arguments may be #[JSValueRef] instances or Python values,
+        which are converted as by the $[makeValue()] method of 
+        #[JSContextRef].
+        
+        @returns (#[JSObjectRef]) the object constructed
+        @param context    (#[JSContextRef]) 
+        @param args       (#[JSValueRef] | object)
+               the arguments to pass to the constructor
+        
+        @throws (#[JSException])  
+                raised when the constructor throws an exception
+        @throws (TypeError)  
+                raised when the object is not a constructor
+        """
+        JSLibrary._ensureLibrary()
+        _log("JSObjectRef.$f(%s, %s, %s)", (self, context, args))
+        assert isinstance(context, JSContextRef), "Expecting a JSContextRef for the context parameter"
+        
+        result = _callAsConstructor(context, self, args)
+        if not result.value: raise TypeError, "Object is not a constructor"
+        
+        return result
+        
     #----------------------------------------------------------------
     def deleteProperty(self, context, propertyName):
         """Delete the property of an object.
@@ -882,19 +1920,19 @@ class JSObjectRef(JSValueRef):
         _log("JSObjectRef.$f(%s, %s, %s)", (self, context, propertyName))
         assert isinstance(context, JSContextRef), "Expecting a JSContextRef for the context parameter"
         
-        propertyNameRef = JSStringRef.asRef(propertyName)
+        propertyNameRef = JSStringRef.intern(propertyName)
         if not propertyNameRef: raise TypeError, "Expecting a string for the propertyName parameter"
         
         result = _JSObjectDeleteProperty(context, self, propertyNameRef, None)
-        if propertyName != propertyNameRef: propertyNameRef.release()
-        
         return result
         
     #----------------------------------------------------------------
     def getProperty(self, context, propertyName):
         """Return the property of an object.
         
-        @returns (#[JSValueRef]) value of the property
+        @returns (#[JSValueRef] | #[JSObjectRef]) 
+                 value of the property; objects are returned as
+                 #[JSObjectRef] instances.
         @param context      (#[JSContextRef]) 
         @param propertyName (str | unicode | #[JSStringRef])
         """
@@ -902,20 +1940,67 @@ class JSObjectRef(JSValueRef):
         _log("JSObjectRef.$f(%s, %s, %s)", (self, context, propertyName))
         assert isinstance(context, JSContextRef), "Expecting a JSContextRef for the context parameter"
 
-        propertyNameRef = JSStringRef.asRef(propertyName)
+        propertyNameRef = JSStringRef.intern(propertyName)
         if not propertyNameRef: raise TypeError, "Expecting a string for the propertyName parameter"
         
-        result = _JSObjectGetProperty(context, self, propertyNameRef, None)
-        if propertyName != propertyNameRef: propertyNameRef.release()
-        
-        result.context = context
+        result = _raw_JSObjectGetProperty(context, self, propertyNameRef, None)
+        return _typedPointer(context, result)
+
+    #----------------------------------------------------------------
+    def getProperties(self, context, names=None):
+        """Return a number of properties of an object in one call.
+
+        <p>This is equivalent to calling #[getProperty()] for each
+        name, but avoids repeating the per-call overhead of that
+        method.  If $[names] is not passed, all the enumerable
+        properties of the object are returned, and the property
+        name strings from JavaScriptCore are used directly to
+        look up the values.
+
+        @returns (dict) the property names mapped to their values 
+                 (#[JSValueRef] | #[JSObjectRef]), typed as by 
+                 #[getProperty()]
+        @param context (#[JSContextRef])
+        @param names   (list of str | unicode | #[JSStringRef])
+               the names of the properties to return
+        """
+        JSLibrary._ensureLibrary()
+        _log("JSObjectRef.$f(%s, %s, %s)", (self, context, names))
+        assert isinstance(context, JSContextRef), "Expecting a JSContextRef for the context parameter"
+
+        getProperty = _raw_JSObjectGetProperty
+        typed       = _typedPointer
+        result      = {}
+
+        if names is None:
+            propertyNameArrayRef = _JSObjectCopyPropertyNames(context, self)
+
+            count = _JSPropertyNameArrayGetCount(propertyNameArrayRef)
+            for i in xrange(0, count):
+                prop = _JSPropertyNameArrayGetNameAtIndex(propertyNameArrayRef, i)
+                result[prop.toString()] = typed(context, getProperty(context, self, prop, None))
+
+            _JSPropertyNameArrayRelease(propertyNameArrayRef)
+
+            return result
+
+        intern = JSStringRef.intern
+
+        for name in names:
+            propertyNameRef = intern(name)
+            if not propertyNameRef: raise TypeError, "Expecting strings for the names parameter"
+
+            result[name] = typed(context, getProperty(context, self, propertyNameRef, None))
+
         return result
 
     #----------------------------------------------------------------
     def getPropertyAtIndex(self, context, propertyIndex):
         """Return the property of an array.
         
-        @returns (#[JSValueRef]) value of the property
+        @returns (#[JSValueRef] | #[JSObjectRef]) 
+                 value of the property; objects are returned as
+                 #[JSObjectRef] instances.
         @param context       (#[JSContextRef]) 
         @param propertyIndex (int)
         """
@@ -924,9 +2009,8 @@ class JSObjectRef(JSValueRef):
         assert isinstance(context, JSContextRef), "Expecting a JSContextRef for the context parameter"
         assert isinstance(propertyIndex, int),    "Expecting an integer for the propertyIndex parameter"
         
-        result = _JSObjectGetPropertyAtIndex(context, self, propertyIndex, None)
-        result.context = context
-        return result
+        result = _raw_JSObjectGetPropertyAtIndex(context, self, propertyIndex, None)
+        return _typedPointer(context, result)
 
     #----------------------------------------------------------------
     def getPropertyNames(self, context):
@@ -965,109 +2049,1489 @@ class JSObjectRef(JSValueRef):
         assert isinstance(context, JSContextRef), "Expecting a JSContextRef for the context parameter"
 
         result = _JSObjectGetPrototype(context, self)
-        result.context = context
         return result
 
     #----------------------------------------------------------------
     def hasProperty(self, context, propertyName):
         """Return whether the object contains the specified property.
         
-        @returns (boolean) indicator
-        @param context      (#[JSContextRef]) 
-        @param propertyName (str | unicode | #[JSStringRef])
-        """
-        JSLibrary._ensureLibrary()
-        _log("JSObjectRef.$f(%s, %s, %s)", (self, context, propertyName))
-        assert isinstance(context, JSContextRef), "Expecting a JSContextRef for the context parameter"
-
-        propertyNameRef = JSStringRef.asRef(propertyName)
-        if not propertyNameRef: raise TypeError, "Expecting a string for the propertyName parameter"
+        @returns (boolean) indicator
+        @param context      (#[JSContextRef]) 
+        @param propertyName (str | unicode | #[JSStringRef])
+        """
+        JSLibrary._ensureLibrary()
+        _log("JSObjectRef.$f(%s, %s, %s)", (self, context, propertyName))
+        assert isinstance(context, JSContextRef), "Expecting a JSContextRef for the context parameter"
+
+        propertyNameRef = JSStringRef.intern(propertyName)
+        if not propertyNameRef: raise TypeError, "Expecting a string for the propertyName parameter"
+        
+        result = _JSObjectHasProperty(context, self, propertyNameRef)
+        return result
+
+    #----------------------------------------------------------------
+    def toList(self, context):
+        """Return the elements of an array as a Python list.
+        
+        <p>Numbers are returned as floats, strings as unicode strings,
+        booleans as booleans, $[null] and $[undefined] as $[None], 
+        and objects as #[JSObjectRef] instances.  Arrays of at least
+        $[JSContextRef.jsonThreshold] elements which are all finite 
+        numbers, or all strings, are read out of JavaScriptCore as a
+        single JSON string instead of one element at a time.
+        
+        @returns (list) the converted elements
+        @param context (#[JSContextRef]) 
+        """
+        JSLibrary._ensureLibrary()
+        _log("JSObjectRef.$f(%s, %s)", (self, context))
+        assert isinstance(context, JSContextRef), "Expecting a JSContextRef for the context parameter"
+        
+        length = self.getProperty(context, "length").toNumber(context)
+        if length != length: raise TypeError, "Unable to convert an object without a length into a list"
+        
+        length = int(length)
+        
+        if length >= JSContextRef.jsonThreshold:
+            result = _arrayToList(context, self)
+            if result is not None: return result
+        
+        getPropertyAtIndex = _JSObjectGetPropertyAtIndex
+        
+        return [getPropertyAtIndex(context, self, i, None)._toSimpleValue(context) for i in xrange(0, length)]
+
+    #----------------------------------------------------------------
+    def isConstructor(self, context):
+        """Return whether the object is a constructor.
+        
+        @returns (boolean) indicator
+        @param context      (#[JSContextRef]) 
+        """
+        JSLibrary._ensureLibrary()
+        _log("JSObjectRef.$f(%s, %s)", (self, context))
+        assert isinstance(context, JSContextRef), "Expecting a JSContextRef for the context parameter"
+
+        return _JSObjectIsConstructor(context, self)
+
+    #----------------------------------------------------------------
+    def isFunction(self, context):
+        """Return whether the object is a function.
+        
+        @returns (boolean) indicator
+        @param context      (#[JSContextRef]) 
+        """
+        JSLibrary._ensureLibrary()
+        _log("JSObjectRef.$f(%s, %s)", (self, context))
+        assert isinstance(context, JSContextRef), "Expecting a JSContextRef for the context parameter"
+
+        return _JSObjectIsFunction(context, self)
+
+    #----------------------------------------------------------------
+    def setProperty(self, context, propertyName, value, attributes=kJSPropertyAttributeNone):
+        """Set the property of an object.
+        
+        @param context      (#[JSContextRef]) 
+        @param propertyName (str | unicode | #[JSStringRef])
+        @param value        (#[JSValueRef])
+        @param attributes   (int) 
+                            one of the kJSPropertyAttribute defined by this class
+        """
+        JSLibrary._ensureLibrary()
+        _log("JSObjectRef.$f(%s, %s, %s, %s, %s)", (self, context, propertyName, value, attributes))
+        assert isinstance(context, JSContextRef), "Expecting a JSContextRef for the context parameter"
+
+        assert isinstance(context, JSContextRef),       "Expecting a JSContextRef for the context parameter"
+        if value: assert isinstance(value, JSValueRef), "Expecting a JSValueRef for the value parameter"
+        assert isinstance(attributes, int),             "Expecting an integer for the attributes parameter"
+        
+        propertyNameRef = JSStringRef.intern(propertyName)
+        if not propertyNameRef: raise TypeError, "Expecting a string for the propertyName parameter"
+ 
+        _JSObjectSetProperty(context, self, propertyNameRef, value, attributes, None)
+
+    #----------------------------------------------------------------
+    def setProperties(self, context, properties, attributes=kJSPropertyAttributeNone):
+        """Set a number of properties of an object in one call.
+        
+        <p>This is equivalent to calling #[setProperty()] for each
+        property, but avoids repeating the per-call overhead of that
+        method.  The values are converted as by 
+        #[JSContextRef.makeValue()].
+        
+        @param context    (#[JSContextRef]) 
+        @param properties (dict | list of (name, value) pairs)
+                          the properties to set
+        @param attributes (int | dict) 
+                          one of the kJSPropertyAttribute defined by this class,
+                          used for every property, or a dict mapping property
+                          names to those values; properties not in the dict 
+                          use $[kJSPropertyAttributeNone]
+        """
+        JSLibrary._ensureLibrary()
+        _log("JSObjectRef.$f(%s, %s, %s, %s)", (self, context, properties, attributes))
+        assert isinstance(context, JSContextRef), "Expecting a JSContextRef for the context parameter"
+        
+        if hasattr(properties, "iteritems"): 
+            properties = properties.iteritems()
+        
+        attributesFor = None
+        if isinstance(attributes, dict):
+            attributesFor = attributes.get
+            attributes    = JSObjectRef.kJSPropertyAttributeNone
+        else:
+            assert isinstance(attributes, int), "Expecting an integer or dict for the attributes parameter"
+            
+        makeValue   = context._makeValue
+        intern      = JSStringRef.intern
+        setProperty = _JSObjectSetProperty
+        
+        for name, value in properties:
+            # convert the value first; converting it may evict names from the cache
+            value = makeValue(value)
+            
+            propertyNameRef = intern(name)
+            if propertyNameRef is None: raise TypeError, "Expecting strings for the property names"
+            
+            if attributesFor:
+                setProperty(context, self, propertyNameRef, value, attributesFor(name, attributes), None)
+            else:
+                setProperty(context, self, propertyNameRef, value, attributes, None)
+
+    #----------------------------------------------------------------
+    def setPropertyAtIndex(self, context, propertyIndex, value):
+        """Set the property of an array.
+        
+        @param context       (#[JSContextRef]) 
+        @param propertyIndex (int)
+        @param value         (#[JSValueRef])
+        """
+        JSLibrary._ensureLibrary()
+        _log("JSObjectRef.$f(%s, %s, %s, %s)", (self, context, propertyIndex, value))
+        assert isinstance(context, JSContextRef),       "Expecting a JSContextRef for the context parameter"
+        assert isinstance(propertyIndex, int),          "Expecting an integer for the propertyIndex parameter"
+        if value: assert isinstance(value, JSValueRef), "Expecting a JSValueRef for the value parameter"
+        
+        _JSObjectSetPropertyAtIndex(context, self, propertyIndex, value, None)
+
+    #----------------------------------------------------------------
+    def setPrototype(self, context, prototype):
+        """Set the prototype of an object.
+        
+        @param context   (#[JSContextRef]) 
+        @param prototype (#[JSValueRef])
+        """
+        JSLibrary._ensureLibrary()
+        _log("JSObjectRef.$f(%s, %s, %s)", (self, context, prototype))
+        assert isinstance(context, JSContextRef),               "Expecting a JSContextRef for the context parameter"
+        if prototype: assert isinstance(prototype, JSValueRef), "Expecting a JSValueRef for the prototype parameter"
+
+        _JSObjectSetPrototype(context, self, prototype)
+
+#--------------------------------------------------------------------
+class JSValue(object):
+    """A JavaScript value bound to its context.
+    
+    <p>Instances of this class hold the pointer to the value and the
+    context it belongs to in slots, with no per-instance dictionary,
+    so they are smaller than #[JSValueRef] instances, and their 
+    methods don't need to be passed the context.  The type of the
+    value is looked up the first time it is needed, and cached.
+    
+    <p>Instances are created with the $[bind()] method of 
+    #[JSValueRef], and can be passed to the native functions
+    wherever a #[JSValueRef] or #[JSObjectRef] is expected.  The
+    $[ref] property returns the value as a #[JSValueRef], for use
+    with the rest of the API.
+    
+    <p>Like #[JSValueRef] instances, instances of this class do not
+    keep the value from being garbage collected; use $[protect()]
+    for that.
+    """
+    
+    __slots__ = ("_as_parameter_", "context", "_type")
+    
+    #----------------------------------------------------------------
+    def __init__(self, context, pointer):
+        """Creates a new instance of this class.
+        
+        @param context (#[JSContextRef]) the context of the value
+        @param pointer (int) the address of the value
+        """
+        self._as_parameter_ = pointer
+        self.context        = context
+        self._type          = None
+        
+    #----------------------------------------------------------------
+    def __repr__(self):
+        return "JSValue(%s)" % self._as_parameter_
+        
+    #----------------------------------------------------------------
+    def __nonzero__(self):
+        return bool(self._as_parameter_)
+        
+    #----------------------------------------------------------------
+    @property
+    def type(self):
+        """The type of the value, one of the <code>kJSType</code> 
+        constants defined in #[JSValueRef]."""
+        if self._type is None:
+            self._type = _JSValueGetType(self.context, self)
+            
+        return self._type
+        
+    #----------------------------------------------------------------
+    @property
+    def ref(self):
+        """The value as a #[JSValueRef], or a #[JSObjectRef] for objects."""
+        if self.type == JSValueRef.kJSTypeObject:
+            return JSObjectRef(self._as_parameter_)
+            
+        return JSValueRef(self._as_parameter_)
+        
+    #----------------------------------------------------------------
+    def isUndefined(self):
+        """Return whether the value is $[undefined].
+        
+        @returns (boolean) indicator
+        """
+        return self.type == JSValueRef.kJSTypeUndefined
+        
+    #----------------------------------------------------------------
+    def isNull(self):
+        """Return whether the value is $[null].
+        
+        @returns (boolean) indicator
+        """
+        return self.type == JSValueRef.kJSTypeNull
+        
+    #----------------------------------------------------------------
+    def isBoolean(self):
+        """Return whether the value is a boolean.
+        
+        @returns (boolean) indicator
+        """
+        return self.type == JSValueRef.kJSTypeBoolean
+        
+    #----------------------------------------------------------------
+    def isNumber(self):
+        """Return whether the value is a number.
+        
+        @returns (boolean) indicator
+        """
+        return self.type == JSValueRef.kJSTypeNumber
+        
+    #----------------------------------------------------------------
+    def isString(self):
+        """Return whether the value is a string.
+        
+        @returns (boolean) indicator
+        """
+        return self.type == JSValueRef.kJSTypeString
+        
+    #----------------------------------------------------------------
+    def isObject(self):
+        """Return whether the value is an object.
+        
+        @returns (boolean) indicator
+        """
+        return self.type == JSValueRef.kJSTypeObject
+        
+    #----------------------------------------------------------------
+    def toBoolean(self):
+        """Convert this value to a boolean.
+        
+        @returns (boolean) the converted value
+        """
+        return bool(_JSValueToBoolean(self.context, self))
+        
+    #----------------------------------------------------------------
+    def toNumber(self):
+        """Convert this value to a number.
+        
+        @returns (float) the converted value
+        """
+        return _JSValueToNumber(self.context, self, None)
+        
+    #----------------------------------------------------------------
+    def toString(self):
+        """Convert this value to a string.
+        
+        @returns (str) the converted value (utf-8 encoded string)
+        """
+        ref    = _JSValueToStringCopy(self.context, self, None)
+        result = ref.toString()
+        ref.release()
+        
+        return result
+        
+    #----------------------------------------------------------------
+    def toUnicode(self):
+        """Convert this value to a unicode string.
+        
+        @returns (unicode) the converted value
+        """
+        ref    = _JSValueToStringCopy(self.context, self, None)
+        result = ref.toUnicode()
+        ref.release()
+        
+        return result
+        
+    #----------------------------------------------------------------
+    def toPython(self, depth=None):
+        """Convert this value to a Python value, as the 
+        <code>toPython()</code> method of #[JSValueRef] does.
+        
+        @returns (object) the converted value
+        @param depth (int) 
+               the number of levels of objects to convert, or $[None] 
+               to convert all of them
+        """
+        return self.ref.toPython(self.context, depth)
+        
+    #----------------------------------------------------------------
+    def getProperty(self, propertyName):
+        """Return the property of an object.
+        
+        @returns (#[JSValue]) value of the property
+        @param propertyName (str | unicode | #[JSStringRef])
+        @throws (TypeError) raised if the value is not an object
+        """
+        if self.type != JSValueRef.kJSTypeObject: raise TypeError, "Unable to get a property of a non-object"
+        
+        propertyNameRef = JSStringRef.intern(propertyName)
+        if not propertyNameRef: raise TypeError, "Expecting a string for the propertyName parameter"
+        
+        context = self.context
+        return JSValue(context, _raw_JSObjectGetProperty(context, self, propertyNameRef, None))
+        
+    #----------------------------------------------------------------
+    def getPropertyAtIndex(self, propertyIndex):
+        """Return the property of an array.
+        
+        @returns (#[JSValue]) value of the property
+        @param propertyIndex (int)
+        @throws (TypeError) raised if the value is not an object
+        """
+        if self.type != JSValueRef.kJSTypeObject: raise TypeError, "Unable to get a property of a non-object"
+        
+        context = self.context
+        return JSValue(context, _raw_JSObjectGetPropertyAtIndex(context, self, propertyIndex, None))
+        
+    #----------------------------------------------------------------
+    def setProperty(self, propertyName, value):
+        """Set the property of an object.
+        
+        @param propertyName (str | unicode | #[JSStringRef])
+        @param value        (#[JSValue] | #[JSValueRef] | object)
+               the value, Python values are converted as by the 
+               $[makeValue()] method of #[JSContextRef]
+        @throws (TypeError) raised if the value is not an object
+        """
+        if self.type != JSValueRef.kJSTypeObject: raise TypeError, "Unable to set a property of a non-object"
+        
+        context = self.context
+        if not isinstance(value, JSValue): value = context._makeValue(value)
+        
+        propertyNameRef = JSStringRef.intern(propertyName)
+        if not propertyNameRef: raise TypeError, "Expecting a string for the propertyName parameter"
+        
+        _JSObjectSetProperty(context, self, propertyNameRef, value, JSObjectRef.kJSPropertyAttributeNone, None)
+        
+    #----------------------------------------------------------------
+    def protect(self):
+        """Protect this value from garbage collection.
+        """
+        _JSValueProtect(self.context, self)
+        
+    #----------------------------------------------------------------
+    def unprotect(self):
+        """Allow this value to be garbage collected.
+        """
+        _JSValueUnprotect(self.context, self)
+        
+#--------------------------------------------------------------------
+def _typedValue(context, value):
+    """Returns a value returned from the library with its type kept
+    on it, as a JSObjectRef for objects."""
+    if not value: return value
+    
+    type = _JSValueGetType(context, value)
+    
+    if type == JSValueRef.kJSTypeObject: value = JSObjectRef(value.value)
+    
+    value._type = type
+    return value
+
+#--------------------------------------------------------------------
+def _typedPointer(context, pointer):
+    """Returns the value at an address with its type kept on it, as
+    a JSObjectRef for objects."""
+    if not pointer: return JSValueRef(pointer)
+    
+    type = _JSValueGetType(context, pointer)
+    
+    if type == JSValueRef.kJSTypeObject: 
+        result = JSObjectRef(pointer)
+    else:
+        result = JSValueRef(pointer)
+        
+    result._type = type
+    return result
+
+#--------------------------------------------------------------------
+class _PythonConverter(object):
+    """Implements JSValueRef.toPython().
+    """
+    
+    #----------------------------------------------------------------
+    def __init__(self, context):
+        self.context = context
+        self.objects = {}
+        
+        array = context.getGlobalObject().getProperty(context, "Array")
+        self.arrayConstructor = ctypes.cast(array, JSObjectRef)
+        
+    #----------------------------------------------------------------
+    def convert(self, value, depth):
+        context = self.context
+        type    = _JSValueGetType(context, value)
+        
+        if type == JSValueRef.kJSTypeNumber:  return _JSValueToNumber(context, value, None)
+        if type == JSValueRef.kJSTypeString:  return _argumentUnicode(context, value)
+        if type == JSValueRef.kJSTypeBoolean: return bool(_JSValueToBoolean(context, value))
+        if type != JSValueRef.kJSTypeObject:  return None
+        
+        if value in self.objects: return self.objects[value]
+        
+        object = JSObjectRef(value)
+        
+        handle = _HostClass.handle(context, object)
+        if handle: return RememberedObjects.get(handle)
+        
+        if depth == 0: return object
+        if _JSObjectIsFunction(context, object): return object
+        
+        if _JSValueIsInstanceOfConstructor(context, object, self.arrayConstructor, None):
+            return self.convertArray(value, object, depth - 1)
+            
+        return self.convertObject(value, object, depth - 1)
+        
+    #----------------------------------------------------------------
+    def convertArray(self, key, object, depth):
+        context = self.context
+        
+        result = []
+        self.objects[key] = result
+        
+        length = _raw_JSObjectGetProperty(context, object, JSStringRef.intern("length"), None)
+        length = int(_JSValueToNumber(context, length, None))
+        
+        if length >= JSContextRef.jsonThreshold:
+            items = _arrayToList(context, object)
+            
+            if items is not None:
+                result.extend(items)
+                return result
+        
+        convert            = self.convert
+        getPropertyAtIndex = _raw_JSObjectGetPropertyAtIndex
+        
+        for i in xrange(0, length):
+            result.append(convert(getPropertyAtIndex(context, object, i, None), depth))
+            
+        return result
+        
+    #----------------------------------------------------------------
+    def convertObject(self, key, object, depth):
+        context = self.context
+        
+        result = {}
+        self.objects[key] = result
+        
+        convert     = self.convert
+        getProperty = _raw_JSObjectGetProperty
+        
+        propertyNameArrayRef = _JSObjectCopyPropertyNames(context, object)
+        
+        count = _JSPropertyNameArrayGetCount(propertyNameArrayRef)
+        for i in xrange(0, count):
+            prop = _JSPropertyNameArrayGetNameAtIndex(propertyNameArrayRef, i)
+            result[prop.toUnicode()] = convert(getProperty(context, object, prop, None), depth)
+            
+        _JSPropertyNameArrayRelease(propertyNameArrayRef)
+        
+        return result
+        
+#--------------------------------------------------------------------
+class _JSValueConverter(object):
+    """Implements JSContextRef.makeValue().
+    """
+    
+    #----------------------------------------------------------------
+    def __init__(self, context):
+        self.context          = context
+        self.objects          = {}
+        self.pending          = []
+        self.arrayConstructor = None
+        
+    #----------------------------------------------------------------
+    def convert(self, value):
+        context = self.context
+        
+        if _jsonNodeCount(value) >= JSContextRef.jsonThreshold:
+            return context.fromJSON(json.dumps(value))
+        
+        result = self.convertValue(value)
+        
+        # containers are attached to their parents as soon as they're
+        # created, so protecting the root keeps them all from being GC'd
+        _JSValueProtect(context, result)
+        try:
+            self.fill()
+        finally:
+            _JSValueUnprotect(context, result)
+            
+        return result
+        
+    #----------------------------------------------------------------
+    def convertValue(self, value):
+        if not isinstance(value, _CONTAINER_TYPES):
+            return self.context._makeSimpleValue(value)
+            
+        key = id(value)
+        if key in self.objects: return self.objects[key]
+        
+        context = self.context
+        
+        if isinstance(value, dict):
+            object = _JSObjectMake(context, None, None)
+        else:
+            if not self.arrayConstructor:
+                array = context.getGlobalObject().getProperty(context, "Array")
+                self.arrayConstructor = ctypes.cast(array, JSObjectRef)
+                
+            object = _JSObjectCallAsConstructor(context, self.arrayConstructor, 0, None, None)
+        
+        self.objects[key] = object
+        self.pending.append((object, value))
+        
+        return object
+        
+    #----------------------------------------------------------------
+    def fill(self):
+        context = self.context
+        
+        convertValue       = self.convertValue
+        intern             = JSStringRef.intern
+        setProperty        = _JSObjectSetProperty
+        setPropertyAtIndex = _JSObjectSetPropertyAtIndex
+        
+        while self.pending:
+            (object, value) = self.pending.pop()
+            
+            if not isinstance(value, dict):
+                for i, item in enumerate(value):
+                    setPropertyAtIndex(context, object, i, convertValue(item), None)
+                continue
+                
+            for name, item in value.iteritems():
+                item = convertValue(item)
+                
+                if type(name) not in _STRING_TYPES: raise TypeError, "Expecting strings for dict keys"
+                
+                propertyNameRef = intern(name)
+                
+                setProperty(context, object, propertyNameRef, item, JSObjectRef.kJSPropertyAttributeNone, None)
+        
+#--------------------------------------------------------------------
+class _ContextState(object):
+    """Python-side state kept for a global context.
+    
+    Callbacks are passed the JSContextRef of the current execution 
+    state, not the one returned from JSGlobalContextRef.create(), so 
+    the states are keyed by the address of the context's global object.
+    """
+    
+    states = {}
+    
+    #----------------------------------------------------------------
+    @staticmethod
+    def get(context):
+        key   = _JSContextGetGlobalObject(context).value
+        state = _ContextState.states.get(key)
+        
+        if state is None:
+            state = _ContextState()
+            _ContextState.states[key] = state
+            
+        return state
+        
+    #----------------------------------------------------------------
+    @staticmethod
+    def find(context):
+        key = _JSContextGetGlobalObject(context).value
+        return _ContextState.states.get(key)
+        
+    #----------------------------------------------------------------
+    @staticmethod
+    def discard(context):
+        key   = _JSContextGetGlobalObject(context).value
+        state = _ContextState.states.pop(key, None)
+        
+        if state: state.release(context)
+        
+    #----------------------------------------------------------------
+    def __init__(self):
+        self.functions = {}
+        self.callbacks = []
+        self.contexts  = []
+        self.modules   = {}
+        self.scripts   = weakref.WeakSet()
+        self.retains   = 0
+        
+    #----------------------------------------------------------------
+    def function(self, context, name):
+        """Returns one of the builtin functions named in _BUILTIN_NAMES, 
+        capturing them first if that hasn't been done yet."""
+        
+        if not self.functions: self.captureBuiltins(context)
+            
+        return self.functions[name]
+        
+    #----------------------------------------------------------------
+    def captureBuiltins(self, context):
+        """Keeps protected references to the builtin functions the 
+        bridge calls, so scripts which replace JSON or isFinite don't
+        change what the bridge does; called on first use, or when a 
+        context is created if JSContextRef.protectBuiltins is set."""
+        
+        # evaluated directly, to keep it out of JSContextRef.scriptCache
+        script    = JSStringRef.create(_BUILTIN_FUNCTIONS)
+        functions = JSObjectRef(_JSEvaluateScript(context, script, None, None, 1, None).value)
+        script.release()
+        
+        for index, name in enumerate(_BUILTIN_NAMES):
+            function = functions.getPropertyAtIndex(context, index).asJSObjectRef(context)
+            _JSValueProtect(context, function)
+            self.functions[name] = function
+        
+    #----------------------------------------------------------------
+    def release(self, context):
+        for function in self.functions.itervalues():
+            _JSValueUnprotect(context, function)
+            
+        self.functions.clear()
+        
+        # scripts parsed by JSPreparedScript for the context's group
+        group = _JSContextGetGroup(context).value
+        
+        for script in list(self.scripts):
+            script._releaseGroup(group)
+            
+        self.scripts.clear()
+        
+        # contexts created by require()
+        while self.contexts:
+            self.contexts.pop().release()
+            
+        self.modules   = {}
+        self.callbacks = []
+        
+#--------------------------------------------------------------------
+class _HostClass(object):
+    """The JSClassRef used by makePythonObjectRef() for a Python type.
+    
+    The class is created the first time a value of the type is 
+    wrapped, and kept for the life of the process.  Its callbacks
+    find the Python value through the object's private data.
+    
+    All the classes share an empty parent class, which tells objects
+    whose private data is a RememberedObjects handle apart from 
+    objects of other classes.
+    """
+    
+    classes        = {}
+    rootClass      = None
+    rootDefinition = None
+    
+    #----------------------------------------------------------------
+    @staticmethod
+    def root():
+        if not _HostClass.rootClass:
+            definition = JSClassDefinition()
+            definition.className = "PythonObject"
+            
+            _HostClass.rootDefinition = definition
+            _HostClass.rootClass      = _JSClassCreate(ctypes.byref(definition))
+            
+        return _HostClass.rootClass
+        
+    #----------------------------------------------------------------
+    @staticmethod
+    def handle(context, object):
+        """Returns the RememberedObjects handle held by a host object,
+        or None for objects of other classes."""
+        
+        rootClass = _HostClass.rootClass
+        if not rootClass: return None
+        
+        if not _JSValueIsObjectOfClass(context, object, rootClass): return None
+        
+        return _JSObjectGetPrivate(object)
+        
+    #----------------------------------------------------------------
+    @staticmethod
+    def get(pythonType):
+        hostClass = _HostClass.classes.get(pythonType)
+        
+        if not hostClass:
+            hostClass = _HostClass(pythonType)
+            _HostClass.classes[pythonType] = hostClass
+            
+        return hostClass
+        
+    #----------------------------------------------------------------
+    def __init__(self, pythonType):
+        if issubclass(pythonType, (list, tuple)):
+            accessor = _SequenceAccessor
+        elif hasattr(pythonType, "keys") and hasattr(pythonType, "__getitem__"):
+            accessor = _MappingAccessor
+        else:
+            accessor = _AttributeAccessor
+            
+        def hasProperty(context, object, propertyName):
+            try:
+                return accessor.has(_hostValue(object), propertyName.toUnicode())
+            except Exception:
+                return False
+            
+        def getProperty(context, object, propertyName, exception):
+            try:
+                value = accessor.get(_hostValue(object), propertyName.toUnicode())
+                if value is _MISSING: return None
+                
+                return _hostResult(context, value).value
+            except Exception, e:
+                _throwPython(context, exception, e)
+            
+        def setProperty(context, object, propertyName, value, exception):
+            try:
+                return accessor.set(_hostValue(object), propertyName.toUnicode(), _pythonValue(context, value))
+            except Exception, e:
+                _throwPython(context, exception, e)
+                return True
+            
+        def deleteProperty(context, object, propertyName, exception):
+            try:
+                return accessor.delete(_hostValue(object), propertyName.toUnicode())
+            except Exception, e:
+                _throwPython(context, exception, e)
+                return True
+            
+        def getPropertyNames(context, object, propertyNames):
+            # not interned, so large mappings don't flush the cache
+            for name in accessor.names(_hostValue(object)):
+                nameRef = JSStringRef.create(name)
+                _JSPropertyNameAccumulatorAddName(propertyNames, nameRef)
+                nameRef.release()
+            
+        # runs inside the collector, so only queues the handle
+        def finalize(object):
+            handle = _JSObjectGetPrivate(object)
+            if handle: RememberedObjects.forgetLater(handle)
+            
+        self.pythonType = pythonType
+        self.className  = pythonType.__name__
+        
+        # the definition and callbacks must live as long as the class
+        self.definition = JSClassDefinition()
+        self.definition.className        = self.className
+        self.definition.parentClass      = _HostClass.root()
+        self.definition.getProperty      = JSObjectGetPropertyCallback(getProperty)
+        self.definition.setProperty      = JSObjectSetPropertyCallback(setProperty)
+        self.definition.deleteProperty   = JSObjectDeletePropertyCallback(deleteProperty)
+        self.definition.getPropertyNames = JSObjectGetPropertyNamesCallback(getPropertyNames)
+        self.definition.finalize         = JSObjectFinalizeCallback(finalize)
+        
+        if accessor.has:
+            self.definition.hasProperty  = JSObjectHasPropertyCallback(hasProperty)
+        
+        self.jsClass = _JSClassCreate(ctypes.byref(self.definition))
+
+#--------------------------------------------------------------------
+class _ConstructorClass(object):
+    """The JSClassRef used by makeConstructor() for a Python class.
+    
+    The methods of the Python class are in the static function table,
+    and the attributes of instances are handled by the _HostClass for
+    the Python class, which is the parent class.
+    
+    The classes are keyed by the Python class and the class name, and
+    instances holds the first class created for each Python class, 
+    which makePythonObjectRef() uses for instances created in Python.
+    """
+    
+    classes   = {}
+    instances = {}
+    
+    #----------------------------------------------------------------
+    @staticmethod
+    def get(pythonClass, className=None):
+        key              = (pythonClass, className or pythonClass.__name__)
+        constructorClass = _ConstructorClass.classes.get(key)
+        
+        if not constructorClass:
+            constructorClass = _ConstructorClass(*key)
+            _ConstructorClass.classes[key] = constructorClass
+            _ConstructorClass.instances.setdefault(pythonClass, constructorClass)
+            
+        return constructorClass
+        
+    #----------------------------------------------------------------
+    def __init__(self, pythonClass, className):
+        
+        def callAsConstructor(context, constructor, argCount, argRefs, exception):
+            try:
+                args     = [_pythonValue(context, argRefs[i]) for i in xrange(argCount)]
+                instance = pythonClass(*args)
+                handle   = _rememberHostValue(context, instance)
+                result   = _JSObjectMake(context, self.jsClass, handle)
+                
+                return result.value
+            except Exception, e:
+                _throwPython(context, exception, e)
+                
+        self.pythonClass       = pythonClass
+        self.className         = className.encode("utf-8") if isinstance(className, unicode) else className
+        self.parent            = _HostClass.get(pythonClass)
+        self.callAsConstructor = JSObjectCallAsConstructorCallback(callAsConstructor)
+        
+        names = [name for name in dir(pythonClass) if not name.startswith("_") and callable(getattr(pythonClass, name))]
+        
+        # the names and callbacks must live as long as the class
+        self.names     = names
+        self.callbacks = [JSObjectCallAsFunctionCallback(_methodCallback(name)) for name in names]
+        
+        # terminated by an entry with a NULL name
+        self.staticFunctions = (JSStaticFunction * (len(names) + 1))()
+        
+        for i, name in enumerate(names):
+            entry = self.staticFunctions[i]
+            entry.name           = name
+            entry.callAsFunction = self.callbacks[i]
+            entry.attributes     = JSObjectRef.kJSPropertyAttributeDontEnum
+        
+        self.definition = JSClassDefinition()
+        self.definition.className       = self.className
+        self.definition.parentClass     = self.parent.jsClass
+        self.definition.staticFunctions = self.staticFunctions
+        
+        self.jsClass = _JSClassCreate(ctypes.byref(self.definition))
+
+#--------------------------------------------------------------------
+def _methodCallback(name):
+    """Returns the callback for a method of a _ConstructorClass."""
+    
+    def callback(context, function, thisObject, argCount, argRefs, exception):
+        try:
+            handle = _HostClass.handle(context, thisObject) if thisObject else None
+            if not handle: raise TypeError, "%s() called on an object without a Python value" % name
+            
+            args   = [_pythonValue(context, argRefs[i]) for i in xrange(argCount)]
+            result = getattr(RememberedObjects.get(handle), name)(*args)
+            
+            if result is None: return _JSValueMakeUndefined(context).value
+            
+            return _hostResult(context, result).value
+        except Exception, e:
+            _throwPython(context, exception, e)
+            
+    return callback
+
+#--------------------------------------------------------------------
+_MISSING = object()
+
+#--------------------------------------------------------------------
+class _MappingAccessor(object):
+    
+    @staticmethod
+    def has(value, name):
+        return name in value
+        
+    @staticmethod
+    def get(value, name):
+        return value.get(name, _MISSING) if hasattr(value, "get") else value[name]
+        
+    @staticmethod
+    def set(value, name, item):
+        value[name] = item
+        return True
+        
+    @staticmethod
+    def delete(value, name):
+        if name not in value: return False
+        
+        del value[name]
+        return True
+        
+    @staticmethod
+    def names(value):
+        return [name for name in value.keys() if type(name) in _STRING_TYPES]
+
+#--------------------------------------------------------------------
+class _SequenceAccessor(object):
+    
+    @staticmethod
+    def index(value, name):
+        if not name.isdigit(): return -1
+        
+        index = int(name)
+        return index if index < len(value) else -1
+        
+    @staticmethod
+    def has(value, name):
+        return name == "length" or _SequenceAccessor.index(value, name) >= 0
+        
+    @staticmethod
+    def get(value, name):
+        if name == "length": return len(value)
+        
+        index = _SequenceAccessor.index(value, name)
+        return value[index] if index >= 0 else _MISSING
+        
+    @staticmethod
+    def set(value, name, item):
+        index = _SequenceAccessor.index(value, name)
+        if index < 0: return False
+        
+        value[index] = item
+        return True
+        
+    @staticmethod
+    def delete(value, name):
+        return False
+        
+    @staticmethod
+    def names(value):
+        return [str(index) for index in xrange(len(value))]
+
+#--------------------------------------------------------------------
+class _AttributeAccessor(object):
+    
+    # no has(), since testing for an attribute may run a property's
+    # getter; getProperty() is used instead
+    has = None
+    
+    @staticmethod
+    def get(value, name):
+        if name.startswith("_"): return _MISSING
+        
+        result = getattr(value, name, _MISSING)
+        return _MISSING if callable(result) else result
+        
+    @staticmethod
+    def set(value, name, item):
+        if name.startswith("_"): return False
+        
+        setattr(value, name, item)
+        return True
+        
+    @staticmethod
+    def delete(value, name):
+        if not hasattr(value, "__dict__") or name not in value.__dict__: return False
+        
+        delattr(value, name)
+        return True
+        
+    @staticmethod
+    def names(value):
+        return [name for name in dir(value) if _AttributeAccessor.get(value, name) is not _MISSING]
+
+#--------------------------------------------------------------------
+def _extraMemoryCost(value):
+    """Returns the number of bytes held by value which are not 
+    accounted for by the size of its contents."""
+    
+    if isinstance(value, (str, unicode, bytearray)):
+        return sys.getsizeof(value)
+        
+    if isinstance(value, array.array):
+        return value.buffer_info()[1] * value.itemsize
+        
+    nbytes = getattr(value, "nbytes", None)
+    if isinstance(nbytes, (int, long)): return nbytes
+    
+    # the elements which aren't containers are only reachable through
+    # the sequence; containers are reported when they are wrapped
+    if isinstance(value, (list, tuple)):
+        getsizeof = sys.getsizeof
+        return getsizeof(value) + sum([getsizeof(item) for item in value if type(item) in _SIMPLE_TYPES])
+    
+    return 0
+
+#--------------------------------------------------------------------
+def _reportExtraMemoryCost(context, value):
+    cost = _extraMemoryCost(value)
+    
+    if cost >= JSContextRef.extraMemoryThreshold:
+        _JSReportExtraMemoryCost(context, cost)
+
+#--------------------------------------------------------------------
+# the number of host objects holding each Python value, keyed by id()
+_hostValueCounts = {}
+
+#--------------------------------------------------------------------
+def _rememberHostValue(context, value):
+    """Remembers a value held by a host object, reporting its extra
+    memory cost when no other host object holds it."""
+    
+    key   = id(value)
+    count = _hostValueCounts.get(key, 0)
+    
+    _hostValueCounts[key] = count + 1
+    
+    if not count and _JSReportExtraMemoryCost: _reportExtraMemoryCost(context, value)
+    
+    return RememberedObjects.remember(value, _forgetHostValue)
+
+#--------------------------------------------------------------------
+def _forgetHostValue(value):
+    key   = id(value)
+    count = _hostValueCounts.pop(key, 1) - 1
+    
+    if count: _hostValueCounts[key] = count
+
+#--------------------------------------------------------------------
+def _hostValue(object):
+    return RememberedObjects.get(_JSObjectGetPrivate(object))
+
+#--------------------------------------------------------------------
+def _hostResult(context, value):
+    if isinstance(value, JSValueRef): return value
+    if value is None or type(value) in _SIMPLE_TYPES: return context._makeSimpleValue(value)
+    
+    return context.makePythonObjectRef(value)
+
+#--------------------------------------------------------------------
+def _pythonValue(context, value):
+    """Converts a value passed to a host object into Python, returning
+    the Python value held by other host objects as is."""
+    if _JSValueIsObject(context, value):
+        handle = _HostClass.handle(context, ctypes.cast(value, JSObjectRef))
+        if handle: return RememberedObjects.get(handle)
+        
+    return value.toPython(context)
+
+#--------------------------------------------------------------------
+def _throwPython(context, exception, e):
+    message = "%s: %s" % (e.__class__.__name__, e)
+    exception[0] = context._makeSimpleValue(message)
+
+#--------------------------------------------------------------------
+class _ArgumentPool(object):
+    """Argument arrays for calls into JavaScript, reused across calls.
+    
+    An array is taken out of the pool for the duration of a call, so 
+    calls made re-entrantly from callbacks get arrays of their own.
+    """
+    
+    maxCount = 16
+    maxFree  = 4
+    free     = {}
+    
+    #----------------------------------------------------------------
+    @staticmethod
+    def acquire(count):
+        try:
+            return _ArgumentPool.free[count].pop()
+        except (KeyError, IndexError):
+            return (JSValueRef * count)()
+            
+    #----------------------------------------------------------------
+    @staticmethod
+    def release(array):
+        count = len(array)
+        if count > _ArgumentPool.maxCount: return
+        
+        free = _ArgumentPool.free.setdefault(count, [])
+        if len(free) < _ArgumentPool.maxFree: free.append(array)
+
+#--------------------------------------------------------------------
+def _callAsFunction(context, function, thisObject, args):
+    return _call(context, function, thisObject, args, False)
+
+#--------------------------------------------------------------------
+def _callAsConstructor(context, function, args):
+    return _call(context, function, None, args, True)
+
+#--------------------------------------------------------------------
+def _call(context, function, thisObject, args, constructor):
+    count     = len(args)
+    array     = _ArgumentPool.acquire(count) if count else None
+    protected = []
+    exception = JSValueRef()
+    
+    try:
+        # converted strings and containers are only referenced from
+        # the array, which the collector doesn't see, so keep them
+        # alive while the remaining arguments are converted
+        last = count - 1
+        for i, arg in enumerate(args):
+            if not isinstance(arg, JSValueRef):
+                onHeap = type(arg) in _STRING_TYPES or isinstance(arg, _CONTAINER_TYPES)
+                arg    = context._makeValue(arg)
+                
+                if onHeap and i < last:
+                    _JSValueProtect(context, arg)
+                    protected.append(arg)
+                    
+            array[i] = arg
+        
+        if constructor:
+            result = _JSObjectCallAsConstructor(context, function, count, array, ctypes.byref(exception))
+        else:
+            result = _JSObjectCallAsFunction(context, function, thisObject, count, array, ctypes.byref(exception))
+            
+    finally:
+        for arg in protected: _JSValueUnprotect(context, arg)
+        if count: _ArgumentPool.release(array)
+    
+    if exception.value: 
+        raise JSException, exception
+        
+    return result
+
+#--------------------------------------------------------------------
+def _callbackFunction(name, function):
+    """Returns the callback for makeFunction()."""
+    
+    trampoline = getattr(function, "_jsCallback", None)
+    if trampoline: return trampoline
+    
+    def callbackFunction(cbContext, cbFunction, thisObject, argCount, argRefs, exception):
+        args = []
+        
+        for i in xrange(0, argCount):
+            args.append(argRefs[i])
+        
+        result = function(cbContext, cbFunction, thisObject, args)
+        
+        if not result: return None
+        
+        if not isinstance(result,JSValueRef):
+            raise TypeError, "callback function: '%s' - callbacks must return a JSValueRef" % name
+        
+        return result.value
+        
+    return callbackFunction
+
+#--------------------------------------------------------------------
+class _NamespaceClass(object):
+    """A JSClassRef with a static function table, used by 
+    defineNamespace() and JSGlobalContextRef.create().
+    
+    Classes are cached by class name and functions, and kept for the
+    life of the process.
+    """
+    
+    classes = {}
+    
+    #----------------------------------------------------------------
+    @staticmethod
+    def get(className, functions):
+        key       = (className, frozenset(functions.iteritems()))
+        namespace = _NamespaceClass.classes.get(key)
+        
+        if not namespace:
+            namespace = _NamespaceClass(className, functions)
+            _NamespaceClass.classes[key] = namespace
+            
+        return namespace
+        
+    #----------------------------------------------------------------
+    def __init__(self, className, functions):
+        names = sorted(functions)
+        
+        # the names and callbacks must live as long as the class
+        self.names     = [name.encode("utf-8") if isinstance(name, unicode) else name for name in names]
+        self.callbacks = [JSObjectCallAsFunctionCallback(_callbackFunction(name, functions[name])) for name in names]
+        
+        # terminated by an entry with a NULL name
+        self.staticFunctions = (JSStaticFunction * (len(names) + 1))()
+        
+        for i, name in enumerate(self.names):
+            entry = self.staticFunctions[i]
+            entry.name           = name
+            entry.callAsFunction = self.callbacks[i]
+            entry.attributes     = JSObjectRef.kJSPropertyAttributeNone
+        
+        self.className  = className
+        self.definition = JSClassDefinition()
+        self.definition.className       = className
+        self.definition.staticFunctions = self.staticFunctions
+        
+        self.jsClass = _JSClassCreate(ctypes.byref(self.definition))
+
+#--------------------------------------------------------------------
+class _ArgumentView(object):
+    """The arguments passed to a callback, as a read-only sequence."""
+    
+    __slots__ = ("count", "refs")
+    
+    #----------------------------------------------------------------
+    def __init__(self, count, refs):
+        self.count = count
+        self.refs  = refs
+        
+    #----------------------------------------------------------------
+    def __len__(self):
+        return self.count
+        
+    #----------------------------------------------------------------
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            refs = self.refs
+            return [refs[i] for i in xrange(*index.indices(self.count))]
+            
+        if not isinstance(index, (int, long)): 
+            raise TypeError, "argument indices must be integers or slices, not %s" % type(index).__name__
+            
+        if index < 0: index += self.count
+        if not 0 <= index < self.count: raise IndexError, "argument index out of range"
+        
+        return self.refs[index]
+        
+    #----------------------------------------------------------------
+    def __iter__(self):
+        refs = self.refs
+        
+        for i in xrange(self.count):
+            yield refs[i]
+
+#--------------------------------------------------------------------
+def _trampolineResult(context, result):
+    if result is None:                 return _JSValueMakeUndefined(context).value
+    if isinstance(result, JSValueRef): return result.value
+    
+    return context._makeValue(result).value
+
+#--------------------------------------------------------------------
+def _trampoline(function, arity):
+    """Returns the callback for makeFastFunction(), specialised for
+    the arity so no argument list is built per call."""
+    
+    if arity is None:
+        def trampoline(context, cbFunction, thisObject, argCount, argRefs, exception):
+            try:
+                return _trampolineResult(context, function(context, thisObject, _ArgumentView(argCount, argRefs)))
+            except JSException, e:
+                exception[0] = e.value
+            except Exception, e:
+                _throwPython(context, exception, e)
+                
+    elif arity == 0:
+        def trampoline(context, cbFunction, thisObject, argCount, argRefs, exception):
+            try:
+                return _trampolineResult(context, function(context, thisObject))
+            except JSException, e:
+                exception[0] = e.value
+            except Exception, e:
+                _throwPython(context, exception, e)
+                
+    elif arity == 1:
+        def trampoline(context, cbFunction, thisObject, argCount, argRefs, exception):
+            try:
+                return _trampolineResult(context, function(context, thisObject,
+                    argRefs[0] if argCount > 0 else None
+                ))
+            except JSException, e:
+                exception[0] = e.value
+            except Exception, e:
+                _throwPython(context, exception, e)
+                
+    elif arity == 2:
+        def trampoline(context, cbFunction, thisObject, argCount, argRefs, exception):
+            try:
+                return _trampolineResult(context, function(context, thisObject,
+                    argRefs[0] if argCount > 0 else None,
+                    argRefs[1] if argCount > 1 else None
+                ))
+            except JSException, e:
+                exception[0] = e.value
+            except Exception, e:
+                _throwPython(context, exception, e)
+                
+    else:
+        def trampoline(context, cbFunction, thisObject, argCount, argRefs, exception):
+            try:
+                return _trampolineResult(context, function(context, thisObject,
+                    argRefs[0] if argCount > 0 else None,
+                    argRefs[1] if argCount > 1 else None,
+                    argRefs[2] if argCount > 2 else None
+                ))
+            except JSException, e:
+                exception[0] = e.value
+            except Exception, e:
+                _throwPython(context, exception, e)
+                
+    return trampoline
+
+#--------------------------------------------------------------------
+def jsfunction(*argTypes, **options):
+    """Decorator declaring the signature of a Python function to be 
+    passed to $[makeFunction()].
+    
+    <p>The positional arguments are the types of the arguments the 
+    function expects, and the $[returns] option is the type of the
+    value it returns.  The $[varargs] option is the type of any 
+    arguments past the declared ones; without it, they are ignored.
+    The types may be $[str], $[unicode], $[float], $[int], $[bool], 
+    $[dict], $[list], #[JSObjectRef] or #[JSValueRef], the last 
+    meaning the value is passed or returned as is.
+    
+    <p>The decorated function is invoked with the context, the 
+    $[this] object and the converted arguments; arguments which 
+    were not passed from JavaScript are $[None].  Returning $[None]
+    returns $[undefined].  A #[JSException] raised by the function
+    is thrown back into JavaScript; other exceptions are thrown as
+    a string naming the exception class and message.
+    
+<pre>
+@jsfunction(str, int, returns=str)
+def repeat(context, thisObject, string, count):
+    return string * count
+    
+context.makeFunction("repeat", repeat)
+</pre>
+    """
+    returns = options.pop("returns", JSValueRef)
+    varargs = options.pop("varargs", None)
+    
+    if options: raise TypeError, "Unexpected jsfunction options: %s" % ", ".join(options)
+    
+    converters = [_jsfunctionConverter(_ARGUMENT_CONVERTERS, argType) for argType in argTypes]
+    returner   = _jsfunctionConverter(_RESULT_CONVERTERS, returns)
+    
+    if varargs is not None:
+        varargs = _jsfunctionConverter(_ARGUMENT_CONVERTERS, varargs)
+    
+    fixed = list(enumerate(converters))
+    first = len(converters)
+    
+    def decorator(function):
+        
+        def call(context, thisObject, argCount, argRefs):
+            args = [convert(context, argRefs[i]) if i < argCount else None for i, convert in fixed]
+            
+            if varargs and argCount > first:
+                args.extend([varargs(context, argRefs[i]) for i in xrange(first, argCount)])
+                
+            result = function(context, thisObject, *args)
+            
+            if result is None: return _JSValueMakeUndefined(context)
+            
+            return returner(context, result)
+        
+        def trampoline(context, cbFunction, thisObject, argCount, argRefs, exception):
+            try:
+                return call(context, thisObject, argCount, argRefs).value
+            except JSException, e:
+                exception[0] = e.value
+            except Exception, e:
+                _throwPython(context, exception, e)
         
-        result = _JSObjectHasProperty(context, self, propertyNameRef)
-        if propertyName != propertyNameRef: propertyNameRef.release()
+        def wrapper(context, cbFunction, thisObject, args):
+            return call(context, thisObject, len(args), args)
         
-        return result
-
-    #----------------------------------------------------------------
-    def isConstructor(self, context):
-        """Return whether the object is a constructor.
+        wrapper.__name__     = function.__name__
+        wrapper.__doc__      = function.__doc__
+        wrapper._jsCallback  = trampoline
         
-        @returns (boolean) indicator
-        @param context      (#[JSContextRef]) 
-        """
-        JSLibrary._ensureLibrary()
-        _log("JSObjectRef.$f(%s, %s)", (self, context))
-        assert isinstance(context, JSContextRef), "Expecting a JSContextRef for the context parameter"
-
-        return _JSObjectIsConstructor(context, self)
-
-    #----------------------------------------------------------------
-    def isFunction(self, context):
-        """Return whether the object is a function.
+        return wrapper
         
-        @returns (boolean) indicator
-        @param context      (#[JSContextRef]) 
-        """
-        JSLibrary._ensureLibrary()
-        _log("JSObjectRef.$f(%s, %s)", (self, context))
-        assert isinstance(context, JSContextRef), "Expecting a JSContextRef for the context parameter"
+    return decorator
 
-        return _JSObjectIsFunction(context, self)
+#--------------------------------------------------------------------
+def _jsfunctionConverter(converters, valueType):
+    try:
+        return converters[valueType]
+    except (KeyError, TypeError):
+        raise TypeError, "Unsupported jsfunction type: %r" % (valueType,)
 
-    #----------------------------------------------------------------
-    def setProperty(self, context, propertyName, value, attributes=kJSPropertyAttributeNone):
-        """Set the property of an object.
-        
-        @param context      (#[JSContextRef]) 
-        @param propertyName (str | unicode | #[JSStringRef])
-        @param value        (#[JSValueRef])
-        @param attributes   (int) 
-                            one of the kJSPropertyAttribute defined by this class
-        """
-        JSLibrary._ensureLibrary()
-        _log("JSObjectRef.$f(%s, %s, %s, %s, %s)", (self, context, propertyName, value, attributes))
-        assert isinstance(context, JSContextRef), "Expecting a JSContextRef for the context parameter"
+#--------------------------------------------------------------------
+def _argumentString(context, value):
+    ref    = _JSValueToStringCopy(context, value, None)
+    result = ref.toString()
+    ref.release()
+    return result
 
-        assert isinstance(context, JSContextRef),       "Expecting a JSContextRef for the context parameter"
-        if value: assert isinstance(value, JSValueRef), "Expecting a JSValueRef for the value parameter"
-        assert isinstance(attributes, int),             "Expecting an integer for the attributes parameter"
-        
-        propertyNameRef = JSStringRef.asRef(propertyName)
-        if not propertyNameRef: raise TypeError, "Expecting a string for the propertyName parameter"
- 
-        _JSObjectSetProperty(context, self, propertyNameRef, value, attributes, None)
+#--------------------------------------------------------------------
+def _argumentUnicode(context, value):
+    ref    = _JSValueToStringCopy(context, value, None)
+    result = ref.toUnicode()
+    ref.release()
+    return result
+
+#--------------------------------------------------------------------
+def _argumentInt(context, value):
+    number = _JSValueToNumber(context, value, None)
+    
+    if number != number or number in (_INFINITY, -_INFINITY): return 0
+    
+    return int(number)
 
-        if propertyName != propertyNameRef: propertyNameRef.release()
+#--------------------------------------------------------------------
+def _argumentObject(context, value):
+    if not _JSValueIsObject(context, value): return None
+    
+    return ctypes.cast(value, JSObjectRef)
+    
+#--------------------------------------------------------------------
+def _resultString(context, value):
+    ref    = JSStringRef.create(value if type(value) in _STRING_TYPES else str(value))
+    result = _JSValueMakeString(context, ref)
+    ref.release()
+    return result
 
-    #----------------------------------------------------------------
-    def setPropertyAtIndex(self, context, propertyIndex, value):
-        """Set the property of an array.
-        
-        @param context       (#[JSContextRef]) 
-        @param propertyIndex (int)
-        @param value         (#[JSValueRef])
-        """
-        JSLibrary._ensureLibrary()
-        _log("JSObjectRef.$f(%s, %s, %s, %s)", (self, context, propertyIndex, value))
-        assert isinstance(context, JSContextRef),       "Expecting a JSContextRef for the context parameter"
-        assert isinstance(propertyIndex, int),          "Expecting an integer for the propertyIndex parameter"
-        if value: assert isinstance(value, JSValueRef), "Expecting a JSValueRef for the value parameter"
-        
-        _JSObjectSetPropertyAtIndex(context, self, propertyIndex, value, None)
+#--------------------------------------------------------------------
+def _resultValue(context, value):
+    if isinstance(value, JSValueRef): return value
+    
+    return context._makeValue(value)
 
-    #----------------------------------------------------------------
-    def setPrototype(self, context, prototype):
-        """Set the prototype of an object.
-        
-        @param context   (#[JSContextRef]) 
-        @param prototype (#[JSValueRef])
-        """
-        JSLibrary._ensureLibrary()
-        _log("JSObjectRef.$f(%s, %s, %s)", (self, context, prototype))
-        assert isinstance(context, JSContextRef),               "Expecting a JSContextRef for the context parameter"
-        if prototype: assert isinstance(prototype, JSValueRef), "Expecting a JSValueRef for the prototype parameter"
+#--------------------------------------------------------------------
+_ARGUMENT_CONVERTERS = {
+    str:         _argumentString,
+    unicode:     _argumentUnicode,
+    float:       lambda context, value: _JSValueToNumber(context, value, None),
+    int:         _argumentInt,
+    bool:        lambda context, value: bool(_JSValueToBoolean(context, value)),
+    dict:        lambda context, value: value.toPython(context),
+    list:        lambda context, value: value.toPython(context),
+    JSObjectRef: _argumentObject,
+    JSValueRef:  lambda context, value: value,
+}
+
+_RESULT_CONVERTERS = {
+    str:         _resultString,
+    unicode:     _resultString,
+    float:       lambda context, value: _JSValueMakeNumber(context, float(value)),
+    int:         lambda context, value: _JSValueMakeNumber(context, int(value)),
+    bool:        lambda context, value: _JSValueMakeBoolean(context, bool(value)),
+    dict:        _resultValue,
+    list:        _resultValue,
+    JSObjectRef: _resultValue,
+    JSValueRef:  _resultValue,
+}
 
-        _JSObjectSetPrototype(context, self, prototype)
+#--------------------------------------------------------------------
+def _arrayToList(context, array):
+    function = _ContextState.get(context).function(context, "arrayToJSON")
+    result   = _callAsFunction(context, function, None, [array])
+    
+    if not _JSValueIsString(context, result): return None
+    
+    return json.loads(result.toUnicode(context), parse_int=float)
 
 #--------------------------------------------------------------------
 class JSException(Exception):
@@ -1099,10 +3563,111 @@ JSClassAttribute     = ctypes.c_int
 JSPropertyAttribute  = ctypes.c_int
 JSClassAttributes    = ctypes.c_uint
 JSPropertyAttributes = ctypes.c_uint
-JSChar               = ctypes.c_wchar
+JSChar               = ctypes.c_uint16
+
+_UTF16           = "utf-16-le" if sys.byteorder == "little" else "utf-16-be"
+_WCHAR_IS_JSCHAR = ctypes.sizeof(ctypes.c_wchar) == ctypes.sizeof(JSChar)
+
+#-------------------------------------------------------------------
+# decodes UTF-16 in the native byte order; JavaScript strings may 
+# contain lone surrogates, which the codec rejects, so those strings
+# are decoded a code unit at a time, keeping the lone surrogates
+#-------------------------------------------------------------------
+def _decodeUTF16(data):
+    try:
+        return data.decode(_UTF16)
+    except UnicodeDecodeError:
+        pass
+        
+    units  = array.array("H", data)
+    count  = len(units)
+    result = []
+    i      = 0
+    
+    while i < count:
+        unit = units[i]
+        i   += 1
+        
+        if 0xD800 <= unit < 0xDC00 and i < count and 0xDC00 <= units[i] < 0xE000:
+            result.append(unichr(0x10000 + ((unit - 0xD800) << 10) + (units[i] - 0xDC00)))
+            i += 1
+        else:
+            result.append(unichr(unit))
+            
+    return u"".join(result)
+
+#-------------------------------------------------------------------
+_NUMBER_TYPES       = frozenset([int, long, float])
+_STRING_TYPES       = frozenset([str, unicode])
+_CONTAINER_TYPES    = (dict, list, tuple)
+_JSON_TYPES         = frozenset([type(None), bool, int, long, float, str, unicode])
+_TRAMPOLINE_ARITIES = frozenset([0, 1, 2, 3])
+_SIMPLE_TYPES       = frozenset([bool, int, long, float, str, unicode])
+_INFINITY           = float("inf")
+
+#-------------------------------------------------------------------
+# returns the number of values in a structure, if it can be 
+# converted by JSON without losing anything, otherwise -1
+#-------------------------------------------------------------------
+def _jsonNodeCount(value):
+    if not isinstance(value, _CONTAINER_TYPES): return -1
+    
+    seen  = set()
+    stack = [value]
+    count = 0
+    
+    while stack:
+        value = stack.pop()
+        count += 1
+        
+        valueType = type(value)
+        if valueType is float and (math.isinf(value) or math.isnan(value)): return -1
+        if valueType in _JSON_TYPES: continue
+        
+        if valueType not in _CONTAINER_TYPES: return -1
+        if id(value) in seen:                 return -1
+        seen.add(id(value))
+        
+        if valueType is dict:
+            for key in value:
+                if type(key) not in _STRING_TYPES: return -1
+            stack.extend(value.itervalues())
+        else:
+            stack.extend(value)
+        
+    return count
+
+#-------------------------------------------------------------------
+# the engine's functions used by the bridge, captured when a context
+# is created, before user code can replace them; arrayToJSON returns
+# the JSON for an array if it's all finite numbers or all strings, 
+# otherwise null
+#-------------------------------------------------------------------
+_BUILTIN_NAMES = ["parse", "stringify", "arrayToJSON"]
+
+_BUILTIN_FUNCTIONS = """(function(parse, stringify, isFinite) {
+    function arrayToJSON(array) {
+        var type = typeof array[0]
+        
+        if ((type != "number") && (type != "string")) return null
+        
+        for (var i=0; i<array.length; i++) {
+            var value = array[i]
+            
+            if (typeof value != type) return null
+            if ((type == "number") && !isFinite(value)) return null
+        }
+        
+        return stringify(array)
+    }
+    
+    return [parse, stringify, arrayToJSON]
+})(JSON.parse, JSON.stringify, isFinite)"""
 
 class JSPropertyNameAccumulatorRef(ctypes.c_void_p): pass
 class JSClassRef(ctypes.c_void_p): pass
+class JSContextGroupRef(ctypes.c_void_p): pass
+class JSScriptRef(ctypes.c_void_p): pass
 class JSPropertyNameArrayRef(ctypes.c_void_p): pass
 
 #-------------------------------------------------------------------
@@ -1269,19 +3834,95 @@ class JSLibrary:
     
     <p>If this variable is set, it overrides the $[libraryName] variable
     setting and is used as the complete name of the library.
+    
+    <p>$[fastMode] indicates whether the fast versions of the most
+    frequently called methods are used, as by $[setFastMode()], once
+    the library is loaded.  The default value is $[False].
+    
+    <p>$[binding] selects how the native functions are bound, and
+    must be set before the library is loaded.  With $["prototype"],
+    each function is created from a ctypes prototype with parameter
+    flags.  With $["argtypes"], the functions exported by the library
+    are used directly, with their $[argtypes] and $[restype] set,
+    which avoids the parameter flag processing ctypes does on every
+    call.  The default value is $["prototype"].
+    
+    <p>$[lazyBinding] indicates whether each native function is bound
+    the first time it is called, rather than all of them when the 
+    library is loaded.  Short running programs typically only use a
+    few of the functions, and start faster with lazy binding; long
+    running programs can set it to $[False] before the library is
+    loaded, to bind all the functions up front and find any that are
+    missing from the library right away.  The default value is 
+    $[True].
     """
 
-    libraryName = "JavaScriptCore"
-    libraryPath = None
-    _library    = None
+    libraryName     = "JavaScriptCore"
+    libraryPath     = None
+    fastMode        = False
+    binding         = "prototype"
+    lazyBinding     = True
+    _library        = None
+    _checkedMethods = None
+    _BINDINGS       = ("prototype", "argtypes")
 
     #----------------------------------------------------------------
     @staticmethod
     def _ensureLibrary():
         if JSLibrary._library: return
         
+        if JSLibrary.binding not in JSLibrary._BINDINGS:
+            raise Exception, "unknown binding '%s', expecting one of: %s" % (JSLibrary.binding, ", ".join(JSLibrary._BINDINGS))
+        
         JSLibrary.getLibrary()
         JSLibrary._loadLibrary()
+        
+        if JSLibrary.fastMode: JSLibrary.setFastMode(True)
+    
+    #----------------------------------------------------------------
+    @staticmethod
+    def setFastMode(fast=True):
+        """Switch between the checked and fast versions of the most
+        frequently called methods.
+        
+        <p>The checked versions of methods like 
+        $[JSValueRef.toNumber()] and $[JSContextRef.makeUndefined()] 
+        make sure the library is loaded, log the call and check their
+        arguments before calling the native function; for methods
+        this simple, that costs more than the native function call.
+        The fast versions skip all three, and call the native function
+        directly, so they should only be used with code that is known
+        to pass the right types of arguments.
+        
+        <p>Calling this method with $[False] puts the checked versions
+        back, for example to debug a problem with logging enabled.  
+        This method loads the library if it is not already loaded.
+        
+        @param fast (boolean) 
+               whether to use the fast versions of the methods
+        """
+        JSLibrary._ensureLibrary()
+        _log("JSLibrary.$f(%s)", (fast,))
+        
+        JSLibrary.fastMode = fast
+        
+        if fast:
+            if JSLibrary._checkedMethods: return
+            
+            checked = []
+            for cls, name, function in _fastMethods():
+                checked.append((cls, name, cls.__dict__[name]))
+                setattr(cls, name, function)
+                
+            JSLibrary._checkedMethods = checked
+            
+        else:
+            if not JSLibrary._checkedMethods: return
+            
+            for cls, name, function in JSLibrary._checkedMethods:
+                setattr(cls, name, function)
+                
+            JSLibrary._checkedMethods = None
     
     #----------------------------------------------------------------
     @staticmethod
@@ -1305,23 +3946,72 @@ class JSLibrary:
 
     #-------------------------------------------------------------------
     @staticmethod
-    def _defineFunction(name, resType, parms):
-        """define a function named 'name'
+    def _defineFunction(name, resType, parms, optional=False, raw=False):
+        """define the library function 'name' as the module global
+        '_' + name
+        
+        parms should be a sequence of pairs of:
+        
+        (type, name)
         
-        parms should be a sequence of sequences of:
+        all of them input parameters; with the "prototype" binding 
+        they become the ctypes parameter flags, with the "argtypes"
+        binding only the types are used
         
-        (type, flags, name, defaultValue)
+        if optional is True and the library does not export the 
+        function, the function is defined as None
         
-        per the ctypes conventions
+        if raw is True, a second global named '_raw_' + name is also
+        defined for the same library function, with a restype of
+        c_void_p, so it returns the resulting pointer as an int (or
+        None) instead of as an instance of resType; it is used by 
+        internal code which wraps the result itself, like 
+        _typedPointer()
+        
+        if JSLibrary.lazyBinding is True, the functions are defined as
+        _LazyFunction instances, which bind the function when first used
         """
         
-        types      = [ptype      for ptype, pname in parms]
+        if JSLibrary.lazyBinding:
+            globals()["_" + name] = _LazyFunction("_" + name, name, resType, parms, optional)
+            
+            if raw:
+                globals()["_raw_" + name] = _LazyFunction("_raw_" + name, name, ctypes.c_void_p, parms, optional)
+                
+            return
+        
+        try:
+            function = JSLibrary._bindFunction(name, resType, parms)
+            
+            if raw:
+                rawFunction = JSLibrary._bindFunction(name, ctypes.c_void_p, parms)
+                
+        except AttributeError:
+            if not optional: raise
+            function    = None
+            rawFunction = None
+        
+        globals()["_" + name] = function
+        
+        if raw:
+            globals()["_raw_" + name] = rawFunction
+
+    #-------------------------------------------------------------------
+    @staticmethod
+    def _bindFunction(name, resType, parms):
+        types = [ptype for ptype, pname in parms]
+        
+        if JSLibrary.binding == "argtypes":
+            function = JSLibrary._library[name]
+            function.argtypes = types
+            function.restype  = resType
+            return function
+            
         paramFlags = [(1, pname) for ptype, pname in parms]
         
         prototype = ctypes.CFUNCTYPE(resType, *types)
-        function  = prototype((name, JSLibrary._library), tuple(paramFlags))
         
-        globals()["_" + name] = function
+        return prototype((name, JSLibrary._library), tuple(paramFlags))
 
     #----------------------------------------------------------------
     @staticmethod
@@ -1355,10 +4045,62 @@ class JSLibrary:
             (JSContextRef,                    "ctx"), 
         ))
         
+        #===================================================================
+        # JSBasePrivate.h - not exported by all versions of the library
+        #===================================================================
+        
+        #-------------------------------------------------------------------
+        JSLibrary._defineFunction("JSReportExtraMemoryCost", None, (
+            (JSContextRef,                    "ctx"), 
+            (ctypes.c_size_t,                 "size"), 
+        ), optional=True)
+        
+        #===================================================================
+        # JSScriptRefPrivate.h - not exported by all versions of the library
+        #===================================================================
+        
+        #-------------------------------------------------------------------
+        JSLibrary._defineFunction("JSScriptCreateFromString", JSScriptRef, (
+            (JSContextGroupRef,               "contextGroup"), 
+            (JSStringRef,                     "url"), 
+            (ctypes.c_int,                    "startingLineNumber"), 
+            (JSStringRef,                     "source"), 
+            (ctypes.POINTER(JSStringRef),     "errorMessage"), 
+            (ctypes.POINTER(ctypes.c_int),    "errorLine"), 
+        ), optional=True)
+        
+        #-------------------------------------------------------------------
+        JSLibrary._defineFunction("JSScriptEvaluate", JSValueRef, (
+            (JSContextRef,                    "ctx"), 
+            (JSScriptRef,                     "script"), 
+            (JSValueRef,                      "thisValue"), 
+            (ctypes.POINTER(JSValueRef),      "exception"), 
+        ), optional=True)
+        
+        #-------------------------------------------------------------------
+        JSLibrary._defineFunction("JSScriptRelease", None, (
+            (JSScriptRef,                     "script"), 
+        ), optional=True)
+        
         #===================================================================
         # JSContextRef
         #===================================================================
         
+        #-------------------------------------------------------------------
+        JSLibrary._defineFunction("JSContextGetGroup", JSContextGroupRef, (
+            (JSContextRef,                    "ctx"), 
+        ))
+        
+        #-------------------------------------------------------------------
+        JSLibrary._defineFunction("JSContextGroupRetain", JSContextGroupRef, (
+            (JSContextGroupRef,               "group"), 
+        ))
+        
+        #-------------------------------------------------------------------
+        JSLibrary._defineFunction("JSContextGroupRelease", None, (
+            (JSContextGroupRef,               "group"), 
+        ))
+        
         #-------------------------------------------------------------------
         JSLibrary._defineFunction("JSContextGetGlobalObject", JSObjectRef, (
             (JSContextRef,                    "ctx"), 
@@ -1442,7 +4184,7 @@ class JSLibrary:
             (JSObjectRef,                     "object"), 
             (JSStringRef,                     "propertyName"), 
             (ctypes.POINTER(JSValueRef),      "exception"), 
-        ))
+        ), raw=True)
         
         #-------------------------------------------------------------------
         JSLibrary._defineFunction("JSObjectGetPropertyAtIndex", JSValueRef, (
@@ -1450,7 +4192,7 @@ class JSLibrary:
             (JSObjectRef,                     "object"), 
             (ctypes.c_uint,                   "propertyIndex"), 
             (ctypes.POINTER(JSValueRef),      "exception"), 
-        ))
+        ), raw=True)
         
         #-------------------------------------------------------------------
         JSLibrary._defineFunction("JSObjectGetPrototype", JSValueRef, (
@@ -1770,6 +4512,171 @@ class JSLibrary:
             (JSContextRef,                    "ctx"), 
             (JSValueRef,                      "value"), 
         ))
+        
+        #-------------------------------------------------------------------
+        # the fast methods reference the functions bound above, so they
+        # are rebuilt when the functions are rebound
+        #-------------------------------------------------------------------
+        if JSLibrary._checkedMethods:
+            for cls, name, function in _fastMethods():
+                setattr(cls, name, function)
+
+#-------------------------------------------------------------------
+class _LazyFunction(object):
+    """Stands in for a native function until it is first used.
+    
+    The first call binds the function, and replaces this object in 
+    the module's globals with it; references to this object taken 
+    before then keep working, by calling through to the function.
+    A missing optional function is bound as None, and this object
+    tests as false.
+    """
+    
+    __slots__ = ("key", "name", "resType", "parms", "optional", "function")
+    
+    #----------------------------------------------------------------
+    def __init__(self, key, name, resType, parms, optional):
+        self.key      = key
+        self.name     = name
+        self.resType  = resType
+        self.parms    = parms
+        self.optional = optional
+        self.function = _MISSING
+        
+    #----------------------------------------------------------------
+    def bind(self):
+        if self.function is not _MISSING: return self.function
+        
+        try:
+            function = JSLibrary._bindFunction(self.name, self.resType, self.parms)
+        except AttributeError:
+            if not self.optional: raise
+            function = None
+            
+        self.function = function
+        
+        if globals().get(self.key) is self:
+            globals()[self.key] = function
+            
+        return function
+        
+    #----------------------------------------------------------------
+    def __call__(self, *args):
+        function = self.function
+        if function is _MISSING: function = self.bind()
+        
+        return function(*args)
+        
+    #----------------------------------------------------------------
+    def __nonzero__(self):
+        return self.bind() is not None
+        
+    #----------------------------------------------------------------
+    def __repr__(self):
+        return "<lazy native function %s>" % self.name
+        
+#-------------------------------------------------------------------
+def _bound(function):
+    if isinstance(function, _LazyFunction): return function.bind()
+    
+    return function
+
+#-------------------------------------------------------------------
+def _fastMethods():
+    """Returns the fast versions of methods used by 
+    JSLibrary.setFastMode(), as (class, name, function) tuples.
+    
+    The native functions are resolved here, once, and referenced from
+    the closures, so the fast versions don't look them up per call; 
+    lazily bound functions are bound now.  JSLibrary._loadLibrary()
+    calls this again when fast mode is on, so rebinding the native 
+    functions doesn't leave the fast versions calling the old ones.
+    """
+    getGlobalObject = _bound(_JSContextGetGlobalObject)
+    getType         = _bound(_JSValueGetType)
+    isBoolean       = _bound(_JSValueIsBoolean)
+    isNull          = _bound(_JSValueIsNull)
+    isNumber        = _bound(_JSValueIsNumber)
+    isObject        = _bound(_JSValueIsObject)
+    isString        = _bound(_JSValueIsString)
+    isUndefined     = _bound(_JSValueIsUndefined)
+    isStrictEqual   = _bound(_JSValueIsStrictEqual)
+    makeBoolean     = _bound(_JSValueMakeBoolean)
+    makeNull        = _bound(_JSValueMakeNull)
+    makeNumber      = _bound(_JSValueMakeNumber)
+    makeUndefined   = _bound(_JSValueMakeUndefined)
+    protect         = _bound(_JSValueProtect)
+    unprotect       = _bound(_JSValueUnprotect)
+    toBoolean       = _bound(_JSValueToBoolean)
+    toNumber        = _bound(_JSValueToNumber)
+    getProperty     = _bound(_raw_JSObjectGetProperty)
+    getPropertyAt   = _bound(_raw_JSObjectGetPropertyAtIndex)
+    hasProperty     = _bound(_JSObjectHasProperty)
+    setProperty     = _bound(_JSObjectSetProperty)
+    intern          = JSStringRef.intern
+    typed           = _typedPointer
+    
+    #----------------------------------------------------------------
+    def _isType(isType, jsType):
+        # answers from the type kept on the value, as JSValueRef does
+        def fastIsType(self, context):
+            type = self._type
+            if type is None: return isType(context, self)
+            
+            return type == jsType
+            
+        return fastIsType
+        
+    #----------------------------------------------------------------
+    def fastGetType(self, context):
+        type = self._type
+        if type is None: return getType(context, self)
+        
+        return type
+        
+    #----------------------------------------------------------------
+    def _interned(propertyName):
+        propertyNameRef = intern(propertyName)
+        if not propertyNameRef: raise TypeError, "Expecting a string for the propertyName parameter"
+        
+        return propertyNameRef
+        
+    #----------------------------------------------------------------
+    def fastGetProperty(self, context, propertyName):
+        return typed(context, getProperty(context, self, _interned(propertyName), None))
+        
+    def fastGetPropertyAtIndex(self, context, propertyIndex):
+        return typed(context, getPropertyAt(context, self, propertyIndex, None))
+        
+    def fastHasProperty(self, context, propertyName):
+        return hasProperty(context, self, _interned(propertyName))
+        
+    def fastSetProperty(self, context, propertyName, value, attributes=JSObjectRef.kJSPropertyAttributeNone):
+        setProperty(context, self, _interned(propertyName), value, attributes, None)
+        
+    return [
+        (JSContextRef, "getGlobalObject",    lambda self:                 getGlobalObject(self)),
+        (JSContextRef, "makeBoolean",        lambda self, value:          makeBoolean(self, value)),
+        (JSContextRef, "makeNull",           lambda self:                 makeNull(self)),
+        (JSContextRef, "makeNumber",         lambda self, number:         makeNumber(self, number)),
+        (JSContextRef, "makeUndefined",      lambda self:                 makeUndefined(self)),
+        (JSValueRef,   "getType",            fastGetType),
+        (JSValueRef,   "isBoolean",          _isType(isBoolean,   JSValueRef.kJSTypeBoolean)),
+        (JSValueRef,   "isNull",             _isType(isNull,      JSValueRef.kJSTypeNull)),
+        (JSValueRef,   "isNumber",           _isType(isNumber,    JSValueRef.kJSTypeNumber)),
+        (JSValueRef,   "isObject",           _isType(isObject,    JSValueRef.kJSTypeObject)),
+        (JSValueRef,   "isString",           _isType(isString,    JSValueRef.kJSTypeString)),
+        (JSValueRef,   "isUndefined",        _isType(isUndefined, JSValueRef.kJSTypeUndefined)),
+        (JSValueRef,   "isStrictEqual",      lambda self, context, other: isStrictEqual(context, self, other)),
+        (JSValueRef,   "protect",            lambda self, context:        protect(context, self)),
+        (JSValueRef,   "unprotect",          lambda self, context:        unprotect(context, self)),
+        (JSValueRef,   "toBoolean",          lambda self, context:        toBoolean(context, self)),
+        (JSValueRef,   "toNumber",           lambda self, context:        toNumber(context, self, None)),
+        (JSObjectRef,  "getProperty",        fastGetProperty),
+        (JSObjectRef,  "getPropertyAtIndex", fastGetPropertyAtIndex),
+        (JSObjectRef,  "hasProperty",        fastHasProperty),
+        (JSObjectRef,  "setProperty",        fastSetProperty),
+    ]
 
 #-------------------------------------------------------------------
 # code for main entry point below
@@ -1864,56 +4771,52 @@ def _parseArgs():
     return (scripts, arguments, useRepl)
 
 #-------------------------------------------------------------------------------
-def _jsfunc_print(context, function, thisObject, args):
-    print "".join([arg.toString(context) for arg in args])
-    
-    return context.makeUndefined()
+@jsfunction(varargs=str)
+def _jsfunc_print(context, thisObject, *args):
+    print "".join(args)
 
 #-------------------------------------------------------------------------------
-def _jsfunc_python_exec(context, function, thisObject, args):
+@jsfunction(str)
+def _jsfunc_python_exec(context, thisObject, ifile):
 
-    undefined = context.makeUndefined()
-    
-    if len(args) == 0: return undefined
+    if ifile is None: return
 
-    ifile = args[0].toString(context)
-    
     execfile(ifile, globals(), { "context" : context })
-    
-    return undefined
 
 
 #-------------------------------------------------------------------------------
-require_modules = {}
+@jsfunction(str)
+def _jsfunc_require(context, thisObject, modFileName):
 
-def _jsfunc_require(context, function, thisObject, args):
-    undefined = context.makeUndefined()
+    if modFileName is None: return
 
-    if len(args) == 0: return undefined
-
-    modFileName = args[0].toString(context)
     if not os.path.exists(modFileName): 
         print "Unabled to load module '%s': not found" % modFileName
-        return undefined
+        return
 
     modFile = open(modFileName)
     modFileContents = modFile.read()
     modFile.close()
     
-    if modFileName in require_modules:
-        return require_modules[modFileName]
+    # modules are shared by the context and the module contexts it
+    # creates, and are released along with the context
+    state = _ContextState.get(context)
+    
+    if modFileName in state.modules:
+        return state.modules[modFileName]
         
     module = context.eval("({})")
-    require_modules[modFileName] = module
+    state.modules[modFileName] = module
+    
+    modContext = JSGlobalContextRef.create(_BUILTINS)
+    state.contexts.append(modContext)
+    _ContextState.get(modContext).modules = state.modules
     
-    modContext = JSGlobalContextRef.create()
     modGlobal  = modContext.getGlobalObject()
     modGlobal.protect(modContext)
     
     modGlobal.setProperty(modContext, "exports", module)
     
-    _register_builtins(modContext)
-    
     modContext.eval(modFileContents, None, modFileName)
     
     return module
@@ -1922,12 +4825,12 @@ def _jsfunc_require(context, function, thisObject, args):
 #-------------------------------------------------------------------------------
 def _handleJSException(e, context):
 
-    type = e.value.getType(context)
-    if type != JSValueRef.kJSTypeObject:
-        print "Exception thrown: value=%s" % e.value.toString(context)
+    value = e.value.bind(context)
+    if not value.isObject():
+        print "Exception thrown: value=%s" % value.toString()
         return
     
-    e = e.value.asJSObjectRef(context)
+    e = value.ref
     
     def getDefault(context, obj, property, default):
         if not obj.hasProperty(context, property):
@@ -1955,19 +4858,21 @@ def _handleJSException(e, context):
         
     print
 
+#-------------------------------------------------------------------------------
+_BUILTINS = {
+    "print":       _jsfunc_print,
+    "python_exec": _jsfunc_python_exec,
+    "require":     _jsfunc_require,
+}
+
 #-------------------------------------------------------------------------------
 def _register_builtins(context):
     globalObject = context.getGlobalObject()
     globalObject.protect(context)
     
-    function = context.makeFunction(  "print", _jsfunc_print)
-    globalObject.setProperty(context, "print", function)
-    
-    function = context.makeFunction(  "python_exec", _jsfunc_python_exec)
-    globalObject.setProperty(context, "python_exec", function)
-    
-    function = context.makeFunction(  "require", _jsfunc_require)
-    globalObject.setProperty(context, "require", function)
+    for name, function in _BUILTINS.iteritems():
+        function = context.makeFunction(  name, function)
+        globalObject.setProperty(context, name, function)
 
     globalObject.unprotect(context)
     
@@ -1985,35 +4890,21 @@ def _main():
     #---------------------------------------------------------------
     # start processing        
     #---------------------------------------------------------------
-    context = JSGlobalContextRef.create()
+    context = JSGlobalContextRef.create(_BUILTINS)
     
     globalObject = context.getGlobalObject()
     
-    #---------------------------------------------------------------
-    # add builtins
-    #---------------------------------------------------------------
-    _register_builtins(context)
-    
     #---------------------------------------------------------------
     # add arguments
     #---------------------------------------------------------------
-    jsArgs = context.eval("[]").asJSObjectRef(context)
-    jsArgs.protect(context)
-    
     if len(scripts) > 0:
         executable = scripts[-1].filename
     else:
         executable = "<stdin>"
         
-    val = JSStringRef.create(executable)
-    jsArgs.setPropertyAtIndex(context, 0, context.makeString(val))
-    val.release()
+    jsArgs = context.makeArray([executable] + arguments)
+    jsArgs.protect(context)
     
-    for i, argument in enumerate(arguments):
-        val = JSStringRef.create(argument)
-        jsArgs.setPropertyAtIndex(context, i+1, context.makeString(val))
-        val.release()
-        
     globalObject.setProperty(context, "arguments", jsArgs)
     jsArgs.unprotect(context)
     
@@ -2023,10 +4914,7 @@ def _main():
     jsEnv = context.eval("({})").asJSObjectRef(context)
     jsEnv.protect(context)
 
-    for key, val in os.environ.iteritems():
-        val = JSStringRef.create(val)
-        jsEnv.setProperty(context, key, context.makeString(val))
-        val.release()
+    jsEnv.setProperties(context, os.environ)
     
     globalObject.setProperty(context, "environment", jsEnv)
     jsEnv.unprotect(context)
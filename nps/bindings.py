@@ -0,0 +1,66 @@
+#!/usr/bin/env python
+
+#-------------------------------------------------------------------
+# compares the "prototype" and "argtypes" bindings of the native
+# functions, call for call; see JSLibrary.binding
+#-------------------------------------------------------------------
+
+import os
+import sys
+import time
+
+lib_path = os.path.abspath(os.path.join(os.path.dirname(sys.argv[0]), "../lib"))
+if lib_path not in sys.path: sys.path.insert(0, lib_path)
+
+import nitro_pie
+from nitro_pie import *
+
+#-------------------------------------------------------------------
+def run(function, calls=200000):
+    start = time.time()
+    for i in xrange(calls):
+        function()
+        
+    return calls / (time.time() - start)
+
+#-------------------------------------------------------------------
+def bind(binding):
+    # rebinds the native functions of the already loaded library
+    JSLibrary.binding = binding
+    JSLibrary._loadLibrary()
+    
+#-------------------------------------------------------------------
+context = JSGlobalContextRef.create()
+
+number = context.makeNumber(42)
+object = context.eval("({a: 1, b: [1, 2, 3]})")
+number.protect(context)
+object.protect(context)
+
+name = JSStringRef.create("a")
+
+calls = [
+    ("JSValueMakeUndefined",    lambda: nitro_pie._JSValueMakeUndefined(context)),
+    ("JSValueToNumber",         lambda: nitro_pie._JSValueToNumber(context, number, None)),
+    ("JSValueGetType",          lambda: nitro_pie._JSValueGetType(context, number)),
+    ("JSObjectGetProperty",     lambda: nitro_pie._JSObjectGetProperty(context, object, name, None)),
+    ("raw JSObjectGetProperty", lambda: nitro_pie._raw_JSObjectGetProperty(context, object, name, None)),
+    ("getProperty()",           lambda: object.getProperty(context, "a")),
+    ("toPython()",              lambda: object.toPython(context)),
+]
+
+for label, function in calls:
+    bind("prototype")
+    prototype = run(function)
+    
+    bind("argtypes")
+    argtypes = run(function)
+    
+    print "%-24s prototype: %10.0f calls/sec argtypes: %10.0f calls/sec %6.2fx" % (label, prototype, argtypes, argtypes / prototype)
+
+bind("prototype")
+
+name.release()
+number.unprotect(context)
+object.unprotect(context)
+context.release()
@@ -0,0 +1,60 @@
+#!/usr/bin/env python
+
+#-------------------------------------------------------------------
+# compares JSContextRef.makeFastFunction() against makeFunction()
+#-------------------------------------------------------------------
+
+import os
+import sys
+import time
+
+lib_path = os.path.abspath(os.path.join(os.path.dirname(sys.argv[0]), "../lib"))
+if lib_path not in sys.path: sys.path.insert(0, lib_path)
+
+from nitro_pie import *
+
+#-------------------------------------------------------------------
+def emit(context, function, thisObject, args):
+    return args[0]
+
+#-------------------------------------------------------------------
+def emit_view(context, thisObject, args):
+    return args[0]
+
+#-------------------------------------------------------------------
+def emit_1(context, thisObject, value):
+    return value
+
+#-------------------------------------------------------------------
+def emit_none(context, thisObject, value):
+    return None
+
+#-------------------------------------------------------------------
+def run(context, function, calls=100000):
+    context.getGlobalObject().setProperty(context, "emit", function)
+    
+    script = "for (var i = 0; i < %d; i++) emit(i, 'x')" % calls
+    
+    start = time.time()
+    context.eval(script)
+    
+    return calls / (time.time() - start)
+
+#-------------------------------------------------------------------
+context = JSGlobalContextRef.create()
+
+functions = [
+    ("makeFunction",          context.makeFunction("emit", emit)),
+    ("fast, args view",       context.makeFastFunction("emit", emit_view)),
+    ("fast, arity 1",         context.makeFastFunction("emit", emit_1, 1)),
+    ("fast, arity 1, None",   context.makeFastFunction("emit", emit_none, 1)),
+]
+
+baseline = None
+
+for name, function in functions:
+    rate     = run(context, function)
+    baseline = baseline or rate
+    print "%-20s %10.0f calls/sec %6.2fx" % (name, rate, rate / baseline)
+
+context.release()
@@ -0,0 +1,53 @@
+#!/usr/bin/env python
+
+#-------------------------------------------------------------------
+# compares the per-call overhead of the checked and fast versions
+# of simple methods; see JSLibrary.setFastMode()
+#-------------------------------------------------------------------
+
+import os
+import sys
+import time
+
+lib_path = os.path.abspath(os.path.join(os.path.dirname(sys.argv[0]), "../lib"))
+if lib_path not in sys.path: sys.path.insert(0, lib_path)
+
+from nitro_pie import *
+
+#-------------------------------------------------------------------
+def run(function, calls=200000):
+    start = time.time()
+    for i in xrange(calls):
+        function()
+        
+    return (time.time() - start) * 1000000 / calls
+
+#-------------------------------------------------------------------
+context = JSGlobalContextRef.create()
+
+number = context.makeNumber(42)
+object = context.eval("({a: 1})")
+number.protect(context)
+object.protect(context)
+
+calls = [
+    ("makeUndefined()",  lambda: context.makeUndefined()),
+    ("toNumber()",       lambda: number.toNumber(context)),
+    ("isObject()",       lambda: object.isObject(context)),
+    ("getProperty()",    lambda: object.getProperty(context, "a")),
+]
+
+for name, function in calls:
+    JSLibrary.setFastMode(False)
+    checked = run(function)
+    
+    JSLibrary.setFastMode(True)
+    fast = run(function)
+    
+    print "%-20s checked: %6.2f usec/call fast: %6.2f usec/call %6.2fx" % (name, checked, fast, checked / fast)
+
+JSLibrary.setFastMode(False)
+
+number.unprotect(context)
+object.unprotect(context)
+context.release()
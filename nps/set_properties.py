@@ -0,0 +1,49 @@
+#!/usr/bin/env python
+
+#-------------------------------------------------------------------
+# compares JSObjectRef.setProperties() against a setProperty() loop
+#-------------------------------------------------------------------
+
+import os
+import sys
+import time
+
+lib_path = os.path.abspath(os.path.join(os.path.dirname(sys.argv[0]), "../lib"))
+if lib_path not in sys.path: sys.path.insert(0, lib_path)
+
+from nitro_pie import *
+
+#-------------------------------------------------------------------
+def per_key(context, object, fields):
+    for key, val in fields.iteritems():
+        val = JSStringRef.create(val)
+        object.setProperty(context, key, context.makeString(val))
+        val.release()
+
+#-------------------------------------------------------------------
+def bulk(context, object, fields):
+    object.setProperties(context, fields)
+
+#-------------------------------------------------------------------
+def run(context, function, fields, seconds=2):
+    count = 0
+    start = time.time()
+    
+    while time.time() - start < seconds:
+        object = context.eval("({})").asJSObjectRef(context)
+        function(context, object, fields)
+        count += 1
+        
+    return count / (time.time() - start)
+
+#-------------------------------------------------------------------
+context = JSGlobalContextRef.create()
+
+for fieldCount in [10, 50, 200]:
+    fields = dict(("field_%d" % i, "value %d" % i) for i in xrange(fieldCount))
+    
+    for name, function in [("per_key", per_key), ("bulk", bulk)]:
+        rate = run(context, function, fields)
+        print "%3d fields: %-8s %10.0f objects/sec" % (fieldCount, name, rate)
+
+context.release()
@@ -0,0 +1,42 @@
+#!/usr/bin/env python
+
+#-------------------------------------------------------------------
+# compares the time to start up and evaluate one expression, with
+# lazy and eager binding of the native functions; see 
+# JSLibrary.lazyBinding
+#-------------------------------------------------------------------
+
+import os
+import sys
+import time
+import subprocess
+
+lib_path = os.path.abspath(os.path.join(os.path.dirname(sys.argv[0]), "../lib"))
+
+script = """
+import sys
+sys.path.insert(0, %r)
+
+import nitro_pie
+nitro_pie.JSLibrary.lazyBinding = %s
+
+sys.argv = ["nitro_pie.py", "-e", "1"]
+nitro_pie._main()
+"""
+
+#-------------------------------------------------------------------
+def run(lazyBinding, runs=20):
+    command = [sys.executable, "-c", script % (lib_path, lazyBinding)]
+    
+    start = time.time()
+    for i in xrange(runs):
+        subprocess.check_call(command, stdout=open(os.devnull, "w"))
+        
+    return (time.time() - start) * 1000 / runs
+
+#-------------------------------------------------------------------
+eager = run(False)
+lazy  = run(True)
+
+print "eager binding: %6.1f msec per run" % eager
+print "lazy binding:  %6.1f msec per run" % lazy
@@ -23,17 +23,9 @@
 # 
 #-------------------------------------------------------------------
 
-def jsfunc_join(context, function, thisObject, args):
-    undefined = context.makeUndefined()
-
-    string = "".join([arg.toString(context) for arg in args])
-    
-    ref    = JSStringRef.create(string)
-    result = context.makeString(ref)
-    
-    ref.release()
-    
-    return result
+@jsfunction(varargs=str, returns=str)
+def jsfunc_join(context, thisObject, *args):
+    return "".join(args)
     
 function = context.makeFunction(None, jsfunc_join)
 context.getGlobalObject().setProperty(context, "join", function)
@@ -32,6 +32,14 @@ import unittest
 lib_path = os.path.abspath(os.path.join(os.path.dirname(sys.argv[0]), "../lib"))
 if lib_path not in sys.path: sys.path.insert(0, lib_path)
 
+#-------------------------------------------------------------------
+# an optional argument selects the binding to test, for example:
+#    python test_all.py argtypes
+#-------------------------------------------------------------------
+if len(sys.argv) > 1:
+    import nitro_pie
+    nitro_pie.JSLibrary.binding = sys.argv[1]
+
 suite  = unittest.TestSuite()
 result = unittest.TestResult()
 runner = unittest.TextTestRunner(verbosity=2)
@@ -54,6 +62,25 @@ test_tos
 test_iss
 test_shell
 test_require
+test_string_ref_cache
+test_strings
+test_arrays
+test_to_python
+test_make_value
+test_json
+test_prepared_scripts
+test_call
+test_fast_functions
+test_context_state
+test_jsfunction
+test_python_objects
+test_namespaces
+test_constructors
+test_remembered_objects
+test_js_value
+test_typed_values
+test_fast_mode
+test_lazy_binding
 """.split()
 
 modules = [__import__(moduleName) for moduleName in moduleNames]
@@ -0,0 +1,127 @@
+#!/usr/bin/env python
+
+#-------------------------------------------------------------------
+# The MIT License
+# 
+# Copyright (c) 2009 Patrick Mueller
+# 
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+# 
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+# 
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+# THE SOFTWARE.
+#
+#-------------------------------------------------------------------
+
+
+import os
+import sys
+
+lib_path = os.path.abspath(os.path.join(os.path.dirname(sys.argv[0]), "../lib"))
+if lib_path not in sys.path: sys.path.insert(0, lib_path)
+
+import unittest
+
+from nitro_pie import *
+from test_utils import *
+
+#-------------------------------------------------------------------
+class Test(unittest.TestCase):
+    
+    #---------------------------------------------------------------
+    def setUp(self):
+        self.ctx = JSGlobalContextRef.create()
+        
+    def tearDown(self):
+        self.ctx.release()
+
+    #---------------------------------------------------------------
+    def test_to_list_small(self):
+        ctx = self.ctx
+        
+        arr = ctx.eval("[1, 'a', true, null, undefined, {x: 1}]").asJSObjectRef(ctx)
+        
+        result = arr.toList(ctx)
+        self.assertEqual([1.0, u"a", True, None, None], result[:5])
+        self.assertTrue(isinstance(result[5], JSObjectRef))
+        self.assertEqual(1, result[5].getProperty(ctx, "x").toNumber(ctx))
+        
+        self.assertEqual([], ctx.eval("[]").asJSObjectRef(ctx).toList(ctx))
+        
+    #---------------------------------------------------------------
+    def test_to_list_large(self):
+        ctx = self.ctx
+        
+        count = JSContextRef.jsonThreshold * 2
+        
+        arr = ctx.eval("var a = []; for (var i=0; i<%d; i++) a.push(i / 2); a" % count).asJSObjectRef(ctx)
+        self.assertEqual([i / 2.0 for i in xrange(count)], arr.toList(ctx))
+        
+        arr = ctx.eval("var a = []; for (var i=0; i<%d; i++) a.push('s' + i); a" % count).asJSObjectRef(ctx)
+        self.assertEqual([u"s%d" % i for i in xrange(count)], arr.toList(ctx))
+        
+        arr = ctx.eval("a[1] = NaN; a").asJSObjectRef(ctx)
+        result = arr.toList(ctx)
+        self.assertEqual(count, len(result))
+        self.assertTrue(result[1] != result[1])
+        
+    #---------------------------------------------------------------
+    def test_to_list_not_array(self):
+        ctx = self.ctx
+        
+        self.assertRaises(TypeError, ctx.eval("({})").asJSObjectRef(ctx).toList, ctx)
+        
+    #---------------------------------------------------------------
+    def test_make_array_small(self):
+        ctx = self.ctx
+        
+        arr = ctx.makeArray([1, "a", True, None, ctx.makeUndefined()])
+        
+        self.assertEqual(5,   arr.getProperty(ctx, "length").toNumber(ctx))
+        self.assertEqual(1,   arr.getPropertyAtIndex(ctx, 0).toNumber(ctx))
+        self.assertEqual("a", arr.getPropertyAtIndex(ctx, 1).toString(ctx))
+        self.assertTrue(arr.getPropertyAtIndex(ctx, 2).toBoolean(ctx))
+        self.assertTrue(arr.getPropertyAtIndex(ctx, 3).isNull(ctx))
+        self.assertTrue(arr.getPropertyAtIndex(ctx, 4).isUndefined(ctx))
+        
+    #---------------------------------------------------------------
+    def test_make_array_large(self):
+        ctx = self.ctx
+        
+        count   = JSContextRef.jsonThreshold * 2
+        numbers = [i * 1.5 for i in xrange(count)]
+        strings = tuple([u"\u00e9%d\u2028" % i for i in xrange(count)])
+        
+        self.assertEqual(numbers,       ctx.makeArray(numbers).toList(ctx))
+        self.assertEqual(list(strings), ctx.makeArray(strings).toList(ctx))
+        
+    #---------------------------------------------------------------
+    def test_make_array_survives_gc(self):
+        ctx = self.ctx
+        
+        # the JSValueRef keeps the elements from being passed as JSON, so
+        # they are set one at a time, and the allocations made while 
+        # converting them run the collector while the array is built
+        count = JSContextRef.jsonThreshold * 20
+        items = [u"s%d" % i for i in xrange(count)]
+        
+        arr = ctx.makeArray([ctx.makeUndefined()] + items)
+        ctx.garbageCollect()
+        
+        self.assertEqual([None] + items, arr.toList(ctx))
+        
+#-------------------------------------------------------------------
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,118 @@
+#!/usr/bin/env python
+
+#-------------------------------------------------------------------
+# The MIT License
+# 
+# Copyright (c) 2009 Patrick Mueller
+# 
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+# 
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+# 
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+# THE SOFTWARE.
+#
+#-------------------------------------------------------------------
+
+
+import os
+import sys
+
+lib_path = os.path.abspath(os.path.join(os.path.dirname(sys.argv[0]), "../lib"))
+if lib_path not in sys.path: sys.path.insert(0, lib_path)
+
+import unittest
+
+from nitro_pie import *
+from test_utils import *
+
+#-------------------------------------------------------------------
+class Test(unittest.TestCase):
+    
+    #---------------------------------------------------------------
+    def setUp(self):
+        self.ctx = JSGlobalContextRef.create()
+        
+    def tearDown(self):
+        self.ctx.release()
+
+    #---------------------------------------------------------------
+    def test_call(self):
+        ctx = self.ctx
+        
+        add = ctx.eval("(function(a, b) { return a + b })").asJSObjectRef(ctx)
+        
+        self.assertEqual(3,    add.call(ctx, None, 1, 2).toNumber(ctx))
+        self.assertEqual("ab", add.call(ctx, None, "a", "b").toString(ctx))
+        self.assertEqual(5,    add.call(ctx, None, ctx.makeNumber(2), 3).toNumber(ctx))
+        
+        result = add.call(ctx, None).toNumber(ctx)
+        self.assertTrue(result != result)
+        
+        for i in xrange(100):
+            self.assertEqual(i * 2, add.call(ctx, None, i, i).toNumber(ctx))
+        
+    #---------------------------------------------------------------
+    def test_call_converts_arguments(self):
+        ctx = self.ctx
+        
+        join = ctx.eval("(function() { return JSON.stringify(Array.prototype.slice.call(arguments)) })").asJSObjectRef(ctx)
+        
+        result = join.call(ctx, None, None, True, [1, "x"], {"a": u"\u00e9"}, "s")
+        self.assertEqual(u'[null,true,[1,"x"],{"a":"\u00e9"},"s"]', result.toUnicode(ctx))
+        
+        self.assertRaises(TypeError, join.call, ctx, None, object())
+        
+    #---------------------------------------------------------------
+    def test_call_this_object(self):
+        ctx = self.ctx
+        
+        o   = ctx.eval("({a: 42})").asJSObjectRef(ctx)
+        get = ctx.eval("(function() { return this.a })").asJSObjectRef(ctx)
+        
+        self.assertEqual(42, get.call(ctx, o).toNumber(ctx))
+        self.assertTrue(get.call(ctx, None).isUndefined(ctx))
+        
+    #---------------------------------------------------------------
+    def test_call_exceptions(self):
+        ctx = self.ctx
+        
+        thrower = ctx.eval("(function(message) { throw new Error(message) })").asJSObjectRef(ctx)
+        self.assertRaises(JSException, thrower.call, ctx, None, "oops")
+        
+        o = ctx.eval("({})").asJSObjectRef(ctx)
+        self.assertRaises(TypeError, o.call, ctx, None)
+        
+    #---------------------------------------------------------------
+    def test_construct(self):
+        ctx = self.ctx
+        
+        Point = ctx.eval("(function Point(x, y) { this.x = x; this.y = y })").asJSObjectRef(ctx)
+        
+        point = Point.construct(ctx, 1, 2)
+        self.assertTrue(isinstance(point, JSObjectRef))
+        self.assertEqual({"x": 1, "y": 2}, point.toPython(ctx))
+        
+        Array = ctx.eval("Array").asJSObjectRef(ctx)
+        self.assertEqual([1.0, 2.0, 3.0], Array.construct(ctx, 1, 2, 3).toList(ctx))
+        
+        thrower = ctx.eval("(function() { throw 1 })").asJSObjectRef(ctx)
+        self.assertRaises(JSException, thrower.construct, ctx)
+        
+        o = ctx.eval("({})").asJSObjectRef(ctx)
+        self.assertRaises(TypeError, o.construct, ctx)
+        
+#-------------------------------------------------------------------
+if __name__ == '__main__':
+    unittest.main()
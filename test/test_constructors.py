@@ -0,0 +1,138 @@
+#!/usr/bin/env python
+
+#-------------------------------------------------------------------
+# The MIT License
+# 
+# Copyright (c) 2009 Patrick Mueller
+# 
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+# 
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+# 
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+# THE SOFTWARE.
+#
+#-------------------------------------------------------------------
+
+
+import os
+import sys
+
+lib_path = os.path.abspath(os.path.join(os.path.dirname(sys.argv[0]), "../lib"))
+if lib_path not in sys.path: sys.path.insert(0, lib_path)
+
+import unittest
+
+from nitro_pie import *
+from test_utils import *
+
+#-------------------------------------------------------------------
+class Counter(object):
+    
+    def __init__(self, start=0, step=1):
+        self.count = start
+        self.step  = step
+        
+    def increment(self):
+        self.count += self.step
+        return self.count
+        
+    def add(self, other):
+        return Counter(self.count + other.count, self.step)
+        
+    def reset(self):
+        self.count = 0
+        
+    def fail(self):
+        raise ValueError, "failed"
+
+#-------------------------------------------------------------------
+class Test(unittest.TestCase):
+    
+    #---------------------------------------------------------------
+    def setUp(self):
+        self.ctx = JSGlobalContextRef.create()
+        
+        constructor = self.ctx.makeConstructor("Counter", Counter)
+        self.ctx.getGlobalObject().setProperty(self.ctx, "Counter", constructor)
+        
+    def tearDown(self):
+        self.ctx.release()
+
+    #---------------------------------------------------------------
+    def test_construct(self):
+        ctx = self.ctx
+        
+        counter = ctx.eval("new Counter(10, 5)")
+        python  = counter.toPython(ctx)
+        
+        self.assertTrue(isinstance(python, Counter))
+        self.assertEqual(10, python.count)
+        self.assertEqual(5,  python.step)
+        
+        self.assertTrue(ctx.eval("new Counter() instanceof Counter").toBoolean(ctx))
+        self.assertEqual(0, ctx.eval("new Counter().count").toNumber(ctx))
+        
+    #---------------------------------------------------------------
+    def test_methods(self):
+        ctx = self.ctx
+        
+        result = ctx.eval("var c = new Counter(1); c.increment(); c.increment()")
+        self.assertEqual(3, result.toNumber(ctx))
+        
+        self.assertTrue(ctx.eval("c.reset()").isUndefined(ctx))
+        self.assertEqual(0, ctx.eval("c.count").toNumber(ctx))
+        
+        ctx.eval("c.count = 7")
+        self.assertEqual(7, ctx.eval("c").toPython(ctx).count)
+        
+    #---------------------------------------------------------------
+    def test_instances_as_arguments_and_results(self):
+        ctx = self.ctx
+        
+        result = ctx.eval("var sum = new Counter(1).add(new Counter(2)); sum.increment()")
+        self.assertEqual(4, result.toNumber(ctx))
+        self.assertEqual("function", ctx.eval("typeof sum.increment").toString(ctx))
+        
+        counter = Counter(5)
+        value   = ctx.makePythonObjectRef(counter)
+        ctx.getGlobalObject().setProperty(ctx, "counter", value)
+        
+        self.assertEqual(6, ctx.eval("counter.increment()").toNumber(ctx))
+        self.assertEqual(6, counter.count)
+        
+    #---------------------------------------------------------------
+    def test_class_names(self):
+        ctx = self.ctx
+        
+        constructor = ctx.makeConstructor("Other", Counter)
+        ctx.getGlobalObject().setProperty(ctx, "Other", constructor)
+        
+        toString = "Object.prototype.toString.call"
+        
+        self.assertEqual("[object Counter]", ctx.eval("%s(new Counter())" % toString).toString(ctx))
+        self.assertEqual("[object Other]",   ctx.eval("%s(new Other())" % toString).toString(ctx))
+        self.assertEqual(2, ctx.eval("new Other(1).increment()").toNumber(ctx))
+        
+    #---------------------------------------------------------------
+    def test_errors(self):
+        ctx = self.ctx
+        
+        self.assertRaises(JSException, ctx.eval, "new Counter(1, 2, 3)")
+        self.assertRaises(JSException, ctx.eval, "new Counter().fail()")
+        self.assertRaises(JSException, ctx.eval, "new Counter().increment.call({})")
+        
+#-------------------------------------------------------------------
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,134 @@
+#!/usr/bin/env python
+
+#-------------------------------------------------------------------
+# The MIT License
+# 
+# Copyright (c) 2009 Patrick Mueller
+# 
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+# 
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+# 
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+# THE SOFTWARE.
+#
+#-------------------------------------------------------------------
+
+
+import os
+import sys
+
+lib_path = os.path.abspath(os.path.join(os.path.dirname(sys.argv[0]), "../lib"))
+if lib_path not in sys.path: sys.path.insert(0, lib_path)
+
+import unittest
+
+import nitro_pie
+from nitro_pie import *
+from test_utils import *
+
+#-------------------------------------------------------------------
+def callback(context, function, thisObject, args):
+    return context.makeNumber(42)
+
+#-------------------------------------------------------------------
+class Test(unittest.TestCase):
+    
+    #---------------------------------------------------------------
+    def states(self):
+        return len(nitro_pie._ContextState.states)
+        
+    #---------------------------------------------------------------
+    def test_release_drops_callbacks(self):
+        count = self.states()
+        
+        for i in xrange(10):
+            ctx = JSGlobalContextRef.create()
+            
+            function = ctx.makeFunction("f", callback)
+            self.assertEqual(42, function.call(ctx, None).toNumber(ctx))
+            
+            ctx.makeFastFunction("g", lambda context, thisObject: 1, 0)
+            self.assertEqual(count + 1, self.states())
+            
+            ctx.release()
+            self.assertEqual(count, self.states())
+        
+    #---------------------------------------------------------------
+    def test_functions_alias(self):
+        ctx = JSGlobalContextRef.create()
+        
+        self.assertEqual([], ctx.functions)
+        
+        function = ctx.makeFunction("f", callback)
+        self.assertEqual(1, len(ctx.functions))
+        
+        def other(): pass
+        ctx.functions.append(other)
+        self.assertEqual(2, len(ctx.functions))
+        self.assertTrue(other in nitro_pie._ContextState.find(ctx).callbacks)
+        
+        def assign(): ctx.functions = []
+        self.assertRaises(AttributeError, assign)
+        
+        JSContextRef.functions.append(other)
+        try:
+            self.assertTrue(JSContextRef.functions is JSContextRef.functions)
+            self.assertTrue(other in JSContextRef.functions)
+        finally:
+            JSContextRef.functions.remove(other)
+        
+        ctx.release()
+        
+    #---------------------------------------------------------------
+    def test_retain(self):
+        count = self.states()
+        ctx   = JSGlobalContextRef.create()
+        
+        function = ctx.makeFunction("f", callback)
+        
+        ctx.retain()
+        ctx.release()
+        
+        self.assertEqual(count + 1, self.states())
+        self.assertEqual(42, function.call(ctx, None).toNumber(ctx))
+        
+        ctx.release()
+        self.assertEqual(count, self.states())
+        
+    #---------------------------------------------------------------
+    def test_require_contexts(self):
+        count    = self.states()
+        fileName = "__test__context_state__.js"
+        
+        ofile = open(fileName, "w")
+        ofile.write("exports.a = 11\n")
+        ofile.close()
+        
+        try:
+            ctx = JSGlobalContextRef.create()
+            ctx.addBuiltins()
+            
+            result = ctx.eval("require('%s').a + require('%s').a" % (fileName, fileName))
+            self.assertEqual(22, result.toNumber(ctx))
+            self.assertEqual(count + 2, self.states())
+            
+            ctx.release()
+            self.assertEqual(count, self.states())
+        finally:
+            os.remove(fileName)
+        
+#-------------------------------------------------------------------
+if __name__ == '__main__':
+    unittest.main()
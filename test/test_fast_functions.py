@@ -0,0 +1,154 @@
+#!/usr/bin/env python
+
+#-------------------------------------------------------------------
+# The MIT License
+# 
+# Copyright (c) 2009 Patrick Mueller
+# 
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+# 
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+# 
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+# THE SOFTWARE.
+#
+#-------------------------------------------------------------------
+
+
+import os
+import sys
+
+lib_path = os.path.abspath(os.path.join(os.path.dirname(sys.argv[0]), "../lib"))
+if lib_path not in sys.path: sys.path.insert(0, lib_path)
+
+import unittest
+
+from nitro_pie import *
+from test_utils import *
+
+#-------------------------------------------------------------------
+class Test(unittest.TestCase):
+    
+    #---------------------------------------------------------------
+    def setUp(self):
+        self.ctx = JSGlobalContextRef.create()
+        
+    def tearDown(self):
+        self.ctx.release()
+
+    #---------------------------------------------------------------
+    def define(self, name, function, arity=None):
+        ctx = self.ctx
+        
+        function = ctx.makeFastFunction(name, function, arity)
+        ctx.getGlobalObject().setProperty(ctx, name, function)
+        
+    #---------------------------------------------------------------
+    def test_args_view(self):
+        ctx  = self.ctx
+        seen = []
+        
+        def callback(context, thisObject, args):
+            seen.append(len(args))
+            seen.append([arg.toNumber(context) for arg in args])
+            seen.append(args[-1].toNumber(context))
+            seen.append([arg.toNumber(context) for arg in args[1:]])
+            seen.append([arg.toNumber(context) for arg in args[::-2]])
+            self.assertRaises(IndexError, args.__getitem__, len(args))
+            self.assertRaises(TypeError,  args.__getitem__, "0")
+            
+        self.define("f", callback)
+        
+        self.assertTrue(ctx.eval("f(1, 2, 3)").isUndefined(ctx))
+        self.assertEqual([3, [1, 2, 3], 3, [2, 3], [3, 1]], seen)
+        
+    #---------------------------------------------------------------
+    def test_arities(self):
+        ctx = self.ctx
+        
+        def arity0(context, thisObject):
+            return "zero"
+            
+        def arity1(context, thisObject, a):
+            return a
+            
+        def arity2(context, thisObject, a, b):
+            return b is None
+            
+        def arity3(context, thisObject, a, b, c):
+            return a.toNumber(context) + b.toNumber(context) + c.toNumber(context)
+            
+        self.define("f0", arity0, 0)
+        self.define("f1", arity1, 1)
+        self.define("f2", arity2, 2)
+        self.define("f3", arity3, 3)
+        
+        self.assertEqual("zero", ctx.eval("f0(1, 2)").toString(ctx))
+        self.assertEqual("a",    ctx.eval("f1('a', 'b')").toString(ctx))
+        self.assertEqual(True,   ctx.eval("f2(1)").toBoolean(ctx))
+        self.assertEqual(False,  ctx.eval("f2(1, 2)").toBoolean(ctx))
+        self.assertEqual(6,      ctx.eval("f3(1, 2, 3, 4)").toNumber(ctx))
+        
+        self.assertRaises(TypeError, ctx.makeFastFunction, "f4", arity3, 4)
+        
+    #---------------------------------------------------------------
+    def test_raw_results(self):
+        ctx = self.ctx
+        
+        def callback(context, thisObject, kind):
+            kind = kind.toString(context)
+            
+            if kind == "none":   return None
+            if kind == "number": return 42
+            if kind == "string": return u"\u00e9"
+            if kind == "list":   return [1, "x"]
+            if kind == "value":  return context.makeNull()
+            
+        self.define("f", callback, 1)
+        
+        self.assertTrue(ctx.eval("f('none')").isUndefined(ctx))
+        self.assertEqual(42, ctx.eval("f('number')").toNumber(ctx))
+        self.assertEqual(u"\u00e9", ctx.eval("f('string')").toUnicode(ctx))
+        self.assertEqual([1, "x"], ctx.eval("f('list')").toPython(ctx))
+        self.assertTrue(ctx.eval("f('value')").isNull(ctx))
+        
+    #---------------------------------------------------------------
+    def test_exceptions(self):
+        ctx = self.ctx
+        
+        thrower = ctx.eval("(function(message) { throw message })").asJSObjectRef(ctx)
+        
+        def callback(context, thisObject, message):
+            thrower.call(context, None, message)
+            
+        self.define("f", callback, 1)
+        
+        self.assertEqual("caught oops", ctx.eval("try { f('oops') } catch (e) { 'caught ' + e }").toString(ctx))
+        
+    #---------------------------------------------------------------
+    def test_python_exceptions(self):
+        ctx = self.ctx
+        
+        def callback(context, thisObject, *args):
+            raise ValueError, "oops"
+            
+        for arity in [None, 0, 1, 2, 3]:
+            self.define("f", callback, arity)
+            
+            self.assertRaises(JSException, ctx.eval, "f(1)")
+            self.assertEqual("ValueError: oops", ctx.eval("try { f(1) } catch (e) { e }").toString(ctx))
+        
+#-------------------------------------------------------------------
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,131 @@
+#!/usr/bin/env python
+
+#-------------------------------------------------------------------
+# The MIT License
+# 
+# Copyright (c) 2009 Patrick Mueller
+# 
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+# 
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+# 
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+# THE SOFTWARE.
+#
+#-------------------------------------------------------------------
+
+
+import os
+import sys
+
+lib_path = os.path.abspath(os.path.join(os.path.dirname(sys.argv[0]), "../lib"))
+if lib_path not in sys.path: sys.path.insert(0, lib_path)
+
+import unittest
+
+from nitro_pie import *
+from test_utils import *
+
+#-------------------------------------------------------------------
+class Test(unittest.TestCase):
+    
+    #---------------------------------------------------------------
+    def setUp(self):
+        self.ctx = JSGlobalContextRef.create()
+        
+    def tearDown(self):
+        JSLibrary.setFastMode(False)
+        self.ctx.release()
+
+    #---------------------------------------------------------------
+    def test_switching(self):
+        checked = JSValueRef.__dict__["toNumber"]
+        
+        JSLibrary.setFastMode(True)
+        self.assertTrue(JSLibrary.fastMode)
+        self.assertFalse(JSValueRef.__dict__["toNumber"] is checked)
+        
+        JSLibrary.setFastMode(True)
+        JSLibrary.setFastMode(False)
+        self.assertFalse(JSLibrary.fastMode)
+        self.assertTrue(JSValueRef.__dict__["toNumber"] is checked)
+        
+    #---------------------------------------------------------------
+    def test_values(self):
+        JSLibrary.setFastMode(True)
+        ctx = self.ctx
+        
+        self.assertTrue(ctx.makeUndefined().isUndefined(ctx))
+        self.assertTrue(ctx.makeNull().isNull(ctx))
+        self.assertTrue(ctx.makeBoolean(True).toBoolean(ctx))
+        self.assertTrue(ctx.makeBoolean(False).isBoolean(ctx))
+        self.assertEqual(42, ctx.makeNumber(42).toNumber(ctx))
+        self.assertEqual(JSValueRef.kJSTypeNumber, ctx.makeNumber(1).getType(ctx))
+        self.assertTrue(ctx.eval("'a'").isString(ctx))
+        self.assertTrue(ctx.eval("({})").isObject(ctx))
+        
+        value = ctx.eval("({})")
+        value.protect(ctx)
+        self.assertTrue(value.isStrictEqual(ctx, value))
+        value.unprotect(ctx)
+        
+    #---------------------------------------------------------------
+    def test_properties(self):
+        JSLibrary.setFastMode(True)
+        ctx = self.ctx
+        
+        o = ctx.eval("({a: 1, b: [{}, 2]})")
+        o.setProperty(ctx, "c", ctx.makeNumber(3))
+        
+        self.assertEqual(1, o.getProperty(ctx, "a").toNumber(ctx))
+        self.assertEqual(3, o.getProperty(ctx, "c").toNumber(ctx))
+        self.assertTrue(o.hasProperty(ctx, "c"))
+        self.assertFalse(o.hasProperty(ctx, "d"))
+        
+        b = o.getProperty(ctx, "b")
+        self.assertTrue(isinstance(b, JSObjectRef))
+        self.assertTrue(isinstance(b.getPropertyAtIndex(ctx, 0), JSObjectRef))
+        self.assertEqual(2, b.getPropertyAtIndex(ctx, 1).toNumber(ctx))
+        
+        self.assertTrue(ctx.getGlobalObject().hasProperty(ctx, "Array"))
+        
+        # the results keep their type, as they do outside fast mode
+        self.assertEqual(JSValueRef.kJSTypeObject, b._type)
+        self.assertEqual(JSValueRef.kJSTypeNumber, o.getProperty(ctx, "a")._type)
+        self.assertTrue(o.getProperty(ctx, "a").isNumber(ctx))
+        
+    #---------------------------------------------------------------
+    def test_rebind(self):
+        JSLibrary.setFastMode(True)
+        ctx = self.ctx
+        
+        checked = JSLibrary._checkedMethods
+        fast    = JSValueRef.__dict__["toNumber"]
+        binding = JSLibrary.binding
+        
+        try:
+            JSLibrary.binding = "argtypes" if binding == "prototype" else "prototype"
+            JSLibrary._loadLibrary()
+            
+            self.assertTrue(JSLibrary._checkedMethods is checked)
+            self.assertFalse(JSValueRef.__dict__["toNumber"] is fast)
+            self.assertEqual(42, ctx.makeNumber(42).toNumber(ctx))
+            self.assertEqual(1, ctx.eval("({a: 1})").getProperty(ctx, "a").toNumber(ctx))
+        finally:
+            JSLibrary.binding = binding
+            JSLibrary._loadLibrary()
+        
+#-------------------------------------------------------------------
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,116 @@
+#!/usr/bin/env python
+
+#-------------------------------------------------------------------
+# The MIT License
+# 
+# Copyright (c) 2009 Patrick Mueller
+# 
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+# 
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+# 
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+# THE SOFTWARE.
+#
+#-------------------------------------------------------------------
+
+
+import os
+import sys
+
+lib_path = os.path.abspath(os.path.join(os.path.dirname(sys.argv[0]), "../lib"))
+if lib_path not in sys.path: sys.path.insert(0, lib_path)
+
+import unittest
+
+from nitro_pie import *
+from test_utils import *
+
+#-------------------------------------------------------------------
+class Test(unittest.TestCase):
+    
+    #---------------------------------------------------------------
+    def setUp(self):
+        self.ctx = JSGlobalContextRef.create()
+        
+    def tearDown(self):
+        self.ctx.release()
+
+    #---------------------------------------------------------------
+    def test_no_dict(self):
+        ctx   = self.ctx
+        value = ctx.eval("42").bind(ctx)
+        
+        self.assertFalse(hasattr(value, "__dict__"))
+        self.assertRaises(AttributeError, setattr, value, "other", 1)
+        
+        o = ctx.eval("({a: 1})").asJSObjectRef(ctx)
+        self.assertFalse("context" in getattr(o.getProperty(ctx, "a"), "__dict__", {}))
+        
+    #---------------------------------------------------------------
+    def test_types(self):
+        ctx = self.ctx
+        
+        value = ctx.eval("'s'").bind(ctx)
+        self.assertEqual(JSValueRef.kJSTypeString, value.type)
+        self.assertTrue(value.isString())
+        self.assertFalse(value.isObject())
+        
+        self.assertTrue(ctx.eval("undefined").bind(ctx).isUndefined())
+        self.assertTrue(ctx.eval("null").bind(ctx).isNull())
+        self.assertTrue(ctx.eval("true").bind(ctx).isBoolean())
+        self.assertTrue(ctx.eval("1").bind(ctx).isNumber())
+        self.assertTrue(ctx.eval("({})").bind(ctx).isObject())
+        
+    #---------------------------------------------------------------
+    def test_conversions(self):
+        ctx = self.ctx
+        
+        self.assertEqual(42.5,      ctx.eval("42.5").bind(ctx).toNumber())
+        self.assertEqual("42.5",    ctx.eval("42.5").bind(ctx).toString())
+        self.assertEqual(u"\u00e9", ctx.eval("'\\u00e9'").bind(ctx).toUnicode())
+        self.assertEqual(True,      ctx.eval("'x'").bind(ctx).toBoolean())
+        self.assertEqual({"a": [1, "x"]}, ctx.eval("({a: [1, 'x']})").bind(ctx).toPython())
+        
+    #---------------------------------------------------------------
+    def test_properties(self):
+        ctx = self.ctx
+        
+        o = ctx.eval("({a: {b: [10, 20]}})").bind(ctx)
+        
+        self.assertEqual(20, o.getProperty("a").getProperty("b").getPropertyAtIndex(1).toNumber())
+        
+        o.setProperty("c", "x")
+        o.setProperty("d", o.getProperty("a"))
+        o.setProperty("e", [1, 2])
+        
+        self.assertEqual("x", o.getProperty("c").toString())
+        self.assertEqual(2,   o.getProperty("e").getProperty("length").toNumber())
+        self.assertTrue(o.getProperty("d").ref.isStrictEqual(ctx, o.getProperty("a").ref))
+        
+        self.assertRaises(TypeError, o.getProperty("c").getProperty, "length")
+        
+    #---------------------------------------------------------------
+    def test_native_arguments(self):
+        ctx = self.ctx
+        
+        value = ctx.eval("({a: 1})").bind(ctx)
+        
+        self.assertTrue(isinstance(value.ref, JSObjectRef))
+        self.assertTrue(isinstance(ctx.eval("1").bind(ctx).ref, JSValueRef))
+        self.assertEqual(u'{"a":1}', value.ref.toJSONString(ctx))
+        
+#-------------------------------------------------------------------
+if __name__ == '__main__':
+    unittest.main()
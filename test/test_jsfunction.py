@@ -0,0 +1,174 @@
+#!/usr/bin/env python
+
+#-------------------------------------------------------------------
+# The MIT License
+# 
+# Copyright (c) 2009 Patrick Mueller
+# 
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+# 
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+# 
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+# THE SOFTWARE.
+#
+#-------------------------------------------------------------------
+
+
+import os
+import sys
+
+lib_path = os.path.abspath(os.path.join(os.path.dirname(sys.argv[0]), "../lib"))
+if lib_path not in sys.path: sys.path.insert(0, lib_path)
+
+import unittest
+
+from nitro_pie import *
+from test_utils import *
+
+#-------------------------------------------------------------------
+class Test(unittest.TestCase):
+    
+    #---------------------------------------------------------------
+    def setUp(self):
+        self.ctx = JSGlobalContextRef.create()
+        
+    def tearDown(self):
+        self.ctx.release()
+
+    #---------------------------------------------------------------
+    def define(self, name, function):
+        ctx = self.ctx
+        
+        function = ctx.makeFunction(name, function)
+        ctx.getGlobalObject().setProperty(ctx, name, function)
+        
+    #---------------------------------------------------------------
+    def test_argument_types(self):
+        ctx  = self.ctx
+        seen = []
+        
+        @jsfunction(str, unicode, float, int, bool, dict, list, JSObjectRef, JSValueRef)
+        def f(context, thisObject, *args):
+            seen.extend(args)
+            
+        self.define("f", f)
+        ctx.eval("f(1, 'x', '2.5', 3.7, 0, {a: 1}, [1, 'y'], {}, null)")
+        
+        self.assertEqual(["1", u"x", 2.5, 3, False, {"a": 1}, [1, "y"]], seen[:7])
+        self.assertTrue(isinstance(seen[1], unicode))
+        self.assertTrue(isinstance(seen[7], JSObjectRef))
+        self.assertTrue(seen[8].isNull(ctx))
+        
+    #---------------------------------------------------------------
+    def test_missing_and_extra_arguments(self):
+        ctx  = self.ctx
+        seen = []
+        
+        @jsfunction(int, int)
+        def f(context, thisObject, a, b):
+            seen.append((a, b))
+            
+        @jsfunction(str, varargs=float)
+        def g(context, thisObject, name, *numbers):
+            seen.append((name, numbers))
+            
+        self.define("f", f)
+        self.define("g", g)
+        
+        ctx.eval("f(1); f(1, 2, 3); f(NaN, Infinity); g('n', 1, 2); g()")
+        
+        self.assertEqual([(1, None), (1, 2), (0, 0), ("n", (1.0, 2.0)), (None, ())], seen)
+        
+    #---------------------------------------------------------------
+    def test_results(self):
+        ctx = self.ctx
+        
+        @jsfunction(varargs=str, returns=str)
+        def join(context, thisObject, *args):
+            return "".join(args)
+            
+        @jsfunction(float, returns=int)
+        def floor(context, thisObject, value):
+            return value
+            
+        @jsfunction(returns=bool)
+        def yes(context, thisObject):
+            return 1
+            
+        @jsfunction(returns=list)
+        def pair(context, thisObject):
+            return [1, u"\u00e9"]
+            
+        @jsfunction()
+        def nothing(context, thisObject):
+            return None
+            
+        for function in [join, floor, yes, pair, nothing]:
+            self.define(function.__name__, function)
+            
+        self.assertEqual("123",  ctx.eval("join(1, 2, 3)").toString(ctx))
+        self.assertEqual(2,      ctx.eval("floor(2.5)").toNumber(ctx))
+        self.assertEqual(True,   ctx.eval("yes()").toBoolean(ctx))
+        self.assertEqual([1, u"\u00e9"], ctx.eval("pair()").toPython(ctx))
+        self.assertTrue(ctx.eval("nothing()").isUndefined(ctx))
+        
+    #---------------------------------------------------------------
+    def test_direct_call(self):
+        ctx = self.ctx
+        
+        @jsfunction(str, str, returns=str)
+        def join(context, thisObject, a, b):
+            return a + b
+            
+        args   = [ctx.eval("'a'"), ctx.eval("1")]
+        result = join(ctx, None, None, args)
+        
+        self.assertEqual("a1", result.toString(ctx))
+        
+    #---------------------------------------------------------------
+    def test_exceptions(self):
+        ctx = self.ctx
+        
+        @jsfunction(JSValueRef)
+        def rethrow(context, thisObject, value):
+            raise JSException(value)
+            
+        self.define("rethrow", rethrow)
+        
+        self.assertEqual(42, ctx.eval("try { rethrow(42) } catch (e) { e }").toNumber(ctx))
+        
+    #---------------------------------------------------------------
+    def test_python_exceptions(self):
+        ctx = self.ctx
+        
+        @jsfunction(str)
+        def fail(context, thisObject, message):
+            raise ValueError, message
+            
+        self.define("fail", fail)
+        
+        self.assertRaises(JSException, ctx.eval, "fail('oops')")
+        self.assertEqual("ValueError: oops", ctx.eval("try { fail('oops') } catch (e) { e }").toString(ctx))
+        
+    #---------------------------------------------------------------
+    def test_bad_signatures(self):
+        self.assertRaises(TypeError, jsfunction, object)
+        self.assertRaises(TypeError, jsfunction, str, returns=tuple)
+        self.assertRaises(TypeError, jsfunction, str, varargs=[])
+        self.assertRaises(TypeError, jsfunction, str, other=1)
+        
+#-------------------------------------------------------------------
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,133 @@
+#!/usr/bin/env python
+
+#-------------------------------------------------------------------
+# The MIT License
+# 
+# Copyright (c) 2009 Patrick Mueller
+# 
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+# 
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+# 
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+# THE SOFTWARE.
+#
+#-------------------------------------------------------------------
+
+
+import os
+import sys
+
+lib_path = os.path.abspath(os.path.join(os.path.dirname(sys.argv[0]), "../lib"))
+if lib_path not in sys.path: sys.path.insert(0, lib_path)
+
+import unittest
+
+from nitro_pie import *
+from test_utils import *
+
+#-------------------------------------------------------------------
+class Test(unittest.TestCase):
+    
+    #---------------------------------------------------------------
+    def setUp(self):
+        self.ctx = JSGlobalContextRef.create()
+        
+    def tearDown(self):
+        self.ctx.release()
+
+    #---------------------------------------------------------------
+    def test_from_json(self):
+        ctx = self.ctx
+        
+        result = ctx.fromJSON('{"a": [1, "x", null], "b": true}')
+        self.assertEqual({"a": [1, "x", None], "b": True}, result.toPython(ctx))
+        
+        result = ctx.fromJSON(u'"\\u00e9"')
+        self.assertEqual(u"\u00e9", result.toUnicode(ctx))
+        
+        self.assertRaises(JSException, ctx.fromJSON, "{a: 1}")
+        self.assertRaises(TypeError,   ctx.fromJSON, 1)
+        
+    #---------------------------------------------------------------
+    def test_to_json_string(self):
+        ctx = self.ctx
+        
+        value = ctx.eval("({a: [1, 'x', null]})")
+        self.assertEqual(u'{"a":[1,"x",null]}', value.toJSONString(ctx))
+        self.assertEqual(u'{\n  "a": 1\n}',     ctx.eval("({a: 1})").toJSONString(ctx, 2))
+        
+        self.assertEqual(u'"s"', ctx.eval("'s'").toJSONString(ctx))
+        self.assertEqual(None,   ctx.eval("undefined").toJSONString(ctx))
+        
+        self.assertRaises(JSException, ctx.eval("var o = {}; o.o = o; o").toJSONString, ctx)
+        
+    #---------------------------------------------------------------
+    def test_json_round_trip(self):
+        ctx = self.ctx
+        
+        text = u'{"a":[1,2.5,"\\u00e9"],"b":{"c":false}}'
+        
+        self.assertEqual(text, ctx.fromJSON(text).toJSONString(ctx))
+        
+    #---------------------------------------------------------------
+    def test_large_values(self):
+        ctx = self.ctx
+        
+        count = JSContextRef.jsonThreshold
+        
+        value  = {"numbers": range(count), "strings": ["s%d" % i for i in xrange(count)]}
+        result = ctx.makeValue(value).toPython(ctx)
+        
+        self.assertEqual(value, result)
+        self.assertTrue(isinstance(result["numbers"][1], float))
+        
+        value  = [float("nan")] * count
+        result = ctx.makeArray(value).toList(ctx)
+        self.assertEqual(count, len(result))
+        self.assertTrue(result[0] != result[0])
+        
+    #---------------------------------------------------------------
+    def test_replaced_builtins(self):
+        JSContextRef.protectBuiltins = True
+        try:
+            ctx = JSGlobalContextRef.create()
+        finally:
+            JSContextRef.protectBuiltins = False
+        
+        try:
+            ctx.eval("JSON = {parse: function() { return 1 }, stringify: function() { return '1' }}; isFinite = null")
+            
+            self.assertEqual({"a": 1}, ctx.fromJSON('{"a": 1}').toPython(ctx))
+            self.assertEqual(u'[1,"x"]', ctx.eval("[1, 'x']").toJSONString(ctx))
+            
+            count = JSContextRef.jsonThreshold
+            arr   = ctx.eval("var a = []; for (var i=0; i<%d; i++) a.push(i); a" % count).asJSObjectRef(ctx)
+            self.assertEqual(range(count), arr.toList(ctx))
+        finally:
+            ctx.release()
+        
+    #---------------------------------------------------------------
+    def test_builtins_captured_on_first_use(self):
+        ctx = self.ctx
+        
+        ctx.eval("JSON.parse('1')")
+        self.assertEqual({"a": 1}, ctx.fromJSON('{"a": 1}').toPython(ctx))
+        
+        ctx.eval("JSON = {parse: function() { return 1 }}")
+        self.assertEqual({"a": 1}, ctx.fromJSON('{"a": 1}').toPython(ctx))
+        
+#-------------------------------------------------------------------
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,86 @@
+#!/usr/bin/env python
+
+#-------------------------------------------------------------------
+# The MIT License
+# 
+# Copyright (c) 2009 Patrick Mueller
+# 
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+# 
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+# 
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+# THE SOFTWARE.
+#
+#-------------------------------------------------------------------
+
+
+import os
+import sys
+
+lib_path = os.path.abspath(os.path.join(os.path.dirname(sys.argv[0]), "../lib"))
+if lib_path not in sys.path: sys.path.insert(0, lib_path)
+
+import unittest
+
+from nitro_pie import *
+from test_utils import *
+
+import ctypes
+import nitro_pie
+
+#-------------------------------------------------------------------
+class Test(unittest.TestCase):
+    
+    #---------------------------------------------------------------
+    def setUp(self):
+        self.ctx = JSGlobalContextRef.create()
+        
+    def tearDown(self):
+        self.ctx.release()
+
+    #---------------------------------------------------------------
+    def test_replaced_when_used(self):
+        ctx = self.ctx
+        
+        self.assertEqual(2, ctx.eval("1 + 1").toNumber(ctx))
+        
+        for name in ["_JSEvaluateScript", "_JSValueToNumber", "_JSGlobalContextCreate"]:
+            self.assertFalse(isinstance(getattr(nitro_pie, name), nitro_pie._LazyFunction), name)
+            
+    #---------------------------------------------------------------
+    def test_stand_in(self):
+        ctx = self.ctx
+        
+        function = nitro_pie._LazyFunction("_test", "JSValueMakeNumber", JSValueRef, (
+            (JSContextRef,     "ctx"),
+            (ctypes.c_double,  "number"),
+        ), False)
+        
+        self.assertEqual(1, function(ctx, 1).toNumber(ctx))
+        self.assertEqual(2, function(ctx, 2).toNumber(ctx))
+        self.assertFalse(hasattr(nitro_pie, "_test"))
+        
+    #---------------------------------------------------------------
+    def test_missing(self):
+        required = nitro_pie._LazyFunction("_test", "JSNoSuchFunction", None, (), False)
+        optional = nitro_pie._LazyFunction("_test", "JSNoSuchFunction", None, (), True)
+        
+        self.assertRaises(AttributeError, required)
+        self.assertFalse(optional)
+        self.assertTrue(optional.bind() is None)
+        
+#-------------------------------------------------------------------
+if __name__ == '__main__':
+    unittest.main()
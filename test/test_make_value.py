@@ -0,0 +1,120 @@
+#!/usr/bin/env python
+
+#-------------------------------------------------------------------
+# The MIT License
+# 
+# Copyright (c) 2009 Patrick Mueller
+# 
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+# 
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+# 
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+# THE SOFTWARE.
+#
+#-------------------------------------------------------------------
+
+
+import os
+import sys
+
+lib_path = os.path.abspath(os.path.join(os.path.dirname(sys.argv[0]), "../lib"))
+if lib_path not in sys.path: sys.path.insert(0, lib_path)
+
+import unittest
+
+from nitro_pie import *
+from test_utils import *
+
+#-------------------------------------------------------------------
+class Test(unittest.TestCase):
+    
+    #---------------------------------------------------------------
+    def setUp(self):
+        self.ctx = JSGlobalContextRef.create()
+        
+    def tearDown(self):
+        self.ctx.release()
+
+    #---------------------------------------------------------------
+    def test_primitives(self):
+        ctx = self.ctx
+        
+        self.assertTrue(ctx.makeValue(None).isNull(ctx))
+        self.assertEqual(True,  ctx.makeValue(True).toBoolean(ctx))
+        self.assertEqual(2,     ctx.makeValue(2).toNumber(ctx))
+        self.assertEqual(2.5,   ctx.makeValue(2.5).toNumber(ctx))
+        self.assertEqual("abc", ctx.makeValue("abc").toString(ctx))
+        self.assertEqual("abc", ctx.makeValue(u"abc").toString(ctx))
+        
+        undefined = ctx.makeUndefined()
+        self.assertEqual(undefined.value, ctx.makeValue(undefined).value)
+        
+    #---------------------------------------------------------------
+    def test_nested(self):
+        ctx = self.ctx
+        
+        value = {"a": [1, "b", (True, None)], "c": {"d": 2.5}}
+        
+        result = ctx.makeValue(value)
+        self.assertEqual(value["c"], result.toPython(ctx)["c"])
+        self.assertEqual([1, "b", [True, None]], result.toPython(ctx)["a"])
+        
+        ctx.getGlobalObject().setProperty(ctx, "v", result)
+        self.assertTrue(ctx.eval("v.a instanceof Array").toBoolean(ctx))
+        self.assertEqual(2.5, ctx.eval("v.c.d").toNumber(ctx))
+        
+    #---------------------------------------------------------------
+    def test_shared_and_cycles(self):
+        ctx = self.ctx
+        
+        shared = {"x": 1}
+        value  = {"a": shared, "b": shared}
+        value["self"] = value
+        
+        ctx.getGlobalObject().setProperty(ctx, "v", ctx.makeValue(value))
+        
+        self.assertTrue(ctx.eval("v.a === v.b").toBoolean(ctx))
+        self.assertTrue(ctx.eval("v.self === v").toBoolean(ctx))
+        
+    #---------------------------------------------------------------
+    def test_large(self):
+        ctx = self.ctx
+        
+        value = [{"i": i, "s": u"\u00e9%d" % i} for i in xrange(JSContextRef.jsonThreshold)]
+        
+        self.assertEqual(value, ctx.makeValue(value).toPython(ctx))
+        
+    #---------------------------------------------------------------
+    def test_empty_keys(self):
+        ctx = self.ctx
+        
+        value = {"": 1, "a": {"": [2]}}
+        self.assertEqual(value, ctx.makeValue(value).toPython(ctx))
+        
+        o = ctx.eval("({})")
+        o.setProperties(ctx, {"": 3})
+        self.assertEqual(3, o.getProperty(ctx, "").toNumber(ctx))
+        
+    #---------------------------------------------------------------
+    def test_unconvertible(self):
+        ctx = self.ctx
+        
+        self.assertRaises(TypeError, ctx.makeValue, object())
+        self.assertRaises(TypeError, ctx.makeValue, {"a": [object()]})
+        self.assertRaises(TypeError, ctx.makeValue, {1: 2})
+        
+#-------------------------------------------------------------------
+if __name__ == '__main__':
+    unittest.main()
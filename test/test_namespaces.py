@@ -0,0 +1,109 @@
+#!/usr/bin/env python
+
+#-------------------------------------------------------------------
+# The MIT License
+# 
+# Copyright (c) 2009 Patrick Mueller
+# 
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+# 
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+# 
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+# THE SOFTWARE.
+#
+#-------------------------------------------------------------------
+
+
+import os
+import sys
+
+lib_path = os.path.abspath(os.path.join(os.path.dirname(sys.argv[0]), "../lib"))
+if lib_path not in sys.path: sys.path.insert(0, lib_path)
+
+import unittest
+
+from nitro_pie import *
+from test_utils import *
+
+#-------------------------------------------------------------------
+@jsfunction(float, float, returns=float)
+def add(context, thisObject, a, b):
+    return a + b
+
+#-------------------------------------------------------------------
+def hello(context, function, thisObject, args):
+    ref    = JSStringRef.create("hello")
+    result = context.makeString(ref)
+    ref.release()
+    return result
+
+#-------------------------------------------------------------------
+FUNCTIONS = {"add": add, "hello": hello}
+
+#-------------------------------------------------------------------
+class Test(unittest.TestCase):
+    
+    #---------------------------------------------------------------
+    def setUp(self):
+        self.ctx = JSGlobalContextRef.create()
+        
+    def tearDown(self):
+        self.ctx.release()
+
+    #---------------------------------------------------------------
+    def test_define_namespace(self):
+        ctx = self.ctx
+        
+        namespace = ctx.defineNamespace("sys", FUNCTIONS)
+        
+        self.assertTrue(isinstance(namespace, JSObjectRef))
+        self.assertEqual(3,       ctx.eval("sys.add(1, 2)").toNumber(ctx))
+        self.assertEqual("hello", ctx.eval("sys.hello()").toString(ctx))
+        self.assertEqual("function", ctx.eval("typeof sys.add").toString(ctx))
+        
+        keys = ctx.eval("var keys = []; for (var key in sys) keys.push(key); keys.sort()")
+        self.assertEqual(["add", "hello"], keys.toPython(ctx))
+        
+    #---------------------------------------------------------------
+    def test_unnamed_namespace(self):
+        ctx = self.ctx
+        
+        namespace = ctx.defineNamespace(None, FUNCTIONS)
+        
+        self.assertEqual("undefined", ctx.eval("typeof sys").toString(ctx))
+        self.assertEqual(5, namespace.getProperty(ctx, "add").asJSObjectRef(ctx).call(ctx, namespace, 2, 3).toNumber(ctx))
+        
+    #---------------------------------------------------------------
+    def test_many_contexts(self):
+        for i in xrange(10):
+            ctx = JSGlobalContextRef.create()
+            ctx.defineNamespace("sys", FUNCTIONS)
+            
+            self.assertEqual(i, ctx.eval("sys.add(%d, 0)" % i).toNumber(ctx))
+            ctx.release()
+            
+    #---------------------------------------------------------------
+    def test_global_functions(self):
+        ctx = JSGlobalContextRef.create(FUNCTIONS)
+        
+        self.assertEqual(3,       ctx.eval("add(1, 2)").toNumber(ctx))
+        self.assertEqual("hello", ctx.eval("this.hello()").toString(ctx))
+        self.assertEqual("object", ctx.eval("typeof Math").toString(ctx))
+        
+        ctx.release()
+        
+#-------------------------------------------------------------------
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,150 @@
+#!/usr/bin/env python
+
+#-------------------------------------------------------------------
+# The MIT License
+# 
+# Copyright (c) 2009 Patrick Mueller
+# 
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+# 
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+# 
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+# THE SOFTWARE.
+#
+#-------------------------------------------------------------------
+
+
+import os
+import sys
+
+lib_path = os.path.abspath(os.path.join(os.path.dirname(sys.argv[0]), "../lib"))
+if lib_path not in sys.path: sys.path.insert(0, lib_path)
+
+import unittest
+
+from nitro_pie import *
+from test_utils import *
+
+#-------------------------------------------------------------------
+class Test(unittest.TestCase):
+    
+    #---------------------------------------------------------------
+    def setUp(self):
+        self.ctx = JSGlobalContextRef.create()
+        
+    def tearDown(self):
+        JSContextRef.scriptCache = None
+        self.ctx.release()
+
+    #---------------------------------------------------------------
+    def test_prepare(self):
+        ctx = self.ctx
+        
+        ctx.eval("var count = 0")
+        
+        script = ctx.prepare("++count", "count.js")
+        
+        self.assertEqual(1, script.eval(ctx).toNumber(ctx))
+        self.assertEqual(2, script.eval(ctx).toNumber(ctx))
+        self.assertEqual("count.js", script.sourceURLRef.toString())
+        
+        script.release()
+        self.assertRaises(TypeError, script.eval, ctx)
+        
+    #---------------------------------------------------------------
+    def test_this_object(self):
+        ctx = self.ctx
+        
+        o = ctx.eval("({a: 42})").asJSObjectRef(ctx)
+        
+        script = ctx.prepare("this.a")
+        self.assertEqual(42, script.eval(ctx, o).toNumber(ctx))
+        script.release()
+        
+    #---------------------------------------------------------------
+    def test_exceptions(self):
+        ctx = self.ctx
+        
+        script = ctx.prepare("throw new Error('oops')")
+        self.assertRaises(JSException, script.eval, ctx)
+        script.release()
+        
+        script = ctx.prepare("(")
+        self.assertRaises(JSException, script.eval, ctx)
+        self.assertRaises(JSException, script.eval, ctx)
+        script.release()
+        
+        self.assertRaises(TypeError, ctx.prepare, "")
+        
+    #---------------------------------------------------------------
+    def test_other_contexts(self):
+        ctx1 = self.ctx
+        ctx2 = JSGlobalContextRef.create()
+        
+        script = ctx1.prepare("typeof nothing")
+        
+        self.assertEqual("undefined", script.eval(ctx1).toString(ctx1))
+        self.assertEqual("undefined", script.eval(ctx2).toString(ctx2))
+        
+        script.release()
+        ctx2.release()
+        
+    #---------------------------------------------------------------
+    def test_release_after_context(self):
+        ctx = JSGlobalContextRef.create()
+        
+        script = ctx.prepare("6 * 7")
+        self.assertEqual(42, script.eval(ctx).toNumber(ctx))
+        
+        ctx.release()
+        self.assertEqual({}, script._scripts)
+        
+        script.release()
+        
+        cache = JSPreparedScriptCache(1)
+        JSContextRef.scriptCache = cache
+        
+        ctx = JSGlobalContextRef.create()
+        self.assertEqual(42, ctx.eval("6 * 7").toNumber(ctx))
+        ctx.release()
+        
+        # evicts and releases the entry parsed for the released context
+        self.assertEqual(1, self.ctx.eval("1").toNumber(self.ctx))
+        cache.clear()
+        
+    #---------------------------------------------------------------
+    def test_script_cache(self):
+        ctx = self.ctx
+        
+        cache = JSPreparedScriptCache(2)
+        JSContextRef.scriptCache = cache
+        
+        ctx.eval("var count = 0")
+        self.assertEqual(1, ctx.eval("++count").toNumber(ctx))
+        self.assertEqual(2, ctx.eval("++count").toNumber(ctx))
+        self.assertEqual(3, ctx.eval("++count", None, "count.js").toNumber(ctx))
+        
+        self.assertEqual(1, cache.hits)
+        self.assertEqual(3, cache.misses)
+        self.assertEqual(2, len(cache))
+        
+        self.assertRaises(JSException, ctx.eval, "throw 1")
+        
+        cache.clear()
+        self.assertEqual(0, len(cache))
+        
+#-------------------------------------------------------------------
+if __name__ == '__main__':
+    unittest.main()
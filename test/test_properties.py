@@ -153,6 +153,60 @@ class Test(unittest.TestCase):
         self.assertEquals(11, t2.getProperty(ctx, "a").toNumber(ctx))
         self.assertEquals(22, t2.getProperty(ctx, "b").toNumber(ctx))
 
+    #---------------------------------------------------------------
+    def test_get_properties(self):
+        ctx = self.ctx
+
+        o = ctx.eval("({a: 1, b: 'x', c: true})").asJSObjectRef(ctx)
+
+        props = o.getProperties(ctx, ["a", "b", "z"])
+        self.assertEquals(["a", "b", "z"], sorted(props.keys()))
+        self.assertEquals(1,   props["a"].toNumber(ctx))
+        self.assertEquals("x", props["b"].toString(ctx))
+        self.assertTrue(props["z"].isUndefined(ctx))
+
+        props = o.getProperties(ctx)
+        self.assertEquals(["a", "b", "c"], sorted(props.keys()))
+        self.assertEquals(True, props["c"].toBoolean(ctx))
+
+        self.assertEquals({}, ctx.eval("({})").asJSObjectRef(ctx).getProperties(ctx))
+
+        o = ctx.eval("({f: function() { return 2 }, n: 1})")
+        for props in [o.getProperties(ctx), o.getProperties(ctx, ["f", "n"])]:
+            self.assertTrue(isinstance(props["f"], JSObjectRef))
+            self.assertFalse(isinstance(props["n"], JSObjectRef))
+            self.assertEquals(2, props["f"].call(ctx, None).toNumber(ctx))
+
+    #---------------------------------------------------------------
+    def test_set_properties(self):
+        ctx = self.ctx
+
+        o = ctx.eval("({})").asJSObjectRef(ctx)
+        o.setProperties(ctx, {"a": 1, "b": u"x", "c": False, "d": None, "e": ctx.makeUndefined()})
+
+        self.assertEquals(1,     o.getProperty(ctx, "a").toNumber(ctx))
+        self.assertEquals("x",   o.getProperty(ctx, "b").toString(ctx))
+        self.assertEquals(False, o.getProperty(ctx, "c").toBoolean(ctx))
+        self.assertTrue(o.getProperty(ctx, "d").isNull(ctx))
+        self.assertTrue(o.getProperty(ctx, "e").isUndefined(ctx))
+
+        self.assertRaises(TypeError, o.setProperties, ctx, {"f": object()})
+
+    #---------------------------------------------------------------
+    def test_set_properties_attributes(self):
+        ctx = self.ctx
+
+        o = ctx.eval("({})").asJSObjectRef(ctx)
+        o.setProperties(ctx, [("x", 1), ("y", 2)], JSObjectRef.kJSPropertyAttributeDontEnum)
+        self.assertEquals([], o.getPropertyNames(ctx))
+
+        o = ctx.eval("({})").asJSObjectRef(ctx)
+        o.setProperties(ctx, [("x", 1), ("y", 2)], {"x": JSObjectRef.kJSPropertyAttributeReadOnly})
+        o.setProperties(ctx, [("x", 3), ("y", 4)])
+
+        self.assertEquals(1, o.getProperty(ctx, "x").toNumber(ctx))
+        self.assertEquals(4, o.getProperty(ctx, "y").toNumber(ctx))
+
     #---------------------------------------------------------------
     def test_get_array_element(self):
         ctx = self.ctx
@@ -0,0 +1,231 @@
+#!/usr/bin/env python
+
+#-------------------------------------------------------------------
+# The MIT License
+# 
+# Copyright (c) 2009 Patrick Mueller
+# 
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+# 
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+# 
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+# THE SOFTWARE.
+#
+#-------------------------------------------------------------------
+
+
+import os
+import sys
+
+lib_path = os.path.abspath(os.path.join(os.path.dirname(sys.argv[0]), "../lib"))
+if lib_path not in sys.path: sys.path.insert(0, lib_path)
+
+import array
+import ctypes
+import unittest
+
+import nitro_pie
+from nitro_pie import *
+from nitro_pie import RememberedObjects
+from test_utils import *
+
+#-------------------------------------------------------------------
+class Point(object):
+    
+    def __init__(self, x, y):
+        self.x = x
+        self.y = y
+        self._hidden = 1
+        
+    def length(self):
+        return 0
+
+#-------------------------------------------------------------------
+class Test(unittest.TestCase):
+    
+    #---------------------------------------------------------------
+    def setUp(self):
+        self.ctx = JSGlobalContextRef.create()
+        
+    def tearDown(self):
+        self.ctx.release()
+
+    #---------------------------------------------------------------
+    def wrap(self, name, value):
+        ctx = self.ctx
+        
+        object = ctx.makePythonObjectRef(value)
+        ctx.getGlobalObject().setProperty(ctx, name, object)
+        
+        return object
+        
+    #---------------------------------------------------------------
+    def test_dict(self):
+        ctx    = self.ctx
+        config = {"name": "x", "size": 3, "nested": {"flag": True}, "items": [1, 2]}
+        
+        self.wrap("config", config)
+        
+        self.assertEqual("x",  ctx.eval("config.name").toString(ctx))
+        self.assertEqual(3,    ctx.eval("config.size").toNumber(ctx))
+        self.assertEqual(True, ctx.eval("config.nested.flag").toBoolean(ctx))
+        self.assertEqual(2,    ctx.eval("config.items.length").toNumber(ctx))
+        self.assertEqual(2,    ctx.eval("config.items[1]").toNumber(ctx))
+        
+        self.assertTrue(ctx.eval("config.missing").isUndefined(ctx))
+        self.assertTrue(ctx.eval("'name' in config").toBoolean(ctx))
+        self.assertFalse(ctx.eval("'missing' in config").toBoolean(ctx))
+        
+        keys = ctx.eval("var keys = []; for (var key in config) keys.push(key); keys.sort()")
+        self.assertEqual(sorted(config.keys()), keys.toPython(ctx))
+        
+    #---------------------------------------------------------------
+    def test_live_updates(self):
+        ctx    = self.ctx
+        config = {"a": 1}
+        
+        self.wrap("config", config)
+        
+        config["a"] = 2
+        self.assertEqual(2, ctx.eval("config.a").toNumber(ctx))
+        
+        ctx.eval("config.b = [1, 'x']; config.a = 3; delete config.c")
+        self.assertEqual({"a": 3, "b": [1, "x"]}, config)
+        
+        ctx.eval("delete config.a")
+        self.assertEqual({"b": [1, "x"]}, config)
+        
+    #---------------------------------------------------------------
+    def test_object(self):
+        ctx   = self.ctx
+        point = Point(1, 2)
+        
+        self.wrap("point", point)
+        
+        self.assertEqual(3, ctx.eval("point.x + point.y").toNumber(ctx))
+        self.assertTrue(ctx.eval("point._hidden").isUndefined(ctx))
+        self.assertTrue(ctx.eval("point.length").isUndefined(ctx))
+        
+        ctx.eval("point.x = 10")
+        self.assertEqual(10, point.x)
+        
+        keys = ctx.eval("var keys = []; for (var key in point) keys.push(key); keys.sort()")
+        self.assertEqual(["x", "y"], keys.toPython(ctx))
+        
+    #---------------------------------------------------------------
+    def test_to_python(self):
+        ctx    = self.ctx
+        config = {"a": 1}
+        
+        object = self.wrap("config", config)
+        
+        self.assertTrue(object.toPython(ctx) is config)
+        self.assertTrue(ctx.eval("({c: config})").toPython(ctx)["c"] is config)
+        
+        other = {}
+        self.wrap("other", other)
+        
+        ctx.eval("other.config = config")
+        self.assertTrue(other["config"] is config)
+        
+    #---------------------------------------------------------------
+    def test_private_data_of_other_classes(self):
+        ctx    = self.ctx
+        config = {"a": 1}
+        
+        self.wrap("config", config)
+        handle = RememberedObjects.remember(config)
+        
+        # an object of another class, whose private data happens to
+        # be a valid handle
+        definition = nitro_pie.JSClassDefinition()
+        definition.className = "Other"
+        jsClass = nitro_pie._JSClassCreate(ctypes.byref(definition))
+        other   = nitro_pie._JSObjectMake(ctx, jsClass, handle)
+        
+        self.assertEqual({}, other.toPython(ctx))
+        
+        RememberedObjects.forget(handle)
+        nitro_pie._JSClassRelease(jsClass)
+        
+    #---------------------------------------------------------------
+    def test_collected_objects_are_forgotten(self):
+        ctx   = self.ctx
+        count = RememberedObjects.count()
+        
+        for i in xrange(1000):
+            ctx.makePythonObjectRef({"i": i})
+            
+        self.assertTrue(RememberedObjects.count() >= count + 1000)
+        
+        ctx.garbageCollect()
+        
+        # the collector is conservative, so some may survive
+        self.assertTrue(RememberedObjects.count() < count + 1000)
+        self.assertEqual(0, len(RememberedObjects.pending))
+        
+    #---------------------------------------------------------------
+    def test_extra_memory_cost(self):
+        ctx = self.ctx
+        
+        reported = ctx.reportExtraMemoryCost(1024)
+        self.assertTrue(reported in (True, False))
+        
+        self.assertEqual(4 * 8, nitro_pie._extraMemoryCost(array.array("d", [0.0] * 4)))
+        self.assertEqual(0,     nitro_pie._extraMemoryCost({}))
+        self.assertTrue(nitro_pie._extraMemoryCost(bytearray(10000)) >= 10000)
+        self.assertTrue(nitro_pie._extraMemoryCost("x" * 10000) >= 10000)
+        self.assertTrue(nitro_pie._extraMemoryCost([0.5] * 1000) >= 8 * 1000)
+        self.assertTrue(nitro_pie._extraMemoryCost(("x" * 1000, [])) >= 1000)
+        
+        value = [0] * 10000
+        self.wrap("a", value)
+        self.wrap("b", value)
+        self.assertEqual(2, nitro_pie._hostValueCounts[id(value)])
+        
+        data   = array.array("d", [0.0] * 10000)
+        buffer = ctx.makePythonObjectRef(data)
+        self.assertTrue(buffer.toPython(ctx) is data)
+        
+    #---------------------------------------------------------------
+    def test_errors(self):
+        ctx = self.ctx
+        
+        class Broken(object):
+            @property
+            def value(self):
+                raise ValueError, "broken"
+                
+        self.wrap("broken", {"object": Broken()})
+        
+        self.assertRaises(JSException, ctx.eval, "broken.object.value")
+        
+    #---------------------------------------------------------------
+    def test_class_names(self):
+        ctx = self.ctx
+        
+        self.wrap("a", {})
+        self.wrap("b", {})
+        self.wrap("point", Point(1, 2))
+        
+        toString = "Object.prototype.toString.call"
+        
+        self.assertEqual("[object dict]",  ctx.eval("%s(a)" % toString).toString(ctx))
+        self.assertEqual("[object dict]",  ctx.eval("%s(b)" % toString).toString(ctx))
+        self.assertEqual("[object Point]", ctx.eval("%s(point)" % toString).toString(ctx))
+        
+#-------------------------------------------------------------------
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,160 @@
+#!/usr/bin/env python
+
+#-------------------------------------------------------------------
+# The MIT License
+# 
+# Copyright (c) 2009 Patrick Mueller
+# 
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+# 
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+# 
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+# THE SOFTWARE.
+#
+#-------------------------------------------------------------------
+
+
+import os
+import sys
+
+lib_path = os.path.abspath(os.path.join(os.path.dirname(sys.argv[0]), "../lib"))
+if lib_path not in sys.path: sys.path.insert(0, lib_path)
+
+import threading
+import unittest
+
+from nitro_pie import *
+from nitro_pie import RememberedObjects
+from test_utils import *
+
+#-------------------------------------------------------------------
+class Test(unittest.TestCase):
+    
+    #---------------------------------------------------------------
+    def test_remember_and_forget(self):
+        count = RememberedObjects.count()
+        
+        a = object()
+        b = object()
+        
+        handleA = RememberedObjects.remember(a)
+        handleB = RememberedObjects.remember(b)
+        
+        self.assertTrue(handleA > 0)
+        self.assertNotEqual(handleA, handleB)
+        self.assertTrue(RememberedObjects.get(handleA) is a)
+        self.assertTrue(RememberedObjects.get(handleB) is b)
+        self.assertEqual(count + 2, RememberedObjects.count())
+        
+        RememberedObjects.forget(handleA)
+        self.assertRaises(KeyError, RememberedObjects.get,    handleA)
+        self.assertRaises(KeyError, RememberedObjects.forget, handleA)
+        self.assertRaises(KeyError, RememberedObjects.get,    0)
+        self.assertRaises(KeyError, RememberedObjects.get,    -1)
+        self.assertRaises(KeyError, RememberedObjects.forget, -1)
+        
+        past = len(RememberedObjects.objects)
+        self.assertRaises(KeyError, RememberedObjects.get,    past)
+        self.assertRaises(KeyError, RememberedObjects.forget, past)
+        self.assertRaises(KeyError, RememberedObjects.get,    past + 1000)
+        
+        RememberedObjects.forget(handleB)
+        self.assertEqual(count, RememberedObjects.count())
+        
+    #---------------------------------------------------------------
+    def test_slots_are_reused(self):
+        handle = RememberedObjects.remember(None)
+        RememberedObjects.forget(handle)
+        
+        size = len(RememberedObjects.objects)
+        
+        for i in xrange(100):
+            handle = RememberedObjects.remember(i)
+            self.assertEqual(i, RememberedObjects.get(handle))
+            RememberedObjects.forget(handle)
+            
+        self.assertEqual(size, len(RememberedObjects.objects))
+        
+    #---------------------------------------------------------------
+    def test_finalizers(self):
+        finalized = []
+        
+        handle = RememberedObjects.remember("value", finalized.append)
+        self.assertEqual([], finalized)
+        
+        RememberedObjects.forget(handle)
+        self.assertEqual(["value"], finalized)
+        
+        handle = RememberedObjects.remember("other")
+        RememberedObjects.forget(handle)
+        self.assertEqual(["value"], finalized)
+        
+    #---------------------------------------------------------------
+    def test_forget_later(self):
+        finalized = []
+        
+        handle = RememberedObjects.remember("value", finalized.append)
+        RememberedObjects.forgetLater(handle)
+        
+        self.assertEqual([], finalized)
+        self.assertEqual("value", RememberedObjects.get(handle))
+        
+        RememberedObjects.drain()
+        self.assertEqual(["value"], finalized)
+        self.assertRaises(KeyError, RememberedObjects.get, handle)
+        
+    #---------------------------------------------------------------
+    def test_forget_later_while_draining(self):
+        later = RememberedObjects.remember("later")
+        
+        def finalizer(value):
+            RememberedObjects.forgetLater(later)
+            
+        handle = RememberedObjects.remember("value", finalizer)
+        RememberedObjects.forgetLater(handle)
+        
+        RememberedObjects.drain()
+        self.assertEqual([later], list(RememberedObjects.pending))
+        self.assertEqual("later", RememberedObjects.get(later))
+        
+        RememberedObjects.drain()
+        self.assertEqual(0, len(RememberedObjects.pending))
+        self.assertRaises(KeyError, RememberedObjects.get, later)
+        
+    #---------------------------------------------------------------
+    def test_threads(self):
+        count  = RememberedObjects.count()
+        errors = []
+        
+        def run():
+            try:
+                for i in xrange(1000):
+                    handle = RememberedObjects.remember(i)
+                    if RememberedObjects.get(handle) != i: errors.append(i)
+                    RememberedObjects.forget(handle)
+            except Exception, e:
+                errors.append(e)
+                
+        threads = [threading.Thread(target=run) for i in xrange(4)]
+        
+        for thread in threads: thread.start()
+        for thread in threads: thread.join()
+        
+        self.assertEqual([], errors)
+        self.assertEqual(count, RememberedObjects.count())
+        
+#-------------------------------------------------------------------
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,107 @@
+#!/usr/bin/env python
+
+#-------------------------------------------------------------------
+# The MIT License
+# 
+# Copyright (c) 2009 Patrick Mueller
+# 
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+# 
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+# 
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+# THE SOFTWARE.
+#
+#-------------------------------------------------------------------
+
+
+import os
+import sys
+
+lib_path = os.path.abspath(os.path.join(os.path.dirname(sys.argv[0]), "../lib"))
+if lib_path not in sys.path: sys.path.insert(0, lib_path)
+
+import unittest
+
+from nitro_pie import *
+from test_utils import *
+
+#-------------------------------------------------------------------
+class Test(unittest.TestCase):
+    
+    #---------------------------------------------------------------
+    def setUp(self):
+        self.ctx = JSGlobalContextRef.create()
+        
+    def tearDown(self):
+        self.ctx.release()
+
+    #---------------------------------------------------------------
+    def test_hits_and_misses(self):
+        cache = JSStringRefCache(10)
+        
+        ref1 = cache.get("a")
+        ref2 = cache.get("a")
+        ref3 = cache.get("b")
+        
+        self.assertEqual(ref1.value, ref2.value)
+        self.assertNotEqual(ref1.value, ref3.value)
+        self.assertEqual(1, cache.hits)
+        self.assertEqual(2, cache.misses)
+        self.assertEqual(2, len(cache))
+        
+        self.assertEqual("a", ref1.toString())
+        self.assertEqual("b", ref3.toString())
+        
+        cache.clear()
+        self.assertEqual(0, len(cache))
+        self.assertEqual(0, cache.hits)
+        
+    #---------------------------------------------------------------
+    def test_eviction(self):
+        cache = JSStringRefCache(2)
+        
+        cache.get("a")
+        cache.get("b")
+        cache.get("a")
+        cache.get("c")
+        
+        self.assertEqual(2, len(cache))
+        
+        cache.get("a")
+        self.assertEqual(2, cache.hits)
+        
+        cache.get("b")
+        self.assertEqual(4, cache.misses)
+        
+        cache.clear()
+        
+    #---------------------------------------------------------------
+    def test_property_access_uses_cache(self):
+        ctx = self.ctx
+        
+        o = ctx.eval("({})").asJSObjectRef(ctx)
+        
+        hits = JSStringRef.cache.hits
+        
+        o.setProperty(ctx, "cached_name", ctx.makeNumber(1))
+        self.assertTrue(o.hasProperty(ctx, "cached_name"))
+        self.assertEqual(1, o.getProperty(ctx, "cached_name").toNumber(ctx))
+        self.assertTrue(o.deleteProperty(ctx, "cached_name"))
+        
+        self.assertTrue(JSStringRef.cache.hits >= hits + 3)
+        
+#-------------------------------------------------------------------
+if __name__ == '__main__':
+    unittest.main()
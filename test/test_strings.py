@@ -0,0 +1,111 @@
+#!/usr/bin/env python
+
+#-------------------------------------------------------------------
+# The MIT License
+# 
+# Copyright (c) 2009 Patrick Mueller
+# 
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+# 
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+# 
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+# THE SOFTWARE.
+#
+#-------------------------------------------------------------------
+
+
+import os
+import sys
+
+lib_path = os.path.abspath(os.path.join(os.path.dirname(sys.argv[0]), "../lib"))
+if lib_path not in sys.path: sys.path.insert(0, lib_path)
+
+import unittest
+
+from nitro_pie import *
+from test_utils import *
+
+#-------------------------------------------------------------------
+class Test(unittest.TestCase):
+    
+    #---------------------------------------------------------------
+    def setUp(self):
+        self.ctx = JSGlobalContextRef.create()
+        
+    def tearDown(self):
+        self.ctx.release()
+
+    #---------------------------------------------------------------
+    def roundTrip(self, string):
+        ref = JSStringRef.create(string)
+        
+        result = (ref.toString(), ref.toUnicode())
+        
+        ref.release()
+        return result
+        
+    #---------------------------------------------------------------
+    def test_short_strings(self):
+        self.assertEqual(("abc", u"abc"),                       self.roundTrip("abc"))
+        self.assertEqual(("abc", u"abc"),                       self.roundTrip(u"abc"))
+        self.assertEqual(("\xc3\xa9", u"\u00e9"),               self.roundTrip(u"\u00e9"))
+        self.assertEqual(("\xc3\xa9", u"\u00e9"),               self.roundTrip("\xc3\xa9"))
+        
+    #---------------------------------------------------------------
+    def test_long_strings(self):
+        string = u"\u00e9\u4e2dx" * JSStringRef.utf16Threshold
+        
+        self.assertEqual((string.encode("utf-8"), string), self.roundTrip(string))
+        
+    #---------------------------------------------------------------
+    def test_non_bmp(self):
+        string = u"\U0001d11e"
+        self.assertEqual((string.encode("utf-8"), string), self.roundTrip(string))
+        
+        string = string * JSStringRef.utf16Threshold
+        self.assertEqual((string.encode("utf-8"), string), self.roundTrip(string))
+        
+    #---------------------------------------------------------------
+    def test_invalid_utf8(self):
+        self.assertRaises(UnicodeDecodeError, JSStringRef.create, "\xff")
+        
+    #---------------------------------------------------------------
+    def test_value_to_unicode(self):
+        ctx = self.ctx
+        
+        result = ctx.eval("'a\\u00e9' + new Array(1000).join('b')")
+        
+        self.assertEqual(u"a\u00e9"  + u"b" * 999, result.toUnicode(ctx))
+        self.assertEqual("a\xc3\xa9" + "b"  * 999, result.toString(ctx))
+        
+    #---------------------------------------------------------------
+    def test_lone_surrogates(self):
+        ctx = self.ctx
+        
+        short = ctx.eval("'a\\ud800b\\udc00'")
+        self.assertEqual(u"a\ud800b\udc00", short.toUnicode(ctx))
+        self.assertTrue(isinstance(short.toString(ctx), str))
+        
+        count  = JSStringRef.utf16Threshold
+        string = (u"a\ud800" * count) + u"\U0001d11e"
+        
+        long = ctx.eval("new Array(%d).join('a\\ud800') + 'a\\ud800\\ud834\\udd1e'" % count)
+        self.assertEqual(string, long.toUnicode(ctx))
+        self.assertEqual(string.encode("utf-8"), long.toString(ctx))
+        self.assertEqual(string, long.toPython(ctx))
+        
+#-------------------------------------------------------------------
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,103 @@
+#!/usr/bin/env python
+
+#-------------------------------------------------------------------
+# The MIT License
+# 
+# Copyright (c) 2009 Patrick Mueller
+# 
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+# 
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+# 
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+# THE SOFTWARE.
+#
+#-------------------------------------------------------------------
+
+
+import os
+import sys
+
+lib_path = os.path.abspath(os.path.join(os.path.dirname(sys.argv[0]), "../lib"))
+if lib_path not in sys.path: sys.path.insert(0, lib_path)
+
+import unittest
+
+from nitro_pie import *
+from test_utils import *
+
+#-------------------------------------------------------------------
+class Test(unittest.TestCase):
+    
+    #---------------------------------------------------------------
+    def setUp(self):
+        self.ctx = JSGlobalContextRef.create()
+        
+    def tearDown(self):
+        self.ctx.release()
+
+    #---------------------------------------------------------------
+    def test_primitives(self):
+        ctx = self.ctx
+        
+        self.assertEqual(1.5,   ctx.eval("1.5").toPython(ctx))
+        self.assertEqual(u"xy", ctx.eval("'xy'").toPython(ctx))
+        self.assertEqual(True,  ctx.eval("true").toPython(ctx))
+        self.assertEqual(None,  ctx.eval("null").toPython(ctx))
+        self.assertEqual(None,  ctx.eval("undefined").toPython(ctx))
+        
+    #---------------------------------------------------------------
+    def test_nested(self):
+        ctx = self.ctx
+        
+        result = ctx.eval("({a: [1, 'b', {c: null}], d: {e: false}})").toPython(ctx)
+        
+        self.assertEqual({"a": [1, "b", {"c": None}], "d": {"e": False}}, result)
+        
+    #---------------------------------------------------------------
+    def test_shared_and_cycles(self):
+        ctx = self.ctx
+        
+        result = ctx.eval("var s = {x: 1}; var o = {a: s, b: s}; o.self = o; o").toPython(ctx)
+        
+        self.assertTrue(result["a"] is result["b"])
+        self.assertTrue(result["self"] is result)
+        
+        result = ctx.eval("var a = [1]; a.push(a); a").toPython(ctx)
+        self.assertTrue(result[1] is result)
+        
+    #---------------------------------------------------------------
+    def test_functions(self):
+        ctx = self.ctx
+        
+        result = ctx.eval("({f: function() { return 42 }})").toPython(ctx)
+        
+        self.assertTrue(isinstance(result["f"], JSObjectRef))
+        self.assertTrue(result["f"].isFunction(ctx))
+        
+    #---------------------------------------------------------------
+    def test_depth(self):
+        ctx = self.ctx
+        
+        value = ctx.eval("({a: {b: {c: 1}}})")
+        
+        self.assertTrue(isinstance(value.toPython(ctx, 0), JSObjectRef))
+        
+        result = value.toPython(ctx, 2)
+        self.assertTrue(isinstance(result["a"]["b"], JSObjectRef))
+        self.assertEqual({"c": 1}, result["a"]["b"].toPython(ctx))
+        
+#-------------------------------------------------------------------
+if __name__ == '__main__':
+    unittest.main()
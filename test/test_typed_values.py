@@ -0,0 +1,138 @@
+#!/usr/bin/env python
+
+#-------------------------------------------------------------------
+# The MIT License
+# 
+# Copyright (c) 2009 Patrick Mueller
+# 
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+# 
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+# 
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+# THE SOFTWARE.
+#
+#-------------------------------------------------------------------
+
+
+import os
+import sys
+
+lib_path = os.path.abspath(os.path.join(os.path.dirname(sys.argv[0]), "../lib"))
+if lib_path not in sys.path: sys.path.insert(0, lib_path)
+
+import unittest
+
+from nitro_pie import *
+from test_utils import *
+
+import nitro_pie
+
+#-------------------------------------------------------------------
+class Test(unittest.TestCase):
+    
+    #---------------------------------------------------------------
+    def setUp(self):
+        self.ctx = JSGlobalContextRef.create()
+        
+    def tearDown(self):
+        self.ctx.release()
+
+    #---------------------------------------------------------------
+    def test_eval(self):
+        ctx = self.ctx
+        
+        for script in ["({})", "[]", "(function() {})", "new Date()"]:
+            self.assertTrue(isinstance(ctx.eval(script), JSObjectRef), script)
+            
+        for script in ["1", "'a'", "true", "null", "undefined"]:
+            self.assertFalse(isinstance(ctx.eval(script), JSObjectRef), script)
+            
+        self.assertTrue(isinstance(ctx.prepare("({})").eval(ctx), JSObjectRef))
+        self.assertFalse(isinstance(ctx.prepare("1").eval(ctx), JSObjectRef))
+        
+    #---------------------------------------------------------------
+    def test_properties(self):
+        ctx = self.ctx
+        
+        o = ctx.eval("({a: {}, b: 1, c: [[], 2]})")
+        
+        self.assertTrue(isinstance(o.getProperty(ctx, "a"), JSObjectRef))
+        self.assertFalse(isinstance(o.getProperty(ctx, "b"), JSObjectRef))
+        
+        c = o.getProperty(ctx, "c")
+        self.assertTrue(isinstance(c.getPropertyAtIndex(ctx, 0), JSObjectRef))
+        self.assertFalse(isinstance(c.getPropertyAtIndex(ctx, 1), JSObjectRef))
+        
+        self.assertTrue(c.asJSObjectRef(ctx) is c)
+        
+    #---------------------------------------------------------------
+    def test_cached_type(self):
+        ctx   = self.ctx
+        calls = []
+        
+        getType = nitro_pie._JSValueGetType
+        def countingGetType(context, value):
+            calls.append(value)
+            return getType(context, value)
+            
+        value = ctx.eval("'a'").bind(ctx)
+        
+        nitro_pie._JSValueGetType = countingGetType
+        try:
+            checks = [
+                value.isUndefined(), value.isNull(),   value.isBoolean(), 
+                value.isNumber(),    value.isString(), value.isObject(),
+            ]
+        finally:
+            nitro_pie._JSValueGetType = getType
+            
+        self.assertEqual([False, False, False, False, True, False], checks)
+        self.assertEqual(1, len(calls))
+        
+    #---------------------------------------------------------------
+    def test_results_keep_their_type(self):
+        ctx = self.ctx
+        
+        o      = ctx.eval("({a: 'x', b: [1]})")
+        string = o.getProperty(ctx, "a")
+        array  = o.getProperty(ctx, "b")
+        number = array.getPropertyAtIndex(ctx, 0)
+        
+        names = [
+            "_JSValueGetType",  "_JSValueIsUndefined", "_JSValueIsNull", "_JSValueIsBoolean",
+            "_JSValueIsNumber", "_JSValueIsString",    "_JSValueIsObject",
+        ]
+        saved = [getattr(nitro_pie, name) for name in names]
+        
+        def fail(*args): 
+            raise AssertionError, "called into the library"
+            
+        for name in names: setattr(nitro_pie, name, fail)
+        try:
+            self.assertEqual(JSValueRef.kJSTypeString, string.getType(ctx))
+            self.assertTrue(string.isString(ctx))
+            self.assertFalse(string.isObject(ctx))
+            self.assertTrue(number.isNumber(ctx))
+            self.assertFalse(number.isNull(ctx))
+            self.assertTrue(array.isObject(ctx))
+            self.assertTrue(o.isObject(ctx))
+            self.assertRaises(TypeError, string.asJSObjectRef, ctx)
+            self.assertTrue(string.bind(ctx).isString())
+        finally:
+            for name, function in zip(names, saved): setattr(nitro_pie, name, function)
+            
+#-------------------------------------------------------------------
+if __name__ == '__main__':
+    unittest.main()